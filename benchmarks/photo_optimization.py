@@ -0,0 +1,63 @@
+"""
+Bytes saved and end-to-end latency of photo-mode image optimization.
+
+Generates photo-like PNG, TIFF and BMP files, optimizes them for the given
+media size and print quality, and compares raw with optimized uploads.
+Upload time is modelled from ``--mbps``; end-to-end latency is conversion
+plus upload::
+
+    python benchmarks/photo_optimization.py --size 6000x4000 --media-size ms_a4 --mbps 20
+"""
+import argparse
+import io
+import time
+
+from PIL import Image, ImageFilter
+
+from epson_connect.images import ImageOptimizer
+
+
+def photo(width, height, fmt):
+    gradient = Image.linear_gradient('L').resize((width, height))
+    noise = Image.effect_noise((width, height), 40).filter(ImageFilter.GaussianBlur(2))
+    image = Image.merge('RGB', (gradient, noise, gradient.transpose(Image.FLIP_LEFT_RIGHT)))
+    out = io.BytesIO()
+    image.save(out, fmt)
+    return out.getvalue()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--size', default='6000x4000')
+    parser.add_argument('--media-size', default='ms_a4')
+    parser.add_argument('--print-quality', default='normal')
+    parser.add_argument('--quality', type=int, default=85)
+    parser.add_argument('--mbps', type=float, default=20.0)
+    args = parser.parse_args()
+
+    width, height = (int(n) for n in args.size.split('x'))
+    print_setting = {'media_size': args.media_size, 'print_quality': args.print_quality}
+    upload_seconds = lambda n: n * 8 / (args.mbps * 1_000_000)  # noqa: E731
+
+    with ImageOptimizer(quality=args.quality) as optimizer:
+        # Start the worker process outside the measurement.
+        optimizer.optimize(photo(64, 64, 'PNG'), print_setting)
+
+        for fmt in ('PNG', 'TIFF', 'BMP'):
+            raw = photo(width, height, fmt)
+
+            start = time.perf_counter()
+            optimized = optimizer.optimize(raw, print_setting)
+            convert = time.perf_counter() - start
+
+            raw_total = upload_seconds(len(raw))
+            optimized_total = convert + upload_seconds(len(optimized))
+            print(
+                f'{fmt:>4}: {len(raw) / 1e6:7.1f} MB -> {len(optimized) / 1e6:5.1f} MB '
+                f'({1 - len(optimized) / len(raw):6.1%} saved), '
+                f'convert {convert:5.2f}s, end-to-end {raw_total:6.2f}s -> {optimized_total:5.2f}s'
+            )
+
+
+if __name__ == '__main__':
+    main()
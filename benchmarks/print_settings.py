@@ -0,0 +1,57 @@
+"""
+Per-job cost of preparing print settings.
+
+Compares merging, validating and JSON-encoding a settings dict for every
+job, as ``Printer.print`` does for dicts, with encoding the body of a
+reusable ``PrintSettings`` that was validated once, directly or looked up
+as a named profile::
+
+    python benchmarks/print_settings.py --jobs 100000
+"""
+import argparse
+import json
+import timeit
+
+from epson_connect.printer_settings import (PrintProfiles, PrintSettings,
+                                            merge_with_default_settings,
+                                            validate_settings)
+
+SETTINGS = {
+    'print_mode': 'document',
+    'print_setting': {
+        'media_size': 'ms_letter',
+        'color_mode': 'mono',
+        'copies': 2,
+    },
+}
+
+
+def per_job_dict():
+    settings = merge_with_default_settings(SETTINGS)
+    validate_settings(settings)
+    return json.dumps(settings).encode()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--jobs', type=int, default=100000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    print_settings = PrintSettings.from_dict(SETTINGS)
+    profiles = PrintProfiles({'letter-mono': SETTINGS})
+    runs = (
+        ('dict', per_job_dict),
+        ('PrintSettings', print_settings.body),
+        ('profile', lambda: profiles.resolve('letter-mono').body()),
+    )
+
+    baseline = None
+    for label, func in runs:
+        best = min(timeit.repeat(func, number=args.jobs, repeat=args.repeat)) / args.jobs
+        baseline = baseline or best
+        print(f'{label:>14}: {best * 1e6:6.2f}us per job ({baseline / best:4.1f}x)')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,318 @@
+"""
+Benchmark suite for the print path, run against the local API simulator.
+
+Covers settings preparation, token grants and refreshes, single-job
+latency, batch throughput at several concurrencies, upload throughput for
+several file sizes and peak Python memory during an upload. Results are
+stored per commit in ``benchmarks/results/`` so a change can be compared
+with an earlier run::
+
+    python benchmarks/run.py                      # run and store results
+    python benchmarks/run.py --compare abc1234    # ... and compare with a stored commit
+    python benchmarks/run.py --filter upload --quick
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import timeit
+import tracemalloc
+from datetime import datetime, timezone
+
+from epson_connect.authenticate import AuthCtx
+from epson_connect.client import Client
+from epson_connect.printer_settings import (PrintProfiles,
+                                            merge_with_default_settings,
+                                            validate_settings)
+from epson_connect.scheduler import percentile
+from epson_connect.simulator import Simulator
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'results')
+
+SETTINGS = {
+    'print_mode': 'document',
+    'print_setting': {'media_size': 'ms_letter', 'color_mode': 'mono', 'copies': 2},
+}
+
+BENCHMARKS = []
+
+
+def benchmark(name, unit, higher_is_better=False):
+    """
+    Register a benchmark; it returns a list of samples in ``unit``.
+    """
+    def register(func):
+        BENCHMARKS.append((name, unit, higher_is_better, func))
+        return func
+    return register
+
+
+class Context:
+    """
+    Shared simulator, client and scratch files for one run.
+    """
+
+    def __init__(self, args, simulator, scratch):
+        self.args = args
+        self.simulator = simulator
+        self.scratch = scratch
+        self.client = self.new_client()
+
+    def new_client(self, **kwargs):
+        return Client(
+            base_url=self.simulator.url,
+            printer_email='bench@example.com',
+            client_id='bench',
+            client_secret='secret',
+            pool_maxsize=32,
+            **kwargs,
+        )
+
+    def file(self, size):
+        path = os.path.join(self.scratch, f'{size}.pdf')
+        if not os.path.exists(path):
+            with open(path, 'wb') as f:
+                f.write(b'%PDF-1.4\n' + os.urandom(size - 9))
+        return path
+
+    def repeat(self, func, times):
+        samples = []
+        for _ in range(times):
+            start = time.perf_counter()
+            func()
+            samples.append(time.perf_counter() - start)
+        return samples
+
+
+@benchmark('settings.merge_validate', 'us')
+def settings_merge_validate(ctx):
+    def prepare():
+        settings = merge_with_default_settings(SETTINGS)
+        validate_settings(settings)
+        return json.dumps(settings).encode()
+    return _per_call(prepare, ctx.args.iterations * 100)
+
+
+@benchmark('settings.profile_body', 'us')
+def settings_profile_body(ctx):
+    profiles = PrintProfiles({'letter-mono': SETTINGS})
+    return _per_call(lambda: profiles.resolve('letter-mono').body(), ctx.args.iterations * 100)
+
+
+@benchmark('auth.password_grant', 'ms')
+def auth_password_grant(ctx):
+    transport = ctx.client._transport
+
+    def grant():
+        auth_ctx = AuthCtx(
+            ctx.simulator.url,
+            'bench@example.com',
+            'bench',
+            'secret',
+            transport=transport,
+        )
+        auth_ctx.warmup()
+        auth_ctx.close()
+    return _ms(ctx.repeat(grant, ctx.args.iterations))
+
+
+@benchmark('auth.refresh', 'ms')
+def auth_refresh(ctx):
+    auth_ctx = ctx.client._auth_ctx
+    return _ms(ctx.repeat(lambda: auth_ctx._auth(force=True), ctx.args.iterations))
+
+
+@benchmark('print.latency', 'ms')
+def print_latency(ctx):
+    printer = ctx.client.printer
+    path = ctx.file(16 * 1024)
+    return _ms(ctx.repeat(lambda: printer.print(path), ctx.args.iterations))
+
+
+def _batch_throughput(concurrency):
+    def run(ctx):
+        printer = ctx.client.printer
+        files = [ctx.file(16 * 1024)] * (ctx.args.iterations * 4)
+        samples = []
+        for _ in range(3):
+            batch = printer.print_many(files, max_workers=concurrency)
+            if batch.failed:
+                raise RuntimeError(f'{len(batch.failed)} jobs failed')
+            samples.append(batch.jobs_per_second)
+        return samples
+    return run
+
+
+for _concurrency in (1, 4, 16):
+    benchmark(f'batch.throughput_c{_concurrency}', 'jobs/s', True)(
+        _batch_throughput(_concurrency),
+    )
+
+
+def _upload_throughput(size):
+    def run(ctx):
+        printer = ctx.client.printer
+        path = ctx.file(size)
+        job = printer.print_setting(merge_with_default_settings())
+        seconds = ctx.repeat(
+            lambda: printer.upload_file(job['upload_uri'], path, 'document'),
+            max(3, ctx.args.iterations // 4),
+        )
+        return [size / 1e6 / s for s in seconds]
+    return run
+
+
+for _label, _size in (('64k', 64 * 1024), ('1m', 1024 * 1024), ('16m', 16 * 1024 * 1024)):
+    benchmark(f'upload.throughput_{_label}', 'MB/s', True)(_upload_throughput(_size))
+
+
+@benchmark('upload.peak_memory_16m', 'MB')
+def upload_peak_memory(ctx):
+    printer = ctx.client.printer
+    path = ctx.file(16 * 1024 * 1024)
+    job = printer.print_setting(merge_with_default_settings())
+
+    tracemalloc.start()
+    try:
+        printer.upload_file(job['upload_uri'], path, 'document')
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return [peak / 1e6]
+
+
+def _per_call(func, number):
+    return [t / number * 1e6 for t in timeit.repeat(func, number=number, repeat=5)]
+
+
+def _ms(seconds):
+    return [s * 1000 for s in seconds]
+
+
+def summarize(samples):
+    return {
+        'median': statistics.median(samples),
+        'min': min(samples),
+        'max': max(samples),
+        'p99': percentile(samples, 99),
+        'samples': len(samples),
+    }
+
+
+def run(args):
+    selected = [b for b in BENCHMARKS if not args.filter or args.filter in b[0]]
+    results = {}
+
+    with tempfile.TemporaryDirectory() as scratch, Simulator(
+        latency=args.latency,
+        print_seconds=0,
+        token_lifetime=3600,
+    ) as simulator:
+        ctx = Context(args, simulator, scratch)
+        for name, unit, higher_is_better, func in selected:
+            samples = func(ctx)
+            results[name] = dict(
+                summarize(samples),
+                unit=unit,
+                higher_is_better=higher_is_better,
+            )
+            print(f'{name:<28} {results[name]["median"]:12.2f} {unit}', flush=True)
+        ctx.client.close()
+
+    return results
+
+
+def git_revision():
+    try:
+        commit = subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            capture_output=True, text=True, check=True,
+        ).stdout.strip()
+        dirty = subprocess.run(
+            ['git', 'status', '--porcelain', '--untracked-files=no'],
+            capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+    return f'{commit}-dirty' if dirty else commit
+
+
+def save(results, args):
+    revision = git_revision()
+    os.makedirs(RESULTS_DIR, exist_ok=True)
+    path = os.path.join(RESULTS_DIR, f'{revision}.json')
+
+    stored = {}
+    if os.path.exists(path):
+        with open(path) as f:
+            stored = json.load(f)['results']
+    # Partial (--filter) runs update the stored results of the same commit.
+    stored.update(results)
+
+    with open(path, 'w') as f:
+        json.dump({
+            'revision': revision,
+            'date': datetime.now(timezone.utc).isoformat(),
+            'python': sys.version.split()[0],
+            'platform': platform.platform(),
+            'latency': args.latency,
+            'results': stored,
+        }, f, indent=2, sort_keys=True)
+    return path
+
+
+def compare(results, revision, threshold):
+    """
+    Print the change against a stored run; return the names of regressions.
+    """
+    path = os.path.join(RESULTS_DIR, f'{revision}.json')
+    with open(path) as f:
+        baseline = json.load(f)['results']
+
+    regressions = []
+    print(f'\ncompared with {revision}:')
+    for name, result in results.items():
+        if name not in baseline:
+            continue
+        before, after = baseline[name]['median'], result['median']
+        change = (after - before) / before if before else 0.0
+        worse = -change if result['higher_is_better'] else change
+        flag = ''
+        if worse > threshold:
+            flag = '  REGRESSION'
+            regressions.append(name)
+        print(
+            f'{name:<28} {before:12.2f} -> {after:12.2f} {result["unit"]:<7} '
+            f'{change:+7.1%}{flag}'
+        )
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--filter', help='only run benchmarks whose name contains this')
+    parser.add_argument('--iterations', type=int, default=50)
+    parser.add_argument('--quick', action='store_true', help='fewer iterations')
+    parser.add_argument('--latency', type=float, default=0.005, help='simulated API latency')
+    parser.add_argument('--compare', metavar='REVISION', help='stored revision to compare with')
+    parser.add_argument('--threshold', type=float, default=0.1, help='regression threshold')
+    parser.add_argument('--no-save', action='store_true')
+    args = parser.parse_args()
+    if args.quick:
+        args.iterations = 10
+
+    results = run(args)
+    if not args.no_save:
+        print(f'\nsaved {save(results, args)}')
+
+    if args.compare and compare(results, args.compare, args.threshold):
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
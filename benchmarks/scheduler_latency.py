@@ -0,0 +1,80 @@
+"""
+p99 latency of urgent prints while batch jobs saturate every worker.
+
+Runs against a fake printer with fixed service time, comparing FIFO order
+(every job submitted at the same priority by the same tenant) with priority
+scheduling::
+
+    python benchmarks/scheduler_latency.py --workers 8 --batch 2000 --urgent 100
+"""
+import argparse
+import threading
+import time
+
+from epson_connect.scheduler import PrintScheduler, percentile
+
+
+class FakePrinter:
+
+    def __init__(self, service_time):
+        self.service_time = service_time
+
+    def print(self, file_path, settings=None, extension=None):
+        time.sleep(self.service_time)
+        return file_path
+
+
+def run(args, urgent_priority, urgent_tenant):
+    printer = FakePrinter(args.service_time)
+    latencies = []
+    lock = threading.Lock()
+
+    with PrintScheduler(printer, max_workers=args.workers) as scheduler:
+        for i in range(args.batch):
+            scheduler.submit(f'batch-{i}', priority='batch', tenant='reports')
+
+        def done(started):
+            def callback(_):
+                with lock:
+                    latencies.append(time.monotonic() - started)
+            return callback
+
+        futures = []
+        interval = args.batch * args.service_time / args.workers / args.urgent / 2
+        for i in range(args.urgent):
+            future = scheduler.submit(f'urgent-{i}', priority=urgent_priority, tenant=urgent_tenant)
+            future.add_done_callback(done(time.monotonic()))
+            futures.append(future)
+            time.sleep(interval)
+
+        for future in futures:
+            future.result()
+        metrics = scheduler.metrics()
+        scheduler.close(wait=False)
+
+    return latencies, metrics
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--workers', type=int, default=8)
+    parser.add_argument('--batch', type=int, default=2000)
+    parser.add_argument('--urgent', type=int, default=100)
+    parser.add_argument('--service-time', type=float, default=0.005)
+    args = parser.parse_args()
+
+    modes = (
+        ('fifo', 'batch', 'reports'),
+        ('priority', 'urgent', 'front-desk'),
+    )
+    for label, priority, tenant in modes:
+        latencies, metrics = run(args, priority, tenant)
+        print(
+            f'{label:>8}: urgent p50={percentile(latencies, 50) * 1000:8.1f}ms '
+            f'p99={percentile(latencies, 99) * 1000:8.1f}ms '
+            f'(batch queued at end: {metrics["queued"]["batch"]})'
+        )
+
+
+if __name__ == '__main__':
+    main()
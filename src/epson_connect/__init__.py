@@ -1 +1,18 @@
+from .aio import AsyncClient  # noqa: F401
+from .capabilities import CapabilityCache  # noqa: F401
 from .client import Client  # noqa: F401
+from .events import Events, RequestEvent, TokenEvent  # noqa: F401
+from .fleet import Fleet  # noqa: F401
+from .images import ImageOptimizer  # noqa: F401
+from .pdf import PdfSplitter  # noqa: F401
+from .print_queue import PrintQueue  # noqa: F401
+from .printer_settings import PrintProfiles, PrintSettings  # noqa: F401
+from .ratelimit import Governor, RateLimiter  # noqa: F401
+from .retry import RetryPolicy  # noqa: F401
+from .scheduler import PrintScheduler  # noqa: F401
+from .token_store import (FileTokenStore, MemoryTokenStore,  # noqa: F401
+                          TokenStore)
+from .tracker import JobTracker, JobTransition  # noqa: F401
+from .transport import Transport  # noqa: F401
+from .upload_cache import UploadCache  # noqa: F401
+from .webhook import WebhookReceiver  # noqa: F401
@@ -0,0 +1,5 @@
+from .authenticate import AsyncAuthCtx  # noqa: F401
+from .client import AsyncClient  # noqa: F401
+from .printer import AsyncPrinter  # noqa: F401
+from .scanner import AsyncScanner  # noqa: F401
+from .transport import AsyncTransport  # noqa: F401
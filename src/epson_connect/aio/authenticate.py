@@ -0,0 +1,268 @@
+import asyncio
+import contextlib
+import itertools
+import logging
+import time
+
+from ..authenticate import ApiError, AuthenticationError, _BaseAuthCtx
+from ..events import Events, HttpxTrace, observed
+from ..ratelimit import Governor
+from ..retry import RetryPolicy
+from ..token_store import TokenStore
+from .transport import AsyncTransport, httpx
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncAuthCtx(_BaseAuthCtx):
+    """
+    asyncio counterpart of AuthCtx.
+
+    Construction does not touch the network; the first request (or an explicit
+    ``await ctx.warmup()``) authenticates.
+    """
+
+    def __init__(
+            self,
+            base_url: str,
+            printer_email: str,
+            client_id: str,
+            client_secret: str,
+            transport: AsyncTransport = None,
+            token_store: TokenStore = None,
+            refresh_ratio: float = None,
+            retry_policy: RetryPolicy = None,
+            governor: Governor = None,
+            events: Events = None,
+    ) -> None:
+        super().__init__(
+            base_url,
+            printer_email,
+            client_id,
+            client_secret,
+            token_store,
+            refresh_ratio,
+            events,
+        )
+        self._transport = transport or AsyncTransport()
+        self._retry_policy = retry_policy or RetryPolicy()
+        self._governor = governor
+        # Created on first use; see _lock().
+        self._auth_lock = None
+        self._auth_loop = None
+        self._refresher = None
+        self._closed = False
+
+    async def warmup(self):
+        """
+        Authenticate now instead of on first use.
+        """
+        await self._auth()
+
+    async def _auth(self, force=False):
+        # Also covers tokens loaded from the store, which skip the grant below.
+        self._schedule_refresh()
+
+        if not force and self._token_valid():
+            return
+
+        # Only one coroutine refreshes; the rest wait and then see a valid token.
+        async with self._lock():
+            if not force and self._token_valid():
+                return
+
+            refreshing = self._access_token != ''
+            try:
+                await self._grant()
+            except AuthenticationError:
+                if not refreshing:
+                    raise
+
+                # See AuthCtx._auth.
+                self._reset_token()
+                await self._grant()
+
+    def _lock(self):
+        # Before Python 3.10 an asyncio.Lock binds to the event loop current
+        # when it is created, so create it inside the loop that uses it. That
+        # lets a client be built at import time or in another thread.
+        loop = asyncio.get_running_loop()
+        if self._auth_loop is not loop:
+            self._auth_lock = asyncio.Lock()
+            self._auth_loop = loop
+        return self._auth_lock
+
+    async def _grant(self):
+        method = 'POST'
+        path = self.TOKEN_PATH
+
+        data, headers, auth = self._token_request()
+        grant_type = data['grant_type']
+        started = time.monotonic()
+
+        try:
+            body = await self.send(method, path, data=data, headers=headers, auth=auth)
+            self._set_token(body)
+        except ApiError as e:
+            self._emit_token(grant_type, started, e)
+            raise AuthenticationError(e)
+        except Exception as e:
+            self._emit_token(grant_type, started, e)
+            raise
+
+        self._emit_token(grant_type, started)
+
+    async def _deauthenticate(self):
+        """
+        Cancel authentication.
+        """
+        if not self._access_token:
+            # See AuthCtx._deauthenticate.
+            return
+
+        method = 'DELETE'
+        path = f'/api/1/printing/printers/{self._subject_id}'
+        await self.send(method, path)
+        self._reset_token()
+
+    async def send(
+            self,
+            method,
+            path,
+            data=None,
+            json=None,
+            headers=None,
+            auth=None,
+            idempotent=None,
+    ) -> dict:
+        """
+        Send a request, retrying according to the retry policy.
+
+        ``data`` may be a form dict, bytes, or a callable returning a fresh
+        (async) iterable of body chunks for every attempt.
+        """
+        # See AuthCtx.send; headers carry credentials.
+        logger.debug('%s %s json=%s auth=%s', method, path, json, bool(auth))
+
+        policy = self._retry_policy
+        idempotent = policy.is_idempotent(method, idempotent)
+        started = time.monotonic()
+
+        for attempt in itertools.count(1):
+            # See AuthCtx.send; auth is only set while authenticating, and the
+            # token may have changed while waiting to retry.
+            if not auth:
+                await self._auth()
+
+            trace = self._trace()
+            try:
+                async with self._limit():
+                    resp = await self._transport.request(
+                        method,
+                        self._base_url + path,
+                        headers=headers or self.default_headers,
+                        json=json,
+                        timeout=policy.call_timeout(started),
+                        **_request_kwargs(data, auth, trace),
+                    )
+            except httpx.TransportError as e:
+                delay = policy.delay(attempt, started) if _retry_safe(e, idempotent) else None
+                if delay is None:
+                    self._emit_request(method, path, started, attempt, error=e, trace=trace)
+                    raise
+                logger.info('%s %s failed with %r; retrying in %.2fs', method, path, e, delay)
+                await asyncio.sleep(delay)
+                continue
+
+            if policy.should_retry_status(resp.status_code, idempotent):
+                delay = policy.delay(attempt, started, resp.headers.get('Retry-After'))
+                if delay is not None:
+                    logger.info(
+                        '%s %s returned %s; retrying in %.2fs',
+                        method, path, resp.status_code, delay,
+                    )
+                    await asyncio.sleep(delay)
+                    continue
+
+            self._emit_request(method, path, started, attempt, resp, trace=trace)
+            return self._decode_response(resp)
+
+    def _trace(self):
+        # Connection phase timings are only collected when someone is listening.
+        return HttpxTrace() if observed(self._events) else None
+
+    def _limit(self):
+        if self._governor is None:
+            return _no_limit()
+        return self._governor.limit_async(self._subject_id)
+
+    def _in_background(self):
+        return self._refresher is not None and asyncio.current_task() is self._refresher
+
+    def _schedule_refresh(self):
+        if self._refresh_at is None or self._refresher is not None or self._closed:
+            return
+
+        self._refresher = asyncio.get_running_loop().create_task(self._refresh_loop())
+
+    async def _refresh_loop(self):
+        while True:
+            await asyncio.sleep(self._seconds_until_refresh())
+            if self._seconds_until_refresh() > 0:
+                # An inline refresh moved the deadline; sleep until the new one.
+                continue
+
+            try:
+                await self._auth(force=True)
+            except Exception:
+                logger.exception('Background token refresh failed.')
+                await asyncio.sleep(self.REFRESH_RETRY_SECONDS)
+
+    async def close(self):
+        """
+        Stop the background token refresh, if any.
+        """
+        self._closed = True
+        if self._refresher is not None:
+            self._refresher.cancel()
+            try:
+                await self._refresher
+            except asyncio.CancelledError:
+                pass
+            self._refresher = None
+
+    @property
+    def transport(self):
+        return self._transport
+
+
+@contextlib.asynccontextmanager
+async def _no_limit():
+    # contextlib.nullcontext only supports ``async with`` from Python 3.10.
+    yield
+
+
+def _request_kwargs(data, auth, trace=None) -> dict:
+    kwargs = {}
+
+    if isinstance(data, dict):
+        kwargs['data'] = data
+    elif callable(data):
+        kwargs['content'] = data()
+    elif data is not None:
+        kwargs['content'] = data
+
+    if auth is not None:
+        kwargs['auth'] = (auth.username, auth.password)
+
+    if trace is not None:
+        kwargs['extensions'] = {'trace': trace}
+
+    return kwargs
+
+
+def _retry_safe(error, idempotent) -> bool:
+    # See authenticate._retry_safe.
+    if isinstance(error, httpx.ConnectTimeout):
+        return True
+    return idempotent and isinstance(error, (httpx.NetworkError, httpx.TimeoutException))
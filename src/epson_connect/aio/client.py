@@ -0,0 +1,108 @@
+from ..capabilities import CapabilityCache
+from ..client import Client, _resolve_credentials
+from ..events import Events
+from ..images import ImageOptimizer
+from ..printer_settings import PrintProfiles
+from ..ratelimit import Governor
+from ..retry import RetryPolicy
+from ..token_store import TokenStore
+from ..upload_cache import UploadCache
+from .authenticate import AsyncAuthCtx
+from .printer import AsyncPrinter
+from .scanner import AsyncScanner
+from .transport import AsyncTransport
+
+
+class AsyncClient:
+    """
+    asyncio counterpart of Client.
+
+    Use as an async context manager so the pooled connections are closed::
+
+        async with AsyncClient(...) as client:
+            job_id = await client.printer.print('./file.pdf')
+    """
+
+    EC_BASE_URL = Client.EC_BASE_URL
+
+    def __init__(
+            self,
+            base_url='',
+            printer_email='',
+            client_id='',
+            client_secret='',
+            transport: AsyncTransport = None,
+            token_store: TokenStore = None,
+            refresh_ratio: float = None,
+            retry_policy: RetryPolicy = None,
+            governor: Governor = None,
+            events: Events = None,
+            capability_cache: CapabilityCache = None,
+            check_capabilities: bool = False,
+            upload_cache: UploadCache = None,
+            image_optimizer: ImageOptimizer = None,
+            profiles=None,
+            max_connections=100,
+    ) -> None:
+        base_url, printer_email, client_id, client_secret = _resolve_credentials(
+            base_url or self.EC_BASE_URL,
+            printer_email,
+            client_id,
+            client_secret,
+        )
+
+        self._transport = transport or AsyncTransport(max_connections=max_connections)
+
+        self._auth_ctx = AsyncAuthCtx(
+            base_url,
+            printer_email,
+            client_id,
+            client_secret,
+            transport=self._transport,
+            token_store=token_store,
+            refresh_ratio=refresh_ratio,
+            retry_policy=retry_policy,
+            governor=governor,
+            events=events,
+        )
+
+        self.profiles = profiles if isinstance(profiles, PrintProfiles) else PrintProfiles(profiles)
+        self._printer = AsyncPrinter(
+            self._auth_ctx,
+            capability_cache,
+            check_capabilities,
+            upload_cache=upload_cache,
+            image_optimizer=image_optimizer,
+            profiles=self.profiles,
+        )
+        self._scanner = AsyncScanner(self._auth_ctx)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    async def warmup(self):
+        """
+        Authenticate now instead of on first use.
+        """
+        await self._auth_ctx.warmup()
+
+    async def deauthenticate(self):
+        await self._auth_ctx._deauthenticate()
+
+    async def close(self):
+        """
+        Stop background token refresh and release pooled connections.
+        """
+        await self._auth_ctx.close()
+        await self._transport.close()
+
+    @property
+    def printer(self):
+        return self._printer
+
+    @property
+    def scanner(self):
+        return self._scanner
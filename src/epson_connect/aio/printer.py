@@ -0,0 +1,308 @@
+import asyncio
+import functools
+import os
+import time
+
+from ..batch import BatchResult, PrintJobResult
+from ..capabilities import Capabilities, CapabilityCache
+from ..events import recording
+from ..images import ImageOptimizer, read_content
+from ..printer import (Printer, _no_lap, _Stages, _upload_content_type,
+                       _upload_path, _validate_cancelable, _validate_extension,
+                       _validate_operator)
+from ..printer_settings import (PrintProfiles, PrintSettings,
+                                merge_with_default_settings, validate_settings)
+from ..upload import UploadSource
+from ..upload_cache import UploadCache
+from .authenticate import AsyncAuthCtx
+
+
+class AsyncPrinter:
+    VALID_EXTENSIONS = Printer.VALID_EXTENSIONS
+
+    VALID_OPERATORS = Printer.VALID_OPERATORS
+
+    def __init__(
+            self,
+            auth_ctx: AsyncAuthCtx,
+            capability_cache: CapabilityCache = None,
+            check_capabilities: bool = False,
+            upload_cache: UploadCache = None,
+            image_optimizer: ImageOptimizer = None,
+            profiles: PrintProfiles = None,
+    ) -> None:
+        self._auth_ctx = auth_ctx
+        if capability_cache is None:
+            capability_cache = CapabilityCache()
+        self._capability_cache = capability_cache
+        self._check_capabilities = check_capabilities
+        self._upload_cache = upload_cache
+        self._image_optimizer = image_optimizer
+        self.profiles = profiles if profiles is not None else PrintProfiles()
+
+    @property
+    def device_id(self):
+        return self._auth_ctx.device_id
+
+    async def _path(self, suffix=''):
+        # The device ID is only known once authenticated.
+        await self._auth_ctx._auth()
+        return f'/api/1/printing/printers/{self.device_id}{suffix}'
+
+    async def capabilities(self, mode, refresh=False):
+        """
+        Get device print capabilities, cached per device and mode.
+        """
+        return (await self._capabilities(mode, refresh)).raw
+
+    async def _capabilities(self, mode, refresh=False) -> Capabilities:
+        path = await self._path(f'/capability/{mode}')
+
+        if not refresh:
+            capabilities = self._capability_cache.get(self.device_id, mode)
+            if capabilities is not None:
+                return capabilities
+
+        method = 'GET'
+        raw = await self._auth_ctx.send(method, path)
+        return self._capability_cache.set(self.device_id, mode, raw)
+
+    async def check_settings(self, settings):
+        """
+        Validate settings against the device's (cached) capabilities.
+        """
+        settings = merge_with_default_settings(self.profiles.resolve(settings))
+        validate_settings(settings)
+        (await self._capabilities(settings['print_mode'])).validate(settings)
+
+    async def print_setting(self, settings) -> dict:
+        """
+        Create a print job.
+        """
+        method = 'POST'
+        path = await self._path('/jobs')
+
+        settings = self.profiles.resolve(settings)
+        if self._check_capabilities:
+            await self.check_settings(settings)
+        elif not isinstance(settings, PrintSettings):
+            validate_settings(settings)
+
+        if isinstance(settings, PrintSettings):
+            # Validated and encoded up front; only the job name is added.
+            return await self._auth_ctx.send(method, path, data=settings.body())
+        return await self._auth_ctx.send(method, path, json=settings)
+
+    async def upload_file(
+            self,
+            upload_uri: str,
+            file_path,
+            print_mode: str,
+            extension=None,
+    ) -> None:
+        """
+        Upload file to be printed.
+
+        The file is streamed in chunks; disk reads run in a worker thread.
+
+        :param file_path: Path, binary file object, or bytes-like object to upload.
+        :param extension: File extension, required for sources without a file name.
+        """
+        source = UploadSource(file_path, extension)
+        _validate_extension(source.extension)
+        if self._upload_cache is not None:
+            source = self._upload_cache.source(file_path, source.extension)
+
+        with source:
+            path = _upload_path(upload_uri, source.extension)
+
+            headers = {
+                'Content-Type': _upload_content_type(print_mode),
+                'Content-Length': str(source.length),
+            }
+
+            method = 'POST'
+            # Re-uploading to the same Key replaces the file, so retries are
+            # safe; each attempt streams the body again from the start.
+            await self._auth_ctx.send(
+                method,
+                path,
+                data=functools.partial(_aiter_chunks, source),
+                headers=headers,
+                idempotent=True,
+            )
+
+    async def execute_print(self, job_id):
+        """
+        Execute print job.
+        """
+        method = 'POST'
+        path = await self._path(f'/jobs/{job_id}/print')
+        await self._auth_ctx.send(method, path)
+
+    async def print(self, file_path, settings=None, extension=None, detailed=False):
+        """
+        Print file.
+
+        :param file_path: Path, binary file object, or bytes-like object to print.
+        :param extension: File extension, required for sources without a file name.
+        :param detailed: Return a PrintReport with per-stage timings instead of the job ID.
+        :return: Job ID for print job.
+        """
+        if not detailed:
+            return await self._print(file_path, settings, extension, _no_lap)
+
+        with recording() as events:
+            stages = _Stages(events)
+            job_id = await self._print(file_path, settings, extension, stages.lap)
+        return stages.finish(job_id)
+
+    async def _print(self, file_path, settings, extension, lap) -> str:
+        # Fail before creating a job that could never be printed.
+        _validate_extension(UploadSource(file_path, extension).extension)
+
+        settings = self.profiles.resolve(settings)
+        if not isinstance(settings, PrintSettings):
+            settings = merge_with_default_settings(settings)
+        file_path, extension = await self._optimize_photo(file_path, extension, settings)
+        lap('prepare')
+
+        job_data = await self.print_setting(settings)
+        lap('create')
+        await self.upload_file(
+            job_data['upload_uri'],
+            file_path,
+            settings['print_mode'],
+            extension,
+        )
+        lap('upload')
+        await self.execute_print(job_data['id'])
+        lap('execute')
+        return job_data['id']
+
+    async def _optimize_photo(self, file_path, extension, settings):
+        optimizer = self._image_optimizer
+        if optimizer is None:
+            return file_path, extension
+        source_extension = UploadSource(file_path, extension).extension
+        if not optimizer.wants(settings['print_mode'], source_extension):
+            return file_path, extension
+
+        if not isinstance(settings, PrintSettings):
+            validate_settings(settings)
+        print_setting = settings.get('print_setting')
+
+        cache = self._upload_cache
+        if cache is not None and isinstance(file_path, (str, os.PathLike)):
+            digest, content = await asyncio.to_thread(cache.load, file_path)
+            if digest is not None:
+                variant = optimizer.variant(print_setting)
+                optimized = cache.get_derived(digest, variant)
+                if optimized is None:
+                    optimized = cache.put_derived(
+                        digest,
+                        variant,
+                        await optimizer.optimize_async(content, print_setting),
+                    )
+                return optimized, '.jpg'
+
+        content = await asyncio.to_thread(read_content, file_path)
+        return await optimizer.optimize_async(content, print_setting), '.jpg'
+
+    async def print_many(
+            self,
+            files,
+            settings=None,
+            max_concurrency=16,
+            detailed=False,
+    ) -> BatchResult:
+        """
+        Print many files concurrently.
+
+        See Printer.print_many; at most ``max_concurrency`` jobs are in flight.
+        """
+        start = time.monotonic()
+        semaphore = asyncio.Semaphore(max_concurrency)
+
+        async def print_one(file):
+            async with semaphore:
+                return await self._print_one(file, settings, detailed)
+
+        results = await asyncio.gather(*(print_one(file) for file in files))
+
+        return BatchResult(list(results), time.monotonic() - start)
+
+    async def _print_one(self, file, settings, detailed=False) -> PrintJobResult:
+        source, extension = file if isinstance(file, tuple) else (file, None)
+        result = PrintJobResult(file)
+
+        start = time.monotonic()
+        try:
+            if detailed:
+                result.report = await self.print(source, settings, extension, detailed=True)
+                result.job_id = result.report.job_id
+            else:
+                result.job_id = await self.print(source, settings, extension)
+        except Exception as e:
+            result.error = e
+        result.elapsed = time.monotonic() - start
+
+        return result
+
+    async def cancel_print(self, job_id, operated_by='user'):
+        """
+        Cancel print.
+        """
+        method = 'POST'
+        path = await self._path(f'/jobs/{job_id}/cancel')
+
+        _validate_operator(operated_by)
+
+        job_status = (await self.job_info(job_id)).get('status')
+        _validate_cancelable(job_status)
+
+        data = {
+            'operated_by': operated_by,
+        }
+
+        await self._auth_ctx.send(method, path, json=data)
+
+    async def job_info(self, job_id):
+        """
+        Get print job information.
+        """
+        method = 'GET'
+        path = await self._path(f'/jobs/{job_id}')
+        return await self._auth_ctx.send(method, path)
+
+    async def info(self):
+        """
+        Get device information.
+        """
+        method = 'GET'
+        path = await self._path()
+        return await self._auth_ctx.send(method, path)
+
+    async def notification(self, callback_uri, enabled=True):
+        """
+        Set whether or not to notify of the print job status change.
+        """
+        method = 'POST'
+        path = await self._path('/settings/notification')
+
+        data = {
+            'notification': enabled,
+            'callback_uri': callback_uri,
+        }
+
+        return await self._auth_ctx.send(method, path, json=data)
+
+
+async def _aiter_chunks(source: UploadSource):
+    source.rewind()
+    chunks = source.chunks()
+    while True:
+        chunk = await asyncio.to_thread(next, chunks, b'')
+        if not chunk:
+            return
+        yield chunk
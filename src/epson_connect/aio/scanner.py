@@ -0,0 +1,77 @@
+from ..scanner import Scanner, ScannerError, _validate_destination
+from .authenticate import AsyncAuthCtx
+
+
+class AsyncScanner:
+    VALID_DESTINATION_TYPES = Scanner.VALID_DESTINATION_TYPES
+
+    def __init__(self, auth_ctx: AsyncAuthCtx) -> None:
+        self._auth_ctx = auth_ctx
+        self._destination_cache = {}
+
+    async def _path(self):
+        # The device ID is only known once authenticated.
+        await self._auth_ctx._auth()
+        return f'/api/1/scanning/scanners/{self._auth_ctx.device_id}/destinations'
+
+    async def list(self):
+        """
+        Get scan destinations.
+        """
+        method = 'GET'
+        return await self._auth_ctx.send(method, await self._path())
+
+    async def add(self, name, destination, type_='mail'):
+        """
+        Register scan destination.
+        """
+        method = 'POST'
+
+        _validate_destination(name, destination, type_)
+
+        data = {
+            'alias_name': name,
+            'type': type_,
+            'destination': destination,
+        }
+
+        resp = await self._auth_ctx.send(method, await self._path(), json=data)
+        self._destination_cache[resp['id']] = resp
+        return resp
+
+    async def update(self, id_, name=None, destination=None, type_=None):
+        """
+        Update scan destination.
+        """
+        method = 'POST'
+
+        dest_cache = self._destination_cache.get(id_)
+        if dest_cache is None:
+            raise ScannerError('Scan destination is not yet registered.')
+
+        data = {
+            'id': id_,
+            'alias_name': name if name else dest_cache['alias_name'],
+            'type': type_ if type_ else dest_cache['type'],
+            'destination': destination if destination else dest_cache['destination'],
+        }
+
+        _validate_destination(data['alias_name'], data['destination'], data['type'])
+
+        resp = await self._auth_ctx.send(method, await self._path(), json=data)
+        self._destination_cache[id_] = resp
+        return resp
+
+    async def remove(self, id_):
+        """
+        Remove scan destination.
+        """
+        method = 'DELETE'
+
+        data = {
+            'id': id_,
+        }
+
+        await self._auth_ctx.send(method, await self._path(), json=data)
+
+        self._destination_cache.pop(id_, None)
@@ -0,0 +1,60 @@
+try:
+    import httpx
+except ImportError:  # pragma: no cover
+    httpx = None
+
+
+class AsyncTransport:
+    """
+    Pooled, keep-alive asyncio HTTP transport backed by httpx.
+
+    Like the sync Transport, one instance is shared by everything created
+    from one AsyncClient. Requests beyond ``max_connections`` wait for a free
+    connection instead of opening new ones, so many thousands of concurrent
+    coroutines can share a small pool.
+    """
+
+    def __init__(
+            self,
+            max_connections: int = 100,
+            max_keepalive_connections: int = 20,
+            keepalive_expiry: float = 30.0,
+            client=None,
+    ) -> None:
+        """
+        :param max_connections: Maximum number of concurrent connections.
+        :param max_keepalive_connections: Maximum number of idle connections kept alive.
+        :param keepalive_expiry: Seconds an idle connection is kept alive.
+        :param client: Optional pre-configured ``httpx.AsyncClient`` to use.
+        """
+        if client is None:
+            if httpx is None:
+                raise ImportError(
+                    'httpx is required for the asyncio client. '
+                    'Install it with "pip install epson-connect[async]".'
+                )
+
+            limits = httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_keepalive_connections,
+                keepalive_expiry=keepalive_expiry,
+            )
+            client = httpx.AsyncClient(limits=limits, timeout=None)
+
+        self._client = client
+
+    @property
+    def client(self):
+        return self._client
+
+    async def request(self, method, url, **kwargs):
+        """
+        Send a request over a pooled connection.
+        """
+        return await self._client.request(method, url, **kwargs)
+
+    async def close(self):
+        """
+        Close all pooled connections.
+        """
+        await self._client.aclose()
@@ -1,21 +1,50 @@
+import contextlib
+import itertools
 import logging
+import threading
+import time
 from datetime import datetime, timedelta
 
 import requests
 from requests.auth import HTTPBasicAuth
 
+from .events import Events
+from .events import default as default_events
+from .events import observed, request_event, token_event
+from .ratelimit import Governor
+from .retry import RetryPolicy
+from .token_store import TokenStore, token_key
+from .transport import Transport
+
 logger = logging.getLogger(__name__)
 
 
-class AuthCtx:
+class _BaseAuthCtx:
+    """
+    Token state and request building shared by the sync and async auth contexts.
+    """
+
+    TOKEN_PATH = '/api/1/printing/oauth2/auth/token?subject=printer'
+
+    # Treat tokens as expired slightly early so a request that starts right
+    # before expiry does not reach the API with a dead token.
+    EXPIRY_MARGIN = timedelta(seconds=5)
+
+    # Delay before retrying a failed background refresh.
+    REFRESH_RETRY_SECONDS = 10
+
     def __init__(
             self,
             base_url: str,
             printer_email: str,
             client_id: str,
             client_secret: str,
+            token_store: TokenStore = None,
+            refresh_ratio: float = None,
+            events: Events = None,
     ) -> None:
         self._base_url = base_url
+        self._events = events if events is not None else default_events
         self._printer_email = printer_email
         self._client_id = client_id
         self._client_secret = client_secret
@@ -25,15 +54,55 @@ class AuthCtx:
         self._refresh_token = ''
         self._subject_id = ''
 
-        self._auth()
+        # Refresh-ahead: when set, a background refresh runs once this fraction
+        # of the token lifetime has passed.
+        if refresh_ratio is not None and not 0 < refresh_ratio < 1:
+            raise ValueError('refresh_ratio must be between 0 and 1')
+        self._refresh_ratio = refresh_ratio
+        self._refresh_at = None
 
-    def _auth(self):
-        method = 'POST'
-        path = '/api/1/printing/oauth2/auth/token?subject=printer'
+        self._token_store = token_store
+        self._token_key = token_key(client_id, printer_email)
+        self._load_token()
+
+    def _token_valid(self):
+        return self._expires_at - self.EXPIRY_MARGIN > datetime.now()
 
-        if self._expires_at > datetime.now():
+    def _seconds_until_refresh(self):
+        if self._refresh_at is None:
+            return None
+        return max(0.0, (self._refresh_at - datetime.now()).total_seconds())
+
+    def _update_refresh_at(self, lifetime):
+        if self._refresh_ratio is None or not lifetime:
             return
+        skew = timedelta(seconds=lifetime * (1 - self._refresh_ratio))
+        self._refresh_at = self._expires_at - skew
+
+    def _schedule_refresh(self):
+        """
+        Make sure a background refresh is scheduled; implemented by subclasses.
+        """
+        pass
 
+    def _in_background(self):
+        """
+        Whether the caller is the background refresher; implemented by subclasses.
+        """
+        return False
+
+    def _emit_request(self, method, path, started, attempts, resp=None, error=None, trace=None):
+        if observed(self._events):
+            self._events.emit(request_event(method, path, started, attempts, resp, error, trace))
+
+    def _emit_token(self, grant_type, started, error=None):
+        if observed(self._events):
+            self._events.emit(token_event(grant_type, started, not self._in_background(), error))
+
+    def _token_request(self):
+        """
+        Build the data, headers and auth for the next token grant.
+        """
         headers = {
             'Content-Type': 'application/x-www-form-urlencoded'
         }
@@ -51,11 +120,12 @@ class AuthCtx:
                 'refresh_token': self._refresh_token,
             }
 
-        try:
-            body = self.send(method, path, data=data, headers=headers, auth=auth)
-        except ApiError as e:
-            raise AuthenticationError(e)
+        return data, headers, auth
 
+    def _set_token(self, body):
+        """
+        Store the token from a token endpoint response body.
+        """
         error = body.get('error')
         if error:
             raise AuthenticationError(error)
@@ -64,37 +134,58 @@ class AuthCtx:
         if self._access_token == '':
             self._refresh_token = body['refresh_token']
 
-        self._expires_at = datetime.now() + timedelta(seconds=int(body['expires_in']))
+        # Publish the new token before the new expiry so that a thread which
+        # sees a valid expiry never pairs it with the previous access token.
+        lifetime = int(body['expires_in'])
         self._access_token = body['access_token']
         self._subject_id = body['subject_id']
+        self._expires_at = datetime.now() + timedelta(seconds=lifetime)
 
-    def _deauthenticate(self):
+        self._save_token(lifetime)
+        self._update_refresh_at(lifetime)
+        self._schedule_refresh()
+
+    def _reset_token(self):
         """
-        Cancel authentication.
+        Forget the current token so the next grant is a password grant.
         """
-        method = 'DELETE'
-        path = f'/api/1/printing/printers/{self._subject_id}'
-        self.send(method, path)
+        self._expires_at = datetime.now()
+        self._access_token = ''
+        self._refresh_token = ''
+        self._subject_id = ''
 
-    def send(self, method, path, data=None, json=None, headers=None, auth=None) -> dict:
-        # auth is only set when we are authenticating with Client ID and Client Secret.
-        # In this scenario, we do not want to call self._auth again as that
-        # would cause a recursion exception.
-        if not auth:
-            self._auth()
+        if self._token_store is not None:
+            self._token_store.delete(self._token_key)
+
+    def _load_token(self):
+        if self._token_store is None:
+            return
 
-        headers = headers or self.default_headers
+        token = self._token_store.get(self._token_key)
+        if not token:
+            return
 
-        logger.debug(f'{method} {path} data={data} json={json} headers={headers} auth={bool(auth)}')
+        self._expires_at = datetime.fromtimestamp(token['expires_at'])
+        self._access_token = token['access_token']
+        self._refresh_token = token['refresh_token']
+        self._subject_id = token['subject_id']
+        self._update_refresh_at(token.get('expires_in'))
 
-        resp = requests.request(
-            method=method,
-            url=self._base_url + path,
-            headers=headers,
-            data=data,
-            json=json,
-            auth=auth,
-        )
+    def _save_token(self, lifetime):
+        if self._token_store is None:
+            return
+
+        self._token_store.set(self._token_key, {
+            'access_token': self._access_token,
+            'refresh_token': self._refresh_token,
+            'expires_at': self._expires_at.timestamp(),
+            'expires_in': lifetime,
+            'subject_id': self._subject_id,
+        })
+
+    @staticmethod
+    def _decode_response(resp) -> dict:
+        status_code = resp.status_code
 
         # Assume JSON and fall back to raw bytes.
         try:
@@ -102,11 +193,11 @@ class AuthCtx:
         except Exception:
             resp = {'code': resp.content.decode()}
 
-        logger.debug(f'resp={resp}')
+        logger.debug('status=%s resp=%s', status_code, resp)
 
         error = resp.get('code')
         if error:
-            raise ApiError(error)
+            raise ApiError(error, status_code=status_code)
 
         return resp
 
@@ -122,6 +213,241 @@ class AuthCtx:
         return self._subject_id
 
 
+class AuthCtx(_BaseAuthCtx):
+    """
+    Authentication context shared by every Printer and Scanner of a Client.
+
+    Safe to share between threads: when the token expires, a single thread
+    performs the grant while the others wait and reuse its result.
+
+    Construction does not touch the network; the first request, the first
+    ``device_id`` lookup or an explicit ``warmup()`` authenticates.
+    """
+
+    def __init__(
+            self,
+            base_url: str,
+            printer_email: str,
+            client_id: str,
+            client_secret: str,
+            transport: Transport = None,
+            token_store: TokenStore = None,
+            refresh_ratio: float = None,
+            retry_policy: RetryPolicy = None,
+            governor: Governor = None,
+            events: Events = None,
+    ) -> None:
+        super().__init__(
+            base_url,
+            printer_email,
+            client_id,
+            client_secret,
+            token_store,
+            refresh_ratio,
+            events,
+        )
+        self._transport = transport or Transport()
+        self._retry_policy = retry_policy or RetryPolicy()
+        self._governor = governor
+
+        self._refresher = None
+        self._closed = threading.Event()
+
+        # Serializes token grants: one thread refreshes, the rest wait for it.
+        self._auth_lock = threading.Lock()
+
+        # Covers tokens loaded from the store; otherwise the first grant schedules it.
+        if self._refresh_at is not None:
+            self._schedule_refresh()
+
+    def warmup(self):
+        """
+        Authenticate now instead of on first use.
+        """
+        self._auth()
+
+    def _auth(self, force=False):
+        if not force and self._token_valid():
+            return
+
+        with self._auth_lock:
+            # Another thread may have refreshed while we waited for the lock.
+            if not force and self._token_valid():
+                return
+
+            refreshing = self._access_token != ''
+            try:
+                self._grant()
+            except AuthenticationError:
+                if not refreshing:
+                    raise
+
+                # The refresh token may have been revoked or have come from a
+                # stale token store entry; fall back to a fresh password grant.
+                self._reset_token()
+                self._grant()
+
+    def _grant(self):
+        method = 'POST'
+        path = self.TOKEN_PATH
+
+        data, headers, auth = self._token_request()
+        grant_type = data['grant_type']
+        started = time.monotonic()
+
+        try:
+            body = self.send(method, path, data=data, headers=headers, auth=auth)
+            self._set_token(body)
+        except ApiError as e:
+            self._emit_token(grant_type, started, e)
+            raise AuthenticationError(e)
+        except Exception as e:
+            self._emit_token(grant_type, started, e)
+            raise
+
+        self._emit_token(grant_type, started)
+
+    def _deauthenticate(self):
+        """
+        Cancel authentication.
+        """
+        if not self._access_token:
+            # Never authenticated; nothing to cancel.
+            return
+
+        method = 'DELETE'
+        path = f'/api/1/printing/printers/{self._subject_id}'
+        self.send(method, path)
+        self._reset_token()
+
+    def send(
+            self,
+            method,
+            path,
+            data=None,
+            json=None,
+            headers=None,
+            auth=None,
+            idempotent=None,
+    ) -> dict:
+        """
+        Send a request, retrying according to the retry policy.
+
+        :param idempotent: Whether the call is safe to repeat; defaults to
+            deciding by HTTP method.
+        """
+        # Headers and form data carry credentials, so they are not logged.
+        logger.debug('%s %s json=%s auth=%s', method, path, json, bool(auth))
+
+        policy = self._retry_policy
+        idempotent = policy.is_idempotent(method, idempotent)
+        started = time.monotonic()
+
+        # Streamed bodies have to be rewound before they can be sent again.
+        position = data.tell() if hasattr(data, 'seek') and hasattr(data, 'tell') else None
+
+        for attempt in itertools.count(1):
+            # auth is only set when we are authenticating with Client ID and Client Secret.
+            # In this scenario, we do not want to call self._auth again as that
+            # would cause a recursion exception. Otherwise check the token on
+            # every attempt: it may have been refreshed, or have expired,
+            # while waiting to retry.
+            if not auth:
+                self._auth()
+
+            if position is not None:
+                data.seek(position)
+
+            try:
+                with self._limit():
+                    resp = self._transport.request(
+                        method=method,
+                        url=self._base_url + path,
+                        headers=headers or self.default_headers,
+                        data=data,
+                        json=json,
+                        auth=auth,
+                        timeout=policy.call_timeout(started),
+                    )
+            except requests.RequestException as e:
+                delay = policy.delay(attempt, started) if _retry_safe(e, idempotent) else None
+                if delay is None:
+                    self._emit_request(method, path, started, attempt, error=e)
+                    raise
+                logger.info('%s %s failed with %r; retrying in %.2fs', method, path, e, delay)
+                time.sleep(delay)
+                continue
+
+            if policy.should_retry_status(resp.status_code, idempotent):
+                delay = policy.delay(attempt, started, resp.headers.get('Retry-After'))
+                if delay is not None:
+                    logger.info(
+                        '%s %s returned %s; retrying in %.2fs',
+                        method, path, resp.status_code, delay,
+                    )
+                    time.sleep(delay)
+                    continue
+
+            self._emit_request(method, path, started, attempt, resp)
+            return self._decode_response(resp)
+
+    def _limit(self):
+        if self._governor is None:
+            return contextlib.nullcontext()
+        return self._governor.limit(self._subject_id)
+
+    def _in_background(self):
+        return threading.current_thread() is self._refresher
+
+    def _schedule_refresh(self):
+        if self._refresh_at is None or self._refresher is not None or self._closed.is_set():
+            return
+
+        self._refresher = threading.Thread(
+            target=self._refresh_loop,
+            name='epson-connect-token-refresh',
+            daemon=True,
+        )
+        self._refresher.start()
+
+    def _refresh_loop(self):
+        while not self._closed.wait(self._seconds_until_refresh()):
+            if self._seconds_until_refresh() > 0:
+                # An inline refresh moved the deadline; sleep until the new one.
+                continue
+
+            try:
+                self._auth(force=True)
+            except Exception:
+                logger.exception('Background token refresh failed.')
+                self._closed.wait(self.REFRESH_RETRY_SECONDS)
+
+    def close(self):
+        """
+        Stop the background token refresh, if any.
+        """
+        self._closed.set()
+
+    @property
+    def device_id(self):
+        # Only known once authenticated.
+        if not self._subject_id:
+            self._auth()
+        return self._subject_id
+
+    @property
+    def transport(self):
+        return self._transport
+
+
+def _retry_safe(error, idempotent) -> bool:
+    # A connect timeout never reached the server, so it is always safe to
+    # retry; other transport failures only for idempotent calls.
+    if isinstance(error, requests.ConnectTimeout):
+        return True
+    return idempotent and isinstance(error, (requests.ConnectionError, requests.Timeout))
+
+
 class AuthenticationError(RuntimeError):
     """
     Error for authentication specific exceptions.
@@ -132,3 +458,7 @@ class ApiError(RuntimeError):
     """
     General base error for any API errors after authentication has succeeded.
     """
+
+    def __init__(self, *args, status_code=None) -> None:
+        super().__init__(*args)
+        self.status_code = status_code
@@ -0,0 +1,197 @@
+import math
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+# The stages of Printer.print, in order. prepare covers settings and photo
+# optimization, create the job creation call.
+PRINT_STAGES = ('prepare', 'create', 'upload', 'execute')
+
+
+def percentile(values, p):
+    """
+    The ``p``-th percentile (nearest rank) of ``values``, or None if empty.
+    """
+    if not values:
+        return None
+    values = sorted(values)
+    rank = max(math.ceil(p / 100 * len(values)), 1)
+    return values[rank - 1]
+
+
+@dataclass
+class PrintReport:
+    """
+    Where the time of one ``Printer.print(..., detailed=True)`` call went.
+
+    ``stages`` and ``retries`` are keyed by the names in PRINT_STAGES. A
+    token grant made while printing counts towards the stage that needed it;
+    ``token_seconds`` says how much of that was the grant.
+    """
+
+    job_id: Optional[str] = None
+    elapsed: float = 0.0
+    stages: Dict[str, float] = field(default_factory=dict)
+    retries: Dict[str, int] = field(default_factory=dict)
+    upload_bytes: int = 0
+    inline_token_refresh: bool = False
+    token_seconds: float = 0.0
+
+    @property
+    def upload_throughput(self) -> float:
+        """
+        Upload bytes per second.
+        """
+        seconds = self.stages.get('upload')
+        return self.upload_bytes / seconds if seconds else 0.0
+
+    @property
+    def slowest_stage(self) -> Optional[str]:
+        return max(self.stages, key=self.stages.get) if self.stages else None
+
+
+def _distribution(values, percentiles) -> dict:
+    summary = {f'p{p}': percentile(values, p) for p in percentiles}
+    summary['mean'] = sum(values) / len(values) if values else None
+    summary['max'] = max(values) if values else None
+    return summary
+
+
+def summarize_reports(reports, percentiles=(50, 90, 99)) -> dict:
+    """
+    Percentile summary of many PrintReports.
+
+    Stage, total and upload throughput distributions, retries per stage, the
+    number of jobs that refreshed a token inline, and the ``bottleneck``:
+    the stage that took the most time overall.
+    """
+    reports = list(reports)
+    stages = {
+        stage: [r.stages[stage] for r in reports if stage in r.stages]
+        for stage in PRINT_STAGES
+    }
+    totals = {stage: sum(seconds) for stage, seconds in stages.items()}
+
+    return {
+        'jobs': len(reports),
+        'elapsed': _distribution([r.elapsed for r in reports], percentiles),
+        'stages': {
+            stage: _distribution(seconds, percentiles) for stage, seconds in stages.items()
+        },
+        'upload_throughput': _distribution(
+            [r.upload_throughput for r in reports if r.upload_bytes], percentiles,
+        ),
+        'retries': {
+            stage: sum(r.retries.get(stage, 0) for r in reports) for stage in PRINT_STAGES
+        },
+        'inline_token_refreshes': sum(r.inline_token_refresh for r in reports),
+        'bottleneck': max(totals, key=totals.get) if reports else None,
+    }
+
+
+@dataclass
+class PrintJobResult:
+    """
+    Outcome of one file in a batch.
+    """
+
+    file: Any
+    job_id: Optional[str] = None
+    error: Optional[BaseException] = None
+    elapsed: float = 0.0
+    report: Optional[PrintReport] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+@dataclass
+class BatchResult:
+    """
+    Per-file results of a batch, in submission order, plus throughput stats.
+    """
+
+    results: List[PrintJobResult] = field(default_factory=list)
+    elapsed: float = 0.0
+
+    def __iter__(self):
+        return iter(self.results)
+
+    def __len__(self):
+        return len(self.results)
+
+    @property
+    def succeeded(self) -> List[PrintJobResult]:
+        return [r for r in self.results if r.ok]
+
+    @property
+    def failed(self) -> List[PrintJobResult]:
+        return [r for r in self.results if not r.ok]
+
+    @property
+    def jobs_per_second(self) -> float:
+        if not self.elapsed:
+            return 0.0
+        return len(self.succeeded) / self.elapsed
+
+    @property
+    def mean_job_seconds(self) -> float:
+        if not self.results:
+            return 0.0
+        return sum(r.elapsed for r in self.results) / len(self.results)
+
+    def summary(self, percentiles=(50, 90, 99)) -> dict:
+        """
+        summarize_reports of the succeeded jobs of a detailed batch.
+        """
+        return summarize_reports(
+            (r.report for r in self.succeeded if r.report is not None), percentiles,
+        )
+
+
+@dataclass
+class PageRangeResult:
+    """
+    Outcome of one page range of a split document.
+    """
+
+    first_page: int
+    last_page: int
+    job_id: Optional[str] = None
+    uploaded: bool = False
+    printed: bool = False
+    cancelled: bool = False
+    error: Optional[BaseException] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.printed
+
+
+@dataclass
+class SplitPrintResult:
+    """
+    Per-range results of a split document, in page order.
+    """
+
+    chunks: List[PageRangeResult] = field(default_factory=list)
+    page_count: int = 0
+    elapsed: float = 0.0
+
+    def __iter__(self):
+        return iter(self.chunks)
+
+    def __len__(self):
+        return len(self.chunks)
+
+    @property
+    def ok(self) -> bool:
+        return bool(self.chunks) and all(chunk.ok for chunk in self.chunks)
+
+    @property
+    def job_ids(self) -> List[str]:
+        return [chunk.job_id for chunk in self.chunks if chunk.printed]
+
+    @property
+    def pages_printed(self) -> int:
+        return sum(c.last_page - c.first_page + 1 for c in self.chunks if c.printed)
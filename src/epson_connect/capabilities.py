@@ -0,0 +1,150 @@
+import threading
+import time
+
+from .printer_settings import PrintSettingError
+
+
+class Capabilities:
+    """
+    A device's print capabilities for one print mode.
+
+    Wraps the ``capability`` API response and indexes it so settings can be
+    checked against what the device actually supports without a round trip::
+
+        {
+            'color_modes': ['color', 'mono'],
+            'media_sizes': [{
+                'media_size': 'ms_a4',
+                'media_types': [{
+                    'media_type': 'mt_plainpaper',
+                    'borderless': False,
+                    'sources': ['auto', 'rear'],
+                    'print_qualities': ['normal', 'draft'],
+                    '2_sided': True,
+                }],
+            }],
+        }
+
+    Keys missing from the response are not checked.
+    """
+
+    def __init__(self, raw: dict) -> None:
+        self.raw = raw
+
+        color_modes = raw.get('color_modes')
+        self._color_modes = set(color_modes) if color_modes is not None else None
+
+        # media_size -> {media_type -> media type entry}
+        self._media = None
+        if raw.get('media_sizes') is not None:
+            self._media = {
+                size['media_size']: {
+                    media_type['media_type']: media_type
+                    for media_type in size.get('media_types') or ()
+                }
+                for size in raw['media_sizes']
+            }
+
+    def validate(self, settings: dict):
+        """
+        Raise PrintSettingError if the device does not support ``settings``.
+
+        ``settings`` must already be merged with the defaults.
+        """
+        print_setting = settings.get('print_setting')
+        if not print_setting:
+            return
+
+        color_mode = print_setting['color_mode']
+        if self._color_modes is not None and color_mode not in self._color_modes:
+            raise PrintSettingError(f'Color mode {color_mode} is not supported')
+
+        if self._media is None:
+            return
+
+        media_size = print_setting['media_size']
+        media_types = self._media.get(media_size)
+        if media_types is None:
+            raise PrintSettingError(f'Paper size {media_size} is not supported')
+
+        media_type = print_setting['media_type']
+        entry = media_types.get(media_type)
+        if entry is None:
+            raise PrintSettingError(f'Media type {media_type} is not supported for {media_size}')
+
+        paper = f'{media_size} {media_type}'
+
+        if print_setting['borderless'] and entry.get('borderless') is False:
+            raise PrintSettingError(f'Borderless printing is not supported for {paper}')
+
+        sources = entry.get('sources')
+        source = print_setting['source']
+        if sources is not None and source not in sources:
+            raise PrintSettingError(f'Source {source} is not supported for {paper}')
+
+        print_qualities = entry.get('print_qualities')
+        print_quality = print_setting['print_quality']
+        if print_qualities is not None and print_quality not in print_qualities:
+            raise PrintSettingError(f'Print quality {print_quality} not supported for {paper}')
+
+        if print_setting['2_sided'] != 'none' and entry.get('2_sided') is False:
+            raise PrintSettingError(f'2-sided printing is not supported for {paper}')
+
+
+class CapabilityCache:
+    """
+    Thread-safe cache of capabilities per device and print mode.
+
+    Entries expire after ``ttl`` seconds and can be dropped explicitly, e.g.
+    after a firmware update or a change of installed paper trays.
+    """
+
+    def __init__(self, ttl: float = 300.0) -> None:
+        """
+        :param ttl: Seconds an entry stays fresh, or None to keep entries until invalidated.
+        """
+        self.ttl = ttl
+        # (device ID, mode) -> (expires at, Capabilities)
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def get(self, device_id, mode) -> Capabilities:
+        """
+        Cached capabilities, or None if missing or expired.
+        """
+        entry = self._entries.get((device_id, mode))
+        if entry is None:
+            return None
+
+        expires_at, capabilities = entry
+        if expires_at is not None and time.monotonic() >= expires_at:
+            with self._lock:
+                if self._entries.get((device_id, mode)) is entry:
+                    del self._entries[(device_id, mode)]
+            return None
+
+        return capabilities
+
+    def set(self, device_id, mode, raw: dict) -> Capabilities:
+        capabilities = Capabilities(raw)
+        expires_at = time.monotonic() + self.ttl if self.ttl is not None else None
+
+        with self._lock:
+            self._entries[(device_id, mode)] = (expires_at, capabilities)
+
+        return capabilities
+
+    def invalidate(self, device_id=None, mode=None):
+        """
+        Drop entries for a device and/or mode; with no arguments drop everything.
+        """
+        with self._lock:
+            for key in list(self._entries):
+                if device_id is not None and key[0] != device_id:
+                    continue
+                if mode is not None and key[1] != mode:
+                    continue
+                del self._entries[key]
+
+    def __len__(self):
+        return len(self._entries)
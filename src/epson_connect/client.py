@@ -1,42 +1,138 @@
 import os
 
 from .authenticate import AuthCtx
+from .capabilities import CapabilityCache
+from .events import Events
+from .images import ImageOptimizer
 from .printer import Printer
+from .printer_settings import PrintProfiles
+from .ratelimit import Governor
+from .retry import RetryPolicy
 from .scanner import Scanner
+from .token_store import TokenStore
+from .transport import Transport
+from .upload_cache import UploadCache
 
 
 class Client:
     EC_BASE_URL = 'https://api.epsonconnect.com'
 
-    def __init__(self, base_url='', printer_email='', client_id='', client_secret='') -> None:
-        base_url = base_url or self.EC_BASE_URL
+    def __init__(
+            self,
+            base_url='',
+            printer_email='',
+            client_id='',
+            client_secret='',
+            transport: Transport = None,
+            token_store: TokenStore = None,
+            refresh_ratio: float = None,
+            retry_policy: RetryPolicy = None,
+            governor: Governor = None,
+            events: Events = None,
+            capability_cache: CapabilityCache = None,
+            check_capabilities: bool = False,
+            upload_cache: UploadCache = None,
+            image_optimizer: ImageOptimizer = None,
+            profiles=None,
+            pool_maxsize=10,
+    ) -> None:
+        base_url, printer_email, client_id, client_secret = _resolve_credentials(
+            base_url or self.EC_BASE_URL,
+            printer_email,
+            client_id,
+            client_secret,
+        )
 
-        printer_email = printer_email or os.environ.get('EPSON_CONNECT_API_PRINTER_EMAIL')
-        if not printer_email:
-            raise ClientError('Printer Email can not be empty')
+        # One pooled transport per client so every Printer and Scanner handed
+        # out below reuses the same keep-alive connections.
+        self._transport = transport or Transport(pool_maxsize=pool_maxsize)
 
-        client_id = client_id or os.environ.get('EPSON_CONNECT_API_CLIENT_ID')
-        if not client_id:
-            raise ClientError('Client ID can not be empty')
+        self._auth_ctx = AuthCtx(
+            base_url,
+            printer_email,
+            client_id,
+            client_secret,
+            transport=self._transport,
+            token_store=token_store,
+            refresh_ratio=refresh_ratio,
+            retry_policy=retry_policy,
+            governor=governor,
+            events=events,
+        )
 
-        client_secret = client_secret or os.environ.get('EPSON_CONNECT_API_CLIENT_SECRET')
-        if not client_secret:
-            raise ClientError('Client Secret can not be empty')
+        # Shared by every Printer handed out below.
+        if capability_cache is None:
+            capability_cache = CapabilityCache()
+        self._capability_cache = capability_cache
+        self._check_capabilities = check_capabilities
+        self._upload_cache = upload_cache
+        self._image_optimizer = image_optimizer
+        # Named settings, shared by every Printer handed out below.
+        self.profiles = profiles if isinstance(profiles, PrintProfiles) else PrintProfiles(profiles)
 
-        self._auth_ctx = AuthCtx(base_url, printer_email, client_id, client_secret)
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def warmup(self):
+        """
+        Authenticate now instead of on first use, e.g. before serving requests.
+        """
+        self._auth_ctx.warmup()
 
     def deauthenticate(self):
         self._auth_ctx._deauthenticate()
 
+    def close(self):
+        """
+        Stop background token refresh and release pooled connections.
+        """
+        self._auth_ctx.close()
+        self._transport.close()
+
     @property
     def printer(self):
-        return Printer(self._auth_ctx)
+        return Printer(
+            self._auth_ctx,
+            self._capability_cache,
+            self._check_capabilities,
+            upload_cache=self._upload_cache,
+            image_optimizer=self._image_optimizer,
+            profiles=self.profiles,
+        )
 
     @property
     def scanner(self):
         return Scanner(self._auth_ctx)
 
 
+def _resolve_credentials(base_url, printer_email, client_id, client_secret):
+    """
+    Fill in missing credentials from the environment and validate them.
+    """
+    printer_email = printer_email or os.environ.get('EPSON_CONNECT_API_PRINTER_EMAIL')
+    if not printer_email:
+        raise ClientError('Printer Email can not be empty')
+
+    client_id, client_secret = _resolve_client_credentials(client_id, client_secret)
+
+    return base_url, printer_email, client_id, client_secret
+
+
+def _resolve_client_credentials(client_id, client_secret):
+    client_id = client_id or os.environ.get('EPSON_CONNECT_API_CLIENT_ID')
+    if not client_id:
+        raise ClientError('Client ID can not be empty')
+
+    client_secret = client_secret or os.environ.get('EPSON_CONNECT_API_CLIENT_SECRET')
+    if not client_secret:
+        raise ClientError('Client Secret can not be empty')
+
+    return client_id, client_secret
+
+
 class ClientError(ValueError):
     """
     General base error for any client specific errors.
@@ -0,0 +1,225 @@
+import contextlib
+import contextvars
+import logging
+import re
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+_DEVICE = re.compile(r'/(printers|scanners)/[^/]+')
+_JOB = re.compile(r'/jobs/[^/]+')
+
+# Events emitted in this thread or task are also appended here, see recording().
+_recording = contextvars.ContextVar('epson_connect_recording', default=None)
+
+
+@dataclass
+class RequestEvent:
+    """
+    One API call, after its last attempt.
+
+    ``duration`` covers every attempt and the waits between them.
+    ``timings`` holds what the transport reports for the last attempt:
+    ``server`` (request sent until response headers) always, plus
+    ``connect``, ``tls``, ``send`` and ``wait`` from the async transport.
+    requests does not expose connection phases, so requests sent by the
+    sync ``Client`` only report ``server``.
+    """
+
+    method: str
+    endpoint: str
+    status: Optional[int]
+    bytes_sent: Optional[int]
+    bytes_received: int
+    duration: float
+    attempts: int
+    started_at: float
+    timings: dict = field(default_factory=dict)
+    error: Optional[BaseException] = None
+
+    @property
+    def retries(self) -> int:
+        return self.attempts - 1
+
+
+@dataclass
+class TokenEvent:
+    """
+    One token grant: ``password`` or ``refresh_token``.
+
+    ``inline`` grants held up a request; the others ran in the background
+    refresher.
+    """
+
+    grant_type: str
+    duration: float
+    inline: bool
+    started_at: float
+    error: Optional[BaseException] = None
+
+
+class Events:
+    """
+    Subscribers to request and token events.
+
+    With no subscribers, instrumented code skips building events entirely::
+
+        def log_slow(event):
+            if isinstance(event, RequestEvent) and event.duration > 1:
+                print(event.method, event.endpoint, event.duration)
+
+        epson_connect.events.subscribe(log_slow)
+
+    Clients publish to the process-wide ``events.default`` unless given
+    their own ``Events``. Subscribers are called on the thread (or event
+    loop) making the request, so they should be quick.
+    """
+
+    def __init__(self) -> None:
+        # Replaced, never mutated, so emitting needs no lock.
+        self.subscribers = ()
+        self._lock = threading.Lock()
+
+    def subscribe(self, callback):
+        """
+        Call ``callback(event)`` for every RequestEvent and TokenEvent.
+        """
+        with self._lock:
+            self.subscribers = self.subscribers + (callback,)
+        return callback
+
+    def unsubscribe(self, callback):
+        with self._lock:
+            self.subscribers = tuple(s for s in self.subscribers if s != callback)
+
+    def emit(self, event):
+        recorded = _recording.get()
+        if recorded is not None:
+            recorded.append(event)
+
+        for callback in self.subscribers:
+            try:
+                callback(event)
+            except Exception:
+                logger.exception('Event subscriber %r failed.', callback)
+
+
+default = Events()
+subscribe = default.subscribe
+unsubscribe = default.unsubscribe
+
+
+def observed(events: Events) -> bool:
+    """
+    Whether events published to ``events`` from here would reach anyone.
+    """
+    return bool(events.subscribers) or _recording.get() is not None
+
+
+@contextlib.contextmanager
+def recording():
+    """
+    Collect the events emitted by the current thread or task, whoever else
+    is subscribed::
+
+        with recording() as events:
+            printer.info()
+    """
+    events = []
+    token = _recording.set(events)
+    try:
+        yield events
+    finally:
+        _recording.reset(token)
+
+
+def endpoint_template(path: str) -> str:
+    """
+    ``path`` with device and job IDs and the query replaced, for grouping.
+    """
+    path = path.split('?', 1)[0]
+    path = _DEVICE.sub(r'/\1/{device_id}', path)
+    return _JOB.sub('/jobs/{job_id}', path)
+
+
+def request_event(method, path, started, attempts, resp=None, error=None, trace=None):
+    """
+    RequestEvent for a call started at ``started`` (monotonic).
+
+    ``resp`` may be a requests or an httpx response; ``trace`` an HttpxTrace
+    from the last attempt.
+    """
+    duration = time.monotonic() - started
+    timings = trace.timings() if trace is not None else {}
+    status = bytes_sent = None
+    bytes_received = 0
+
+    if resp is not None:
+        status = resp.status_code
+        content_length = resp.request.headers.get('Content-Length')
+        bytes_sent = int(content_length) if content_length is not None else 0
+        bytes_received = len(resp.content)
+        try:
+            timings.setdefault('server', resp.elapsed.total_seconds())
+        except RuntimeError:
+            # httpx only sets elapsed when it closes the stream, which it
+            # skips for responses a custom transport returned already read.
+            pass
+
+    return RequestEvent(
+        method=method,
+        endpoint=endpoint_template(path),
+        status=status,
+        bytes_sent=bytes_sent,
+        bytes_received=bytes_received,
+        duration=duration,
+        attempts=attempts,
+        started_at=time.time() - duration,
+        timings=timings,
+        error=error,
+    )
+
+
+def token_event(grant_type, started, inline, error=None):
+    duration = time.monotonic() - started
+    return TokenEvent(
+        grant_type=grant_type,
+        duration=duration,
+        inline=inline,
+        started_at=time.time() - duration,
+        error=error,
+    )
+
+
+class HttpxTrace:
+    """
+    Collects connection phase timings from httpx's ``trace`` request extension.
+    """
+
+    _PHASES = {
+        'connect': ('connection.connect_tcp.started', 'connection.connect_tcp.complete'),
+        'tls': ('connection.start_tls.started', 'connection.start_tls.complete'),
+        'send': ('send_request_headers.started', 'send_request_body.complete'),
+        'wait': ('send_request_body.complete', 'receive_response_headers.complete'),
+    }
+
+    def __init__(self) -> None:
+        self._seen = {}
+
+    async def __call__(self, event_name, info):
+        # http11.* and http2.* events are stored under the same name.
+        name = event_name.split('.', 1)[1] if event_name.startswith('http') else event_name
+        self._seen[name] = time.monotonic()
+
+    def reset(self):
+        self._seen = {}
+
+    def timings(self) -> dict:
+        timings = {}
+        for phase, (start, end) in self._PHASES.items():
+            if start in self._seen and end in self._seen:
+                timings[phase] = self._seen[end] - self._seen[start]
+        return timings
@@ -0,0 +1,261 @@
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from .authenticate import AuthCtx
+from .capabilities import CapabilityCache
+from .client import Client, _resolve_client_credentials
+from .events import Events
+from .images import ImageOptimizer
+from .printer import Printer
+from .printer_settings import PrintProfiles
+from .ratelimit import Governor
+from .retry import RetryPolicy
+from .scanner import Scanner
+from .token_store import TokenStore
+from .transport import Transport
+from .upload_cache import UploadCache
+
+
+class Fleet:
+    """
+    Many printers under one client ID and client secret.
+
+    Every device shares one connection pool. Devices authenticate lazily on
+    first use, and at most ``max_devices`` auth contexts are kept; the least
+    recently used ones (and any unused for ``idle_timeout`` seconds) are
+    evicted and transparently re-created on the next call::
+
+        fleet = Fleet(client_id='...', client_secret='...')
+        job_id = fleet.print('printer-1@print.epsonconnect.com', './file.pdf')
+        fleet.job_info('printer-1@print.epsonconnect.com', job_id)
+
+    Devices can be addressed by printer email or, once authenticated, by
+    device ID.
+    """
+
+    EC_BASE_URL = Client.EC_BASE_URL
+
+    def __init__(
+            self,
+            base_url='',
+            client_id='',
+            client_secret='',
+            transport: Transport = None,
+            token_store: TokenStore = None,
+            refresh_ratio: float = None,
+            retry_policy: RetryPolicy = None,
+            governor: Governor = None,
+            events: Events = None,
+            capability_cache: CapabilityCache = None,
+            check_capabilities: bool = False,
+            upload_cache: UploadCache = None,
+            image_optimizer: ImageOptimizer = None,
+            profiles=None,
+            pool_maxsize=10,
+            max_devices=1024,
+            idle_timeout=None,
+    ) -> None:
+        self._base_url = base_url or self.EC_BASE_URL
+        self._client_id, self._client_secret = _resolve_client_credentials(
+            client_id,
+            client_secret,
+        )
+
+        self._transport = transport or Transport(pool_maxsize=pool_maxsize)
+        self._token_store = token_store
+        self._refresh_ratio = refresh_ratio
+        self._retry_policy = retry_policy
+        self._governor = governor
+        self._events = events
+        if capability_cache is None:
+            capability_cache = CapabilityCache()
+        self._capability_cache = capability_cache
+        self._check_capabilities = check_capabilities
+        self._upload_cache = upload_cache
+        self._image_optimizer = image_optimizer
+        # Named settings, shared by every Printer handed out below.
+        self.profiles = profiles if isinstance(profiles, PrintProfiles) else PrintProfiles(profiles)
+
+        self._max_devices = max_devices
+        self._idle_timeout = idle_timeout
+
+        # printer email -> [AuthCtx, last used], least recently used first.
+        self._contexts = OrderedDict()
+        # printer email -> Future for auth contexts being created.
+        self._pending = {}
+        # device ID -> printer email. Kept when a context is evicted, so an
+        # evicted device can still be addressed by its ID.
+        self._emails = {}
+        self._lock = threading.Lock()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __len__(self):
+        return len(self._contexts)
+
+    def auth_ctx(self, device) -> AuthCtx:
+        """
+        Get the auth context for a printer email or device ID, authenticating if needed.
+        """
+        printer_email = self._emails.get(device, device)
+        now = time.monotonic()
+
+        with self._lock:
+            entry = self._contexts.get(printer_email)
+            if entry is not None:
+                entry[1] = now
+                self._contexts.move_to_end(printer_email)
+                return entry[0]
+
+            future = self._pending.get(printer_email)
+            creator = future is None
+            if creator:
+                future = self._pending[printer_email] = Future()
+
+        if not creator:
+            # Another thread is already authenticating this device.
+            return future.result()
+
+        try:
+            auth_ctx = self._create_auth_ctx(printer_email)
+        except BaseException as e:
+            with self._lock:
+                del self._pending[printer_email]
+            future.set_exception(e)
+            raise
+
+        with self._lock:
+            del self._pending[printer_email]
+            self._contexts[printer_email] = [auth_ctx, now]
+            self._emails[auth_ctx.device_id] = printer_email
+            evicted = self._evict(now)
+
+        for ctx in evicted:
+            ctx.close()
+
+        future.set_result(auth_ctx)
+        return auth_ctx
+
+    def _create_auth_ctx(self, printer_email) -> AuthCtx:
+        auth_ctx = AuthCtx(
+            self._base_url,
+            printer_email,
+            self._client_id,
+            self._client_secret,
+            transport=self._transport,
+            token_store=self._token_store,
+            refresh_ratio=self._refresh_ratio,
+            retry_policy=self._retry_policy,
+            governor=self._governor,
+            events=self._events,
+        )
+        # Only authenticated contexts are kept, and the device ID is needed
+        # to register them.
+        auth_ctx.warmup()
+        return auth_ctx
+
+    def _evict(self, now):
+        """
+        Drop least recently used and idle contexts. Must hold the lock.
+        """
+        evicted = []
+
+        while self._contexts:
+            printer_email, (auth_ctx, last_used) = next(iter(self._contexts.items()))
+
+            over_capacity = len(self._contexts) > self._max_devices
+            idle = self._idle_timeout is not None and now - last_used > self._idle_timeout
+            if not over_capacity and not idle:
+                break
+
+            del self._contexts[printer_email]
+            evicted.append(auth_ctx)
+
+        return evicted
+
+    def evict_idle(self):
+        """
+        Drop contexts that have not been used for ``idle_timeout`` seconds.
+        """
+        with self._lock:
+            evicted = self._evict(time.monotonic())
+
+        for auth_ctx in evicted:
+            auth_ctx.close()
+
+        return len(evicted)
+
+    def warmup(self, printer_emails, max_workers=8) -> dict:
+        """
+        Authenticate many devices concurrently.
+
+        :return: Mapping of printer email to the exception raised while
+            authenticating it, for devices that failed.
+        """
+        errors = {}
+
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            futures = {
+                printer_email: pool.submit(self.auth_ctx, printer_email)
+                for printer_email in printer_emails
+            }
+
+        for printer_email, future in futures.items():
+            error = future.exception()
+            if error is not None:
+                errors[printer_email] = error
+
+        return errors
+
+    def printer(self, device) -> Printer:
+        return Printer(
+            self.auth_ctx(device),
+            self._capability_cache,
+            self._check_capabilities,
+            upload_cache=self._upload_cache,
+            image_optimizer=self._image_optimizer,
+            profiles=self.profiles,
+        )
+
+    def scanner(self, device) -> Scanner:
+        return Scanner(self.auth_ctx(device))
+
+    def print(self, device, file_path, settings=None, extension=None) -> str:
+        """
+        Print file on a device.
+
+        :return: Job ID for print job.
+        """
+        return self.printer(device).print(file_path, settings, extension)
+
+    def job_info(self, device, job_id):
+        """
+        Get print job information from a device.
+        """
+        return self.printer(device).job_info(job_id)
+
+    def cancel_print(self, device, job_id, operated_by='user'):
+        """
+        Cancel print on a device.
+        """
+        return self.printer(device).cancel_print(job_id, operated_by)
+
+    def close(self):
+        """
+        Stop background token refreshes and release pooled connections.
+        """
+        with self._lock:
+            contexts = [entry[0] for entry in self._contexts.values()]
+            self._contexts.clear()
+            self._emails.clear()
+
+        for auth_ctx in contexts:
+            auth_ctx.close()
+
+        self._transport.close()
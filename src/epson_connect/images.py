@@ -0,0 +1,179 @@
+import asyncio
+import io
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+try:
+    from PIL import Image, ImageOps
+except ImportError:  # pragma: no cover
+    Image = ImageOps = None
+
+# Printable area is close enough to the paper size for choosing a resolution.
+MEDIA_SIZES_MM = {
+    'ms_a3': (297, 420),
+    'ms_a4': (210, 297),
+    'ms_a5': (148, 210),
+    'ms_a6': (105, 148),
+    'ms_b5': (182, 257),
+    'ms_tabloid': (279.4, 431.8),
+    'ms_letter': (215.9, 279.4),
+    'ms_legal': (215.9, 355.6),
+    'ms_halfletter': (139.7, 215.9),
+    'ms_kg': (101.6, 152.4),
+    'ms_l': (89, 127),
+    'ms_2l': (127, 178),
+    'ms_10x12': (254, 304.8),
+    'ms_8x10': (203.2, 254),
+    'ms_hivision': (101.6, 180.6),
+    'ms_5x8': (127, 203.2),
+    'ms_postcard': (100, 148),
+}
+
+QUALITY_DPI = {
+    'high': 600,
+    'normal': 300,
+    'draft': 150,
+}
+
+IMAGE_EXTENSIONS = {'.jpg', '.jpeg', '.png', '.bmp', '.gif', '.tiff'}
+
+_MISSING_PILLOW = 'Install Pillow to optimize images: pip install epson-connect[images]'
+
+
+def target_pixels(media_size: str, print_quality: str):
+    """
+    Largest useful ``(width, height)`` in pixels for a portrait page.
+    """
+    width_mm, height_mm = MEDIA_SIZES_MM[media_size]
+    dpi = QUALITY_DPI[print_quality]
+    return round(width_mm / 25.4 * dpi), round(height_mm / 25.4 * dpi)
+
+
+def optimize_image(content: bytes, media_size='ms_a4', print_quality='normal', quality=85) -> bytes:
+    """
+    Downsample an image to what the page can show and re-encode it as JPEG.
+
+    The image is rotated according to its EXIF orientation, flattened onto
+    white, shrunk (never enlarged) to fit the page at the print quality's
+    DPI in whichever orientation matches the image, and saved without
+    metadata. The result is always re-encoded, even where that makes a
+    JPEG larger, so no EXIF data (location, camera, ...) is ever uploaded.
+    """
+    if Image is None:
+        raise ImageOptimizationError(_MISSING_PILLOW)
+
+    with Image.open(io.BytesIO(content)) as image:
+        image = ImageOps.exif_transpose(image)
+
+        if image.mode in ('RGBA', 'LA') or (image.mode == 'P' and 'transparency' in image.info):
+            image = image.convert('RGBA')
+            background = Image.new('RGB', image.size, 'white')
+            background.paste(image, mask=image.getchannel('A'))
+            image = background
+        elif image.mode != 'RGB':
+            image = image.convert('RGB')
+
+        width, height = target_pixels(media_size, print_quality)
+        if image.width > image.height:
+            width, height = height, width
+        image.thumbnail((width, height), Image.LANCZOS)
+
+        out = io.BytesIO()
+        image.save(out, 'JPEG', quality=quality, optimize=True)
+
+    return out.getvalue()
+
+
+class ImageOptimizer:
+    """
+    Opt-in photo-mode preprocessing, run in a process pool.
+
+    Images printed with ``print_mode='photo'`` are downsampled to the media
+    size and print quality of the job and sent as JPEG. Conversions run in
+    worker processes so they do not hold up threads doing I/O::
+
+        ec = Client(..., image_optimizer=ImageOptimizer(quality=85))
+
+    Requires Pillow (``pip install epson-connect[images]``).
+    """
+
+    def __init__(self, quality: int = 85, max_workers: int = None, executor=None) -> None:
+        """
+        :param quality: JPEG quality, 1-95.
+        :param max_workers: Size of the process pool created on first use.
+        :param executor: Executor to run conversions in instead of a new process pool.
+        """
+        if Image is None:
+            raise ImageOptimizationError(_MISSING_PILLOW)
+
+        self.quality = quality
+        self._max_workers = max_workers
+        self._executor = executor
+        self._owns_executor = executor is None
+        self._lock = threading.Lock()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    @property
+    def executor(self):
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(max_workers=self._max_workers)
+            return self._executor
+
+    def wants(self, print_mode: str, extension: str) -> bool:
+        return print_mode == 'photo' and extension in IMAGE_EXTENSIONS
+
+    def variant(self, print_setting) -> tuple:
+        """
+        Hashable description of the conversion for ``print_setting``, for caching.
+        """
+        print_setting = print_setting or {}
+        return (
+            'photo',
+            print_setting.get('media_size') or 'ms_a4',
+            print_setting.get('print_quality') or 'normal',
+            self.quality,
+        )
+
+    def optimize(self, content: bytes, print_setting=None) -> bytes:
+        _, media_size, print_quality, quality = self.variant(print_setting)
+        future = self.executor.submit(optimize_image, content, media_size, print_quality, quality)
+        return future.result()
+
+    async def optimize_async(self, content: bytes, print_setting=None) -> bytes:
+        _, media_size, print_quality, quality = self.variant(print_setting)
+        return await asyncio.get_running_loop().run_in_executor(
+            self.executor,
+            optimize_image,
+            content,
+            media_size,
+            print_quality,
+            quality,
+        )
+
+    def close(self):
+        if self._owns_executor and self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+
+def read_content(file) -> bytes:
+    """
+    Whole contents of a path, file object or bytes-like object.
+    """
+    if isinstance(file, (str, os.PathLike)):
+        with open(file, 'rb') as f:
+            return f.read()
+    if hasattr(file, 'read'):
+        return file.read()
+    return bytes(file)
+
+
+class ImageOptimizationError(RuntimeError):
+    pass
@@ -0,0 +1,167 @@
+"""
+Ready-made subscribers that export request and token events.
+
+Subscribe one to ``events.default`` or to the ``Events`` passed to a client::
+
+    from epson_connect import events
+    from epson_connect.instrumentation import PrometheusSubscriber
+
+    events.subscribe(PrometheusSubscriber())
+"""
+from .events import RequestEvent, TokenEvent
+
+try:
+    import prometheus_client
+except ImportError:  # pragma: no cover
+    prometheus_client = None
+
+try:
+    from opentelemetry import trace
+except ImportError:  # pragma: no cover
+    trace = None
+
+_MISSING_PROMETHEUS = (
+    'prometheus-client is required for PrometheusSubscriber. '
+    'Install it with "pip install epson-connect[prometheus]".'
+)
+_MISSING_OPENTELEMETRY = (
+    'opentelemetry-api is required for OpenTelemetrySubscriber. '
+    'Install it with "pip install epson-connect[opentelemetry]".'
+)
+
+
+def _status_label(event: RequestEvent) -> str:
+    # Transport failures never got a status code.
+    return str(event.status) if event.status is not None else 'error'
+
+
+class PrometheusSubscriber:
+    """
+    Prometheus counters and histograms, labelled by method and endpoint template.
+    """
+
+    def __init__(self, registry=None, namespace: str = 'epson_connect') -> None:
+        """
+        :param registry: CollectorRegistry to register with; defaults to the global one.
+        :param namespace: Prefix for the metric names.
+        """
+        if prometheus_client is None:
+            raise ImportError(_MISSING_PROMETHEUS)
+
+        kwargs = {'namespace': namespace}
+        if registry is not None:
+            kwargs['registry'] = registry
+
+        labels = ['method', 'endpoint']
+        self.requests = prometheus_client.Counter(
+            'requests', 'API calls.', labels + ['status'], **kwargs,
+        )
+        self.retries = prometheus_client.Counter(
+            'request_retries', 'API call attempts beyond the first.', labels, **kwargs,
+        )
+        self.duration = prometheus_client.Histogram(
+            'request_duration_seconds', 'API call duration, retries included.', labels, **kwargs,
+        )
+        self.server_duration = prometheus_client.Histogram(
+            'request_server_seconds', 'Time from request sent to response headers.', labels,
+            **kwargs,
+        )
+        self.bytes_sent = prometheus_client.Counter(
+            'request_sent_bytes', 'Request body bytes.', labels, **kwargs,
+        )
+        self.bytes_received = prometheus_client.Counter(
+            'request_received_bytes', 'Response body bytes.', labels, **kwargs,
+        )
+        self.token_grants = prometheus_client.Counter(
+            'token_grants', 'Token grants.', ['grant_type', 'inline', 'outcome'], **kwargs,
+        )
+        self.token_duration = prometheus_client.Histogram(
+            'token_grant_duration_seconds', 'Token grant duration.', ['grant_type'], **kwargs,
+        )
+
+    def __call__(self, event):
+        if isinstance(event, RequestEvent):
+            self._request(event)
+        elif isinstance(event, TokenEvent):
+            self._token(event)
+
+    def _request(self, event: RequestEvent):
+        labels = (event.method, event.endpoint)
+        self.requests.labels(*labels, _status_label(event)).inc()
+        self.duration.labels(*labels).observe(event.duration)
+        if event.retries:
+            self.retries.labels(*labels).inc(event.retries)
+        if 'server' in event.timings:
+            self.server_duration.labels(*labels).observe(event.timings['server'])
+        if event.bytes_sent:
+            self.bytes_sent.labels(*labels).inc(event.bytes_sent)
+        if event.bytes_received:
+            self.bytes_received.labels(*labels).inc(event.bytes_received)
+
+    def _token(self, event: TokenEvent):
+        outcome = 'error' if event.error is not None else 'ok'
+        self.token_grants.labels(event.grant_type, str(event.inline).lower(), outcome).inc()
+        self.token_duration.labels(event.grant_type).observe(event.duration)
+
+
+class OpenTelemetrySubscriber:
+    """
+    One OpenTelemetry client span per API call and per token grant.
+
+    Spans are recorded when the event arrives, with the call's real start
+    and end times, as children of whatever span is current on the calling
+    thread or task.
+    """
+
+    def __init__(self, tracer=None) -> None:
+        """
+        :param tracer: Tracer to use; defaults to one from the global tracer provider.
+        """
+        if trace is None:
+            raise ImportError(_MISSING_OPENTELEMETRY)
+
+        self.tracer = tracer or trace.get_tracer('epson_connect')
+
+    def __call__(self, event):
+        if isinstance(event, RequestEvent):
+            self._request(event)
+        elif isinstance(event, TokenEvent):
+            self._token(event)
+
+    def _request(self, event: RequestEvent):
+        attributes = {
+            'http.request.method': event.method,
+            'url.template': event.endpoint,
+            'http.request.resend_count': event.retries,
+            'http.response.body.size': event.bytes_received,
+        }
+        if event.status is not None:
+            attributes['http.response.status_code'] = event.status
+        if event.bytes_sent is not None:
+            attributes['http.request.body.size'] = event.bytes_sent
+        for phase, seconds in event.timings.items():
+            attributes[f'epson_connect.{phase}_seconds'] = seconds
+
+        failed = event.error is not None or (event.status is not None and event.status >= 400)
+        self._span(f'{event.method} {event.endpoint}', event, attributes, failed)
+
+    def _token(self, event: TokenEvent):
+        attributes = {
+            'epson_connect.grant_type': event.grant_type,
+            'epson_connect.inline': event.inline,
+        }
+        self._span('epson_connect token grant', event, attributes, event.error is not None)
+
+    def _span(self, name, event, attributes, failed):
+        start = int(event.started_at * 1e9)
+        span = self.tracer.start_span(
+            name,
+            kind=trace.SpanKind.CLIENT,
+            attributes=attributes,
+            start_time=start,
+        )
+        if event.error is not None:
+            span.record_exception(event.error)
+        if failed:
+            span.set_status(trace.Status(trace.StatusCode.ERROR))
+        span.end(end_time=start + int(event.duration * 1e9))
@@ -0,0 +1,79 @@
+import io
+import os
+
+try:
+    import pypdf
+except ImportError:  # pragma: no cover
+    pypdf = None
+
+_MISSING_PYPDF = 'Install pypdf to split PDFs: pip install epson-connect[pdf]'
+
+
+def page_ranges(page_count: int, pages_per_chunk: int):
+    """
+    1-based, inclusive ``(first, last)`` page ranges covering a document.
+    """
+    if pages_per_chunk < 1:
+        raise ValueError('pages_per_chunk must be at least 1')
+
+    return [
+        (first, min(first + pages_per_chunk - 1, page_count))
+        for first in range(1, page_count + 1, pages_per_chunk)
+    ]
+
+
+class PdfSplitter:
+    """
+    Split a PDF into documents of at most ``pages_per_chunk`` pages.
+
+    Chunks are written one at a time as they are iterated, so only the
+    source document and the current chunk are held in memory::
+
+        for first, last, content in PdfSplitter('./manual.pdf', 50):
+            ...
+
+    Requires pypdf (``pip install epson-connect[pdf]``).
+    """
+
+    def __init__(self, source, pages_per_chunk: int = 50) -> None:
+        """
+        :param source: Path, binary file object, or bytes-like object.
+        """
+        if pypdf is None:
+            raise PdfError(_MISSING_PYPDF)
+
+        if isinstance(source, (bytes, bytearray, memoryview)):
+            source = io.BytesIO(source)
+        elif isinstance(source, os.PathLike):
+            source = os.fspath(source)
+
+        try:
+            self._reader = pypdf.PdfReader(source)
+            self.page_count = len(self._reader.pages)
+        except pypdf.errors.PdfReadError as e:
+            raise PdfError(f'Can not read PDF: {e}') from e
+
+        self.ranges = page_ranges(self.page_count, pages_per_chunk)
+
+    def __len__(self):
+        return len(self.ranges)
+
+    def __iter__(self):
+        for first, last in self.ranges:
+            yield first, last, self.chunk(first, last)
+
+    def chunk(self, first: int, last: int) -> bytes:
+        """
+        A new PDF with pages ``first`` to ``last`` (1-based, inclusive).
+        """
+        writer = pypdf.PdfWriter()
+        for index in range(first - 1, last):
+            writer.add_page(self._reader.pages[index])
+
+        out = io.BytesIO()
+        writer.write(out)
+        return out.getvalue()
+
+
+class PdfError(ValueError):
+    pass
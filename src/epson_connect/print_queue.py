@@ -0,0 +1,427 @@
+import asyncio
+import contextlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+
+from .printer import _validate_extension
+from .printer_settings import merge_with_default_settings, validate_settings
+from .upload import UploadSource
+
+logger = logging.getLogger(__name__)
+
+QUEUED = 'queued'
+CREATING = 'creating'
+CREATED = 'created'
+UPLOADED = 'uploaded'
+EXECUTING = 'executing'
+DONE = 'done'
+FAILED = 'failed'
+
+STAGES = (QUEUED, CREATING, CREATED, UPLOADED, EXECUTING, DONE, FAILED)
+
+_SCHEMA = '''
+CREATE TABLE IF NOT EXISTS print_jobs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    source TEXT,
+    content BLOB,
+    extension TEXT NOT NULL,
+    settings TEXT NOT NULL,
+    stage TEXT NOT NULL,
+    job_id TEXT,
+    upload_uri TEXT,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    error TEXT,
+    claimed INTEGER NOT NULL DEFAULT 0,
+    available_at REAL NOT NULL DEFAULT 0,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS print_jobs_pending ON print_jobs (claimed, stage, available_at, id);
+'''
+
+_COLUMNS = (
+    'id, source, content, extension, settings, stage, job_id, upload_uri, attempts, error'
+)
+
+_INTERRUPTED = 'Interrupted while executing; not executed again in case it printed.'
+
+
+class PrintQueue:
+    """
+    Durable print queue backed by SQLite.
+
+    Every stage of a print (job created, file uploaded, print executed) is
+    recorded before moving on, so after a crash each job resumes where it
+    stopped instead of being created or printed twice. A job interrupted
+    while executing is never executed again: it is marked done if the API
+    reports it past pending, and failed otherwise, since the interrupted
+    call may still have started the print::
+
+        queue = PrintQueue('prints.db', client.printer, max_workers=4)
+        queue.enqueue_many(['a.pdf', 'b.pdf'])
+        queue.start()
+        queue.drain()
+
+    One process should use a database file at a time. Sources are stored by
+    path; bytes-like sources are stored in the database.
+    """
+
+    def __init__(self, path, printer=None, max_workers: int = 4, max_attempts: int = 3) -> None:
+        """
+        :param path: SQLite database file, created if missing.
+        :param printer: Printer the worker threads print with.
+        :param max_workers: Worker threads started by ``start``.
+        :param max_attempts: Attempts per job before it is marked failed.
+        """
+        self._printer = printer
+        self.max_workers = max_workers
+        self.max_attempts = max_attempts
+
+        self._db = sqlite3.connect(os.fspath(path), check_same_thread=False, isolation_level=None)
+        self._db.row_factory = sqlite3.Row
+        self._db.execute('PRAGMA journal_mode=WAL')
+        self._db.execute('PRAGMA synchronous=NORMAL')
+        self._db.executescript(_SCHEMA)
+
+        self._lock = threading.Lock()
+        self._changed = threading.Condition(self._lock)
+        self._stopping = threading.Event()
+        self._workers = []
+
+        # Claims belong to workers of a previous process that is gone now.
+        self._execute('UPDATE print_jobs SET claimed = 0 WHERE claimed = 1')
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _execute(self, sql, params=()):
+        with self._lock:
+            return self._db.execute(sql, params).fetchall()
+
+    @contextlib.contextmanager
+    def _transaction(self):
+        # Callers hold self._lock.
+        self._db.execute('BEGIN IMMEDIATE')
+        try:
+            yield
+            self._db.execute('COMMIT')
+        except BaseException:
+            # A failed COMMIT may already have ended the transaction.
+            if self._db.in_transaction:
+                self._db.execute('ROLLBACK')
+            raise
+
+    def enqueue(self, file, settings=None, extension=None) -> int:
+        """
+        Add one file; settings are validated now so bad jobs fail fast.
+
+        :return: Queue ID of the job.
+        """
+        return self.enqueue_many([(file, extension)], settings)[0]
+
+    def enqueue_many(self, files, settings=None) -> list:
+        """
+        Add many files in a single transaction.
+
+        :param files: Iterable of paths, bytes-like objects, or ``(source, extension)`` tuples.
+        :return: Queue IDs of the jobs, in order.
+        """
+        now = time.time()
+        rows = []
+        for file in files:
+            source, extension = file if isinstance(file, tuple) else (file, None)
+            extension = UploadSource(source, extension).extension
+            _validate_extension(extension)
+
+            job_settings = merge_with_default_settings(settings)
+            validate_settings(job_settings)
+
+            if isinstance(source, (str, os.PathLike)):
+                path, content = os.path.abspath(source), None
+            elif isinstance(source, (bytes, bytearray, memoryview)):
+                path, content = None, bytes(source)
+            else:
+                raise PrintQueueError('Only paths and bytes-like objects can be queued.')
+
+            rows.append((path, content, extension, json.dumps(job_settings), QUEUED, now, now))
+
+        with self._changed:
+            with self._transaction():
+                # AUTOINCREMENT hands out consecutive IDs after the last one used.
+                last = self._db.execute(
+                    "SELECT seq FROM sqlite_sequence WHERE name = 'print_jobs'"
+                ).fetchone()
+                first = (last[0] if last else 0) + 1
+                self._db.executemany(
+                    'INSERT INTO print_jobs '
+                    '(source, content, extension, settings, stage, created_at, updated_at) '
+                    'VALUES (?, ?, ?, ?, ?, ?, ?)',
+                    rows,
+                )
+            self._changed.notify_all()
+
+        return list(range(first, first + len(rows)))
+
+    def get(self, queue_id) -> dict:
+        """
+        Current state of a job, without its stored content.
+        """
+        rows = self._execute(
+            'SELECT id, source, extension, stage, job_id, attempts, error '
+            'FROM print_jobs WHERE id = ?',
+            (queue_id,),
+        )
+        return dict(rows[0]) if rows else None
+
+    def stats(self) -> dict:
+        """
+        Number of jobs per stage.
+        """
+        counts = dict.fromkeys(STAGES, 0)
+        for stage, count in self._execute('SELECT stage, COUNT(*) FROM print_jobs GROUP BY stage'):
+            counts[stage] = count
+        return counts
+
+    def pending(self) -> int:
+        return self._execute(
+            'SELECT COUNT(*) FROM print_jobs WHERE stage NOT IN (?, ?)',
+            (DONE, FAILED),
+        )[0][0]
+
+    def _claim(self):
+        with self._lock, self._transaction():
+            row = self._db.execute(
+                f'SELECT {_COLUMNS} FROM print_jobs '
+                'WHERE claimed = 0 AND stage NOT IN (?, ?) AND available_at <= ? '
+                'ORDER BY id LIMIT 1',
+                (DONE, FAILED, time.time()),
+            ).fetchone()
+            if row is not None:
+                self._db.execute('UPDATE print_jobs SET claimed = 1 WHERE id = ?', (row['id'],))
+        return row
+
+    def _advance(self, queue_id, stage, **fields):
+        fields['stage'] = stage
+        fields['updated_at'] = time.time()
+        if stage in (DONE, FAILED):
+            fields['claimed'] = 0
+            fields['content'] = None
+
+        assignments = ', '.join(f'{name} = ?' for name in fields)
+        with self._changed:
+            self._db.execute(
+                f'UPDATE print_jobs SET {assignments} WHERE id = ?',
+                (*fields.values(), queue_id),
+            )
+            if stage in (DONE, FAILED):
+                self._changed.notify_all()
+
+    def _failed(self, row, error):
+        attempts = row['attempts'] + 1
+        if attempts >= self.max_attempts:
+            logger.warning('Print job %s failed: %r', row['id'], error)
+            self._advance(row['id'], FAILED, attempts=attempts, error=repr(error))
+            return
+
+        logger.info('Print job %s failed, retrying: %r', row['id'], error)
+        self._execute(
+            'UPDATE print_jobs SET claimed = 0, attempts = ?, error = ?, available_at = ? '
+            'WHERE id = ?',
+            (attempts, repr(error), time.time() + min(2 ** attempts, 60), row['id']),
+        )
+
+    def _interrupted(self, queue_id, job_info):
+        if not _still_pending(job_info):
+            # The crash happened after the print was executed.
+            self._advance(queue_id, DONE)
+            return
+
+        # Executing again could print twice, so leave it to whoever reviews
+        # failed jobs to check the printer and re-queue.
+        logger.warning('Print job %s was interrupted while executing.', queue_id)
+        self._advance(queue_id, FAILED, error=_INTERRUPTED)
+
+    def process(self, printer=None) -> bool:
+        """
+        Run the next available job through the remaining stages.
+
+        :return: False if no job was available.
+        """
+        row = self._claim()
+        if row is None:
+            return False
+
+        try:
+            self._run(printer or self._printer, row)
+        except Exception as e:
+            self._failed(row, e)
+        return True
+
+    def _run(self, printer, row):
+        queue_id, stage, job_id = row['id'], row['stage'], row['job_id']
+        settings = json.loads(row['settings'])
+
+        if stage == EXECUTING:
+            self._interrupted(queue_id, printer.job_info(job_id))
+            return
+
+        if stage in (QUEUED, CREATING):
+            self._advance(queue_id, CREATING)
+            job = printer.print_setting(settings)
+            job_id = job['id']
+            self._advance(queue_id, CREATED, job_id=job_id, upload_uri=job['upload_uri'])
+            row = dict(row, upload_uri=job['upload_uri'])
+            stage = CREATED
+
+        if stage == CREATED:
+            printer.upload_file(
+                row['upload_uri'],
+                _source(row),
+                settings['print_mode'],
+                row['extension'],
+            )
+            self._advance(queue_id, UPLOADED)
+
+        self._advance(queue_id, EXECUTING)
+        printer.execute_print(job_id)
+        self._advance(queue_id, DONE)
+
+    async def process_async(self, printer) -> bool:
+        """
+        asyncio version of ``process`` for an AsyncPrinter.
+        """
+        row = self._claim()
+        if row is None:
+            return False
+
+        try:
+            await self._run_async(printer, row)
+        except Exception as e:
+            self._failed(row, e)
+        return True
+
+    async def _run_async(self, printer, row):
+        queue_id, stage, job_id = row['id'], row['stage'], row['job_id']
+        settings = json.loads(row['settings'])
+
+        if stage == EXECUTING:
+            self._interrupted(queue_id, await printer.job_info(job_id))
+            return
+
+        if stage in (QUEUED, CREATING):
+            self._advance(queue_id, CREATING)
+            job = await printer.print_setting(settings)
+            job_id = job['id']
+            self._advance(queue_id, CREATED, job_id=job_id, upload_uri=job['upload_uri'])
+            row = dict(row, upload_uri=job['upload_uri'])
+            stage = CREATED
+
+        if stage == CREATED:
+            await printer.upload_file(
+                row['upload_uri'],
+                _source(row),
+                settings['print_mode'],
+                row['extension'],
+            )
+            self._advance(queue_id, UPLOADED)
+
+        self._advance(queue_id, EXECUTING)
+        await printer.execute_print(job_id)
+        self._advance(queue_id, DONE)
+
+    def start(self):
+        """
+        Start ``max_workers`` threads that print jobs as they are queued.
+        """
+        if self._printer is None:
+            raise PrintQueueError('A printer is needed to start workers.')
+
+        self._stopping.clear()
+        for i in range(self.max_workers - len(self._workers)):
+            worker = threading.Thread(
+                target=self._work,
+                name=f'epson-connect-print-queue-{i}',
+                daemon=True,
+            )
+            worker.start()
+            self._workers.append(worker)
+
+    def _work(self):
+        while not self._stopping.is_set():
+            if self.process():
+                continue
+            with self._changed:
+                # Woken by new jobs; the timeout picks up jobs due for a retry.
+                self._changed.wait(1.0)
+
+    def stop(self, wait=True):
+        """
+        Stop the workers after the jobs they are working on.
+        """
+        self._stopping.set()
+        with self._changed:
+            self._changed.notify_all()
+
+        if wait:
+            for worker in self._workers:
+                worker.join()
+        self._workers = []
+
+    def drain(self, timeout: float = None) -> bool:
+        """
+        Block until every queued job is done or failed.
+
+        :return: False if jobs are still pending after ``timeout`` seconds.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._changed:
+            while True:
+                pending = self._db.execute(
+                    'SELECT COUNT(*) FROM print_jobs WHERE stage NOT IN (?, ?)',
+                    (DONE, FAILED),
+                ).fetchone()[0]
+                if not pending:
+                    return True
+
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._changed.wait(1.0 if remaining is None else min(remaining, 1.0))
+
+    async def drain_async(self, printer, concurrency: int = 16):
+        """
+        Print every queued job with an AsyncPrinter, ``concurrency`` at a time.
+        """
+        async def work():
+            while True:
+                if await self.process_async(printer):
+                    continue
+                if not self.pending():
+                    return
+                # Remaining jobs are claimed by other workers or waiting for a retry.
+                await asyncio.sleep(0.1)
+
+        await asyncio.gather(*(work() for _ in range(concurrency)))
+
+    def close(self):
+        self.stop()
+        self._db.close()
+
+
+def _source(row):
+    return row['content'] if row['content'] is not None else row['source']
+
+
+def _still_pending(job_info) -> bool:
+    return job_info.get('status') in ('pending', 'pending_held')
+
+
+class PrintQueueError(ValueError):
+    pass
@@ -1,8 +1,23 @@
-import pathlib
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from urllib.parse import parse_qs, urlencode, urlparse
 
 from .authenticate import AuthCtx
-from .printer_settings import merge_with_default_settings, validate_settings
+from .batch import (BatchResult, PageRangeResult, PrintJobResult, PrintReport,
+                    SplitPrintResult)
+from .capabilities import Capabilities, CapabilityCache
+from .events import TokenEvent, endpoint_template, recording
+from .images import ImageOptimizer, read_content
+from .pdf import PdfSplitter
+from .printer_settings import (PrintProfiles, PrintSettings,
+                               merge_with_default_settings, validate_settings)
+from .upload import UploadSource
+from .upload_cache import UploadCache
+
+logger = logging.getLogger(__name__)
 
 
 class Printer:
@@ -27,21 +42,66 @@ class Printer:
         'operator',
     }
 
-    def __init__(self, auth_ctx: AuthCtx) -> None:
+    def __init__(
+            self,
+            auth_ctx: AuthCtx,
+            capability_cache: CapabilityCache = None,
+            check_capabilities: bool = False,
+            upload_cache: UploadCache = None,
+            image_optimizer: ImageOptimizer = None,
+            profiles: PrintProfiles = None,
+    ) -> None:
+        """
+        :param capability_cache: Cache for capability responses, shared between printers.
+        :param check_capabilities: Check job settings against the device's
+            capabilities before creating a job.
+        :param upload_cache: Serve repeatedly printed files from memory.
+        :param image_optimizer: Downsample and transcode images printed in photo mode.
+        :param profiles: Named settings that can be passed by name wherever settings are taken.
+        """
         self._auth_ctx = auth_ctx
+        if capability_cache is None:
+            capability_cache = CapabilityCache()
+        self._capability_cache = capability_cache
+        self._check_capabilities = check_capabilities
+        self._upload_cache = upload_cache
+        self._image_optimizer = image_optimizer
+        self.profiles = profiles if profiles is not None else PrintProfiles()
 
     @property
     def device_id(self):
         return self._auth_ctx.device_id
 
-    def capabilities(self, mode):
+    def capabilities(self, mode, refresh=False):
         """
         Get device print capabilities.
+
+        Responses are cached per device and mode; pass ``refresh=True`` to
+        fetch them again.
         """
+        return self._capabilities(mode, refresh).raw
+
+    def _capabilities(self, mode, refresh=False) -> Capabilities:
+        if not refresh:
+            capabilities = self._capability_cache.get(self.device_id, mode)
+            if capabilities is not None:
+                return capabilities
+
         method = 'GET'
         path = f'/api/1/printing/printers/{self.device_id}/capability/{mode}'
 
-        return self._auth_ctx.send(method, path)
+        return self._capability_cache.set(self.device_id, mode, self._auth_ctx.send(method, path))
+
+    def check_settings(self, settings):
+        """
+        Validate settings against the device's (cached) capabilities.
+
+        Raises PrintSettingError for combinations the device does not support,
+        such as borderless printing on a size that can not be printed borderless.
+        """
+        settings = merge_with_default_settings(self.profiles.resolve(settings))
+        validate_settings(settings)
+        self._capabilities(settings['print_mode']).validate(settings)
 
     def print_setting(self, settings) -> dict:
         """
@@ -50,42 +110,42 @@ class Printer:
         method = 'POST'
         path = f'/api/1/printing/printers/{self.device_id}/jobs'
 
-        validate_settings(settings)
+        settings = self.profiles.resolve(settings)
+        if self._check_capabilities:
+            self.check_settings(settings)
+        elif not isinstance(settings, PrintSettings):
+            validate_settings(settings)
 
+        if isinstance(settings, PrintSettings):
+            # Validated and encoded up front; only the job name is added.
+            return self._auth_ctx.send(method, path, data=settings.body())
         return self._auth_ctx.send(method, path, json=settings)
 
-    def upload_file(self, upload_uri: str, file_path: str, print_mode: str) -> None:
+    def upload_file(self, upload_uri: str, file_path, print_mode: str, extension=None) -> None:
         """
         Upload file to be printed.
-        """
-        # Get extension from file path.
-        extension = pathlib.Path(file_path).suffix.lower()
-        if extension[1:] not in self.VALID_EXTENSIONS:
-            raise PrinterError(f'{extension} is not a valid printing extension.')
 
-        o = urlparse(upload_uri)
-        q_dict = parse_qs(o.query)
-        q_dict = {
-            'Key': q_dict['Key'][0],
-            'File': f'1{extension}',
-        }
-        o = o._replace(query=urlencode(q_dict))
-        path = o.path + '?' + o.query
+        The file is streamed from disk rather than read into memory.
 
-        content_type = 'application/octet-stream'
-        if print_mode == 'photo':
-            content_type = 'image/jpeg'
+        :param file_path: Path, binary file object, or bytes-like object to upload.
+        :param extension: File extension, required for sources without a file name.
+        """
+        source = UploadSource(file_path, extension)
+        _validate_extension(source.extension)
+        if self._upload_cache is not None:
+            source = self._upload_cache.source(file_path, source.extension)
 
-        with open(file_path, 'rb') as fp:
-            data = fp.read()
+        with source:
+            path = _upload_path(upload_uri, source.extension)
 
-        headers = {
-            'Content-Type': content_type,
-            'Content-Length': str(len(data)),
-        }
+            headers = {
+                'Content-Type': _upload_content_type(print_mode),
+                'Content-Length': str(source.length),
+            }
 
-        method = 'POST'
-        self._auth_ctx.send(method, path, data=data, headers=headers)
+            method = 'POST'
+            # Re-uploading to the same Key replaces the file, so retries are safe.
+            self._auth_ctx.send(method, path, data=source.body, headers=headers, idempotent=True)
 
     def execute_print(self, job_id):
         """
@@ -95,19 +155,199 @@ class Printer:
         path = f'/api/1/printing/printers/{self.device_id}/jobs/{job_id}/print'
         self._auth_ctx.send(method, path)
 
-    def print(self, file_path, settings=None) -> str:
+    def print(self, file_path, settings=None, extension=None, detailed=False):
         """
         Print file.
 
+        :param file_path: Path, binary file object, or bytes-like object to print.
+        :param extension: File extension, required for sources without a file name.
+        :param detailed: Return a PrintReport with per-stage timings instead of the job ID.
         :return: Job ID for print job.
         """
-        settings = merge_with_default_settings(settings)
+        if not detailed:
+            return self._print(file_path, settings, extension, _no_lap)
+
+        with recording() as events:
+            stages = _Stages(events)
+            job_id = self._print(file_path, settings, extension, stages.lap)
+        return stages.finish(job_id)
+
+    def _print(self, file_path, settings, extension, lap) -> str:
+        # Fail before creating a job that could never be printed.
+        _validate_extension(UploadSource(file_path, extension).extension)
+
+        settings = self.profiles.resolve(settings)
+        if not isinstance(settings, PrintSettings):
+            settings = merge_with_default_settings(settings)
+        file_path, extension = self._optimize_photo(file_path, extension, settings)
+        lap('prepare')
 
         job_data = self.print_setting(settings)
-        self.upload_file(job_data['upload_uri'], file_path, settings['print_mode'])
+        lap('create')
+        self.upload_file(job_data['upload_uri'], file_path, settings['print_mode'], extension)
+        lap('upload')
         self.execute_print(job_data['id'])
+        lap('execute')
         return job_data['id']
 
+    def _optimize_photo(self, file_path, extension, settings):
+        optimizer = self._image_optimizer
+        if optimizer is None:
+            return file_path, extension
+        source_extension = UploadSource(file_path, extension).extension
+        if not optimizer.wants(settings['print_mode'], source_extension):
+            return file_path, extension
+
+        # Fail on bad settings before spending CPU on the conversion.
+        if not isinstance(settings, PrintSettings):
+            validate_settings(settings)
+        print_setting = settings.get('print_setting')
+
+        cache = self._upload_cache
+        if cache is not None and isinstance(file_path, (str, os.PathLike)):
+            digest, content = cache.load(file_path)
+            if digest is not None:
+                optimized = cache.derive(
+                    digest,
+                    optimizer.variant(print_setting),
+                    lambda content: optimizer.optimize(content, print_setting),
+                    content,
+                )
+                return optimized, '.jpg'
+
+        return optimizer.optimize(read_content(file_path), print_setting), '.jpg'
+
+    def print_many(self, files, settings=None, max_workers=4, detailed=False) -> BatchResult:
+        """
+        Print many files concurrently.
+
+        Up to ``max_workers`` jobs are in flight at once, so job creation,
+        upload and execution of different files overlap. A failing file does
+        not abort the batch; its error is recorded in its result instead.
+
+        :param files: Iterable of paths, file objects, or ``(source, extension)`` tuples.
+        :param settings: Settings applied to every job; each job gets its own job name.
+        :param detailed: Attach a PrintReport to every result; see BatchResult.summary.
+        :return: Per-file results in submission order, with throughput stats.
+        """
+        start = time.monotonic()
+
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            futures = [pool.submit(self._print_one, file, settings, detailed) for file in files]
+            results = [future.result() for future in futures]
+
+        return BatchResult(results, time.monotonic() - start)
+
+    def _print_one(self, file, settings, detailed=False) -> PrintJobResult:
+        source, extension = file if isinstance(file, tuple) else (file, None)
+        result = PrintJobResult(file)
+
+        start = time.monotonic()
+        try:
+            if detailed:
+                result.report = self.print(source, settings, extension, detailed=True)
+                result.job_id = result.report.job_id
+            else:
+                result.job_id = self.print(source, settings, extension)
+        except Exception as e:
+            result.error = e
+        result.elapsed = time.monotonic() - start
+
+        return result
+
+    def print_pdf(
+            self,
+            file_path,
+            settings=None,
+            pages_per_job: int = 50,
+            max_workers: int = 4,
+            progress=None,
+    ) -> SplitPrintResult:
+        """
+        Print a large PDF as a series of smaller jobs.
+
+        The document is split into ranges of ``pages_per_job`` pages. Jobs for
+        the ranges are created and uploaded in parallel, and each is executed
+        as soon as it and every range before it are uploaded, so the first
+        pages print while later ones are still uploading and pages come out
+        in order. If a range fails, the ranges before it are still printed,
+        and jobs already created for the ranges after it are cancelled.
+
+        Requires pypdf (``pip install epson-connect[pdf]``).
+
+        :param progress: Called as ``progress(stage, chunk)`` with stage
+            ``'uploaded'`` or ``'printed'`` and the range's PageRangeResult.
+        :return: Per-range results in page order.
+        """
+        start = time.monotonic()
+
+        settings = merge_with_default_settings(self.profiles.resolve(settings))
+        validate_settings(settings)
+
+        splitter = PdfSplitter(file_path, pages_per_job)
+        result = SplitPrintResult(page_count=splitter.page_count)
+        sequencer = _InOrder(self.execute_print, result.chunks, progress)
+
+        # Bound the split chunks held in memory while waiting for a worker.
+        window = threading.BoundedSemaphore(max_workers * 2)
+
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            for index, (first, last, content) in enumerate(splitter):
+                window.acquire()
+                if sequencer.failed_at is not None:
+                    window.release()
+                    break
+
+                chunk = PageRangeResult(first, last)
+                result.chunks.append(chunk)
+
+                job_settings = dict(settings)
+                job_settings['job_name'] = _range_job_name(settings['job_name'], first, last)
+
+                future = pool.submit(
+                    self._print_range, index, chunk, job_settings, content, sequencer,
+                )
+                future.add_done_callback(lambda _: window.release())
+
+        for chunk in result.chunks:
+            if chunk.printed:
+                continue
+            if chunk.error is None:
+                chunk.error = PrinterError('Not printed because an earlier page range failed.')
+            if chunk.job_id is not None:
+                self._cancel_unprinted(chunk)
+
+        result.elapsed = time.monotonic() - start
+        return result
+
+    def _cancel_unprinted(self, chunk):
+        try:
+            self.cancel_print(chunk.job_id)
+        except Exception:
+            logger.exception(
+                'Could not cancel job %s for pages %s-%s.',
+                chunk.job_id, chunk.first_page, chunk.last_page,
+            )
+        else:
+            chunk.cancelled = True
+
+    def _print_range(self, index, chunk, settings, content, sequencer):
+        if sequencer.skips(index):
+            return
+
+        try:
+            job_data = self.print_setting(settings)
+            chunk.job_id = job_data['id']
+            self.upload_file(job_data['upload_uri'], content, settings['print_mode'], '.pdf')
+        except Exception as e:
+            sequencer.fail(index, e)
+            return
+
+        chunk.uploaded = True
+        if sequencer.progress is not None:
+            sequencer.progress('uploaded', chunk)
+        sequencer.ready(index)
+
     def cancel_print(self, job_id, operated_by='user'):
         """
         Cancel print.
@@ -115,12 +355,10 @@ class Printer:
         method = 'POST'
         path = f'/api/1/printing/printers/{self.device_id}/jobs/{job_id}/cancel'
 
-        if operated_by not in self.VALID_OPERATORS:
-            raise PrinterError(f'Invalid "operated_by" value {operated_by}')
+        _validate_operator(operated_by)
 
         job_status = self.job_info(job_id).get('status')
-        if job_status not in ('pending', 'pending_held'):
-            raise PrinterError(f'Can not cancel job with status {job_status}')
+        _validate_cancelable(job_status)
 
         data = {
             'operated_by': operated_by,
@@ -159,5 +397,134 @@ class Printer:
         return self._auth_ctx.send(method, path, json=data)
 
 
+def _validate_extension(extension: str):
+    if extension[1:] not in Printer.VALID_EXTENSIONS:
+        raise PrinterError(f'{extension} is not a valid printing extension.')
+
+
+def _upload_path(upload_uri: str, extension: str) -> str:
+    o = urlparse(upload_uri)
+    q_dict = parse_qs(o.query)
+    q_dict = {
+        'Key': q_dict['Key'][0],
+        'File': f'1{extension}',
+    }
+    o = o._replace(query=urlencode(q_dict))
+    return o.path + '?' + o.query
+
+
+def _upload_content_type(print_mode: str) -> str:
+    if print_mode == 'photo':
+        return 'image/jpeg'
+    return 'application/octet-stream'
+
+
+def _validate_operator(operated_by):
+    if operated_by not in Printer.VALID_OPERATORS:
+        raise PrinterError(f'Invalid "operated_by" value {operated_by}')
+
+
+def _validate_cancelable(job_status):
+    if job_status not in ('pending', 'pending_held'):
+        raise PrinterError(f'Can not cancel job with status {job_status}')
+
+
+def _range_job_name(job_name, first, last):
+    suffix = f' (pages {first}-{last})'
+    return job_name[:256 - len(suffix)] + suffix
+
+
+_TOKEN_ENDPOINT = endpoint_template(AuthCtx.TOKEN_PATH)
+
+
+def _no_lap(stage):
+    pass
+
+
+class _Stages:
+    """
+    Builds a PrintReport from the stage laps and recorded events of one print.
+    """
+
+    def __init__(self, events) -> None:
+        self._events = events
+        self._seen = 0
+        self._started = self._last = time.monotonic()
+        self.report = PrintReport()
+
+    def lap(self, stage):
+        """
+        End ``stage``; it covers the time and events since the previous lap.
+        """
+        now = time.monotonic()
+        report = self.report
+        report.stages[stage] = now - self._last
+        report.retries[stage] = 0
+        self._last = now
+
+        events, self._seen = self._events[self._seen:], len(self._events)
+        for event in events:
+            if isinstance(event, TokenEvent):
+                # Recorded events come from this thread, so the grant held it up.
+                report.inline_token_refresh = True
+                report.token_seconds += event.duration
+                continue
+            report.retries[stage] += event.retries
+            # The upload URI comes from the API, so go by stage rather than path.
+            if stage == 'upload' and event.endpoint != _TOKEN_ENDPOINT:
+                report.upload_bytes += event.bytes_sent or 0
+
+    def finish(self, job_id) -> PrintReport:
+        self.report.job_id = job_id
+        self.report.elapsed = time.monotonic() - self._started
+        return self.report
+
+
+class _InOrder:
+    """
+    Executes uploaded page ranges strictly in page order, up to the first
+    range that failed.
+    """
+
+    def __init__(self, execute, chunks, progress):
+        self.progress = progress
+        # Lowest index of a failed range; ranges before it still print.
+        self.failed_at = None
+        self._execute = execute
+        self._chunks = chunks
+        self._next = 0
+        self._ready = set()
+        self._lock = threading.Lock()
+
+    def ready(self, index):
+        # Whichever worker completes the next range executes it, plus any
+        # ranges after it that were already waiting.
+        with self._lock:
+            self._ready.add(index)
+            while self._next in self._ready and not self.skips(self._next):
+                chunk = self._chunks[self._next]
+                try:
+                    self._execute(chunk.job_id)
+                except Exception as e:
+                    chunk.error = e
+                    self.failed_at = self._next
+                    return
+
+                chunk.printed = True
+                self._next += 1
+                if self.progress is not None:
+                    self.progress('printed', chunk)
+
+    def fail(self, index, error):
+        with self._lock:
+            self._chunks[index].error = error
+            if self.failed_at is None or index < self.failed_at:
+                self.failed_at = index
+
+    def skips(self, index) -> bool:
+        failed_at = self.failed_at
+        return failed_at is not None and index >= failed_at
+
+
 class PrinterError(ValueError):
     pass
@@ -1,5 +1,7 @@
+import json
 import random
 import string
+from collections.abc import Mapping
 
 VALID_PRINT_MODES = {
     'document',
@@ -61,17 +63,35 @@ VALID_TWO_SIDE = {
 }
 
 
-def merge_with_default_settings(settings=None):
-    settings = settings or {}
+DEFAULT_PRINT_MODE = 'document'
+
+DEFAULT_PRINT_SETTING = {
+    'media_size': 'ms_a4',
+    'media_type': 'mt_plainpaper',
+    'borderless': False,
+    'print_quality': 'normal',
+    'source': 'auto',
+    'color_mode': 'color',
+    '2_sided': 'none',
+    'reverse_order': False,
+    'copies': 1,
+    'collate': True,
+}
 
-    job_name = settings.get('job_name') or ''
-    if not job_name:
-        # Generate random name if one is not given.
-        job_name = 'job-' + ''.join(random.choice(string.ascii_letters) for _ in range(8))
 
-    settings['job_name'] = job_name
+def generate_job_name() -> str:
+    return 'job-' + ''.join(random.choices(string.ascii_letters, k=8))
+
+
+def merge_with_default_settings(settings=None):
+    """
+    A new settings dict with defaults filled in; ``settings`` is not modified.
+    """
+    settings = dict(settings) if settings else {}
 
-    settings['print_mode'] = settings.get('print_mode') or 'document'
+    # Generate random name if one is not given.
+    settings['job_name'] = settings.get('job_name') or generate_job_name()
+    settings['print_mode'] = settings.get('print_mode') or DEFAULT_PRINT_MODE
 
     print_setting = settings.get('print_setting') or {}
 
@@ -79,19 +99,13 @@ def merge_with_default_settings(settings=None):
     if not print_setting:
         return settings
 
-    collate = print_setting.get('collate')
-    settings['print_setting'] = {
-        'media_size': print_setting.get('media_size') or 'ms_a4',
-        'media_type': print_setting.get('media_type') or 'mt_plainpaper',
-        'borderless': print_setting.get('borderless') or False,
-        'print_quality': print_setting.get('print_quality') or 'normal',
-        'source': print_setting.get('source') or 'auto',
-        'color_mode': print_setting.get('color_mode') or 'color',
-        '2_sided': print_setting.get('2_sided') or 'none',
-        'reverse_order': print_setting.get('reverse_order') or False,
-        'copies': print_setting.get('copies') or 1,
-        'collate': collate if collate is not None else True,
+    merged = {
+        key: print_setting.get(key) or default
+        for key, default in DEFAULT_PRINT_SETTING.items()
     }
+    collate = print_setting.get('collate')
+    merged['collate'] = collate if collate is not None else True
+    settings['print_setting'] = merged
 
     return settings
 
@@ -174,5 +188,171 @@ def validate_settings(settings: dict):  # noqa: C901
         raise PrintSettingError('Must collate when using two-sided printing.')
 
 
+class PrintSettings(Mapping):
+    """
+    Validated, immutable job settings for reuse across many jobs.
+
+    Defaults are merged in and the result validated once, when the object is
+    created, and the JSON request body is encoded once; creating a job only
+    adds its name. Without a ``job_name`` every job gets a random one::
+
+        settings = PrintSettings(print_setting={'media_size': 'ms_letter', 'copies': 2})
+        for path in paths:
+            ec.printer.print(path, settings)
+
+    It can be read like the settings dict it stands for.
+    """
+
+    __slots__ = ('_job_name', '_print_mode', '_print_setting', '_body_tail', '_body')
+
+    def __init__(self, job_name: str = None, print_mode: str = None, print_setting: dict = None):
+        # Job names are generated per job; a placeholder stands in for validation.
+        settings = {'job_name': job_name or 'job', 'print_mode': print_mode}
+        if print_setting:
+            settings['print_setting'] = print_setting
+        settings = merge_with_default_settings(settings)
+        validate_settings(settings)
+
+        set_attribute = super().__setattr__
+        set_attribute('_job_name', job_name or None)
+        set_attribute('_print_mode', settings['print_mode'])
+        set_attribute('_print_setting', settings.get('print_setting'))
+
+        del settings['job_name']
+        # '{"print_mode": ...}' becomes ', "print_mode": ...}' to follow the job name.
+        set_attribute('_body_tail', b', ' + json.dumps(settings).encode()[1:])
+        set_attribute('_body', self._encode(job_name) if job_name else None)
+
+    @classmethod
+    def from_dict(cls, settings) -> 'PrintSettings':
+        """
+        PrintSettings for a settings dict, which is returned as is if it already is one.
+        """
+        if isinstance(settings, cls):
+            return settings
+
+        settings = settings or {}
+        extra_keys = set(settings.keys()) - {'job_name', 'print_mode', 'print_setting'}
+        if extra_keys:
+            raise PrintSettingError(f'Invalid settings keys {extra_keys}.')
+        return cls(**settings)
+
+    def __setattr__(self, name, value):
+        raise AttributeError('PrintSettings is immutable')
+
+    def __delattr__(self, name):
+        raise AttributeError('PrintSettings is immutable')
+
+    @property
+    def job_name(self):
+        return self._job_name
+
+    @property
+    def print_mode(self):
+        return self._print_mode
+
+    @property
+    def print_setting(self):
+        return dict(self._print_setting) if self._print_setting is not None else None
+
+    def __getitem__(self, key):
+        if key == 'print_mode':
+            return self._print_mode
+        if key == 'job_name' and self._job_name is not None:
+            return self._job_name
+        if key == 'print_setting' and self._print_setting is not None:
+            return self.print_setting
+        raise KeyError(key)
+
+    def __iter__(self):
+        if self._job_name is not None:
+            yield 'job_name'
+        yield 'print_mode'
+        if self._print_setting is not None:
+            yield 'print_setting'
+
+    def __len__(self):
+        return 1 + (self._job_name is not None) + (self._print_setting is not None)
+
+    def __repr__(self):
+        return f'PrintSettings({dict(self)!r})'
+
+    def body(self, job_name: str = None) -> bytes:
+        """
+        JSON request body for creating a job.
+
+        :param job_name: Overrides the settings' job name; if neither is set
+            a random one is generated.
+        """
+        if job_name:
+            if len(job_name) > 256:
+                raise PrintSettingError(f'Job name is greater than 256 chars: {job_name}')
+            return self._encode(job_name)
+        if self._body is not None:
+            return self._body
+        # Generated names are plain ASCII letters and need no escaping.
+        return b'{"job_name": "' + generate_job_name().encode() + b'"' + self._body_tail
+
+    def _encode(self, job_name):
+        return b'{"job_name": ' + json.dumps(job_name).encode() + self._body_tail
+
+
+class PrintProfiles:
+    """
+    Named PrintSettings, shared by the printers of a client.
+
+    Register the settings used over and over once, then print with just the
+    profile's name::
+
+        ec.profiles.add('a4-mono-duplex', print_setting={'color_mode': 'mono', '2_sided': 'long'})
+        ec.printer.print('./report.pdf', 'a4-mono-duplex')
+    """
+
+    def __init__(self, profiles: dict = None) -> None:
+        """
+        :param profiles: Profile name to PrintSettings or settings dict.
+        """
+        self._profiles = {}
+        for name, settings in (profiles or {}).items():
+            self.add(name, settings)
+
+    def add(self, name: str, settings=None, **kwargs) -> PrintSettings:
+        """
+        Register a profile, replacing any with the same name.
+
+        :param settings: PrintSettings or settings dict; or pass PrintSettings' arguments.
+        """
+        if settings is None:
+            settings = PrintSettings(**kwargs)
+        self._profiles[name] = PrintSettings.from_dict(settings)
+        return self._profiles[name]
+
+    def remove(self, name: str):
+        self._profiles.pop(name, None)
+
+    def __getitem__(self, name) -> PrintSettings:
+        try:
+            return self._profiles[name]
+        except KeyError:
+            raise PrintSettingError(f'Unknown print profile {name}') from None
+
+    def __contains__(self, name):
+        return name in self._profiles
+
+    def __iter__(self):
+        return iter(list(self._profiles))
+
+    def __len__(self):
+        return len(self._profiles)
+
+    def resolve(self, settings):
+        """
+        The profile named by ``settings`` if it is a string, else ``settings``.
+        """
+        if isinstance(settings, str):
+            return self[settings]
+        return settings
+
+
 class PrintSettingError(ValueError):
     pass
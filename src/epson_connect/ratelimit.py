@@ -0,0 +1,299 @@
+import asyncio
+import contextlib
+import threading
+import time
+from collections import deque
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket that hands out reservations.
+
+    ``reserve`` takes a token immediately and returns how long the caller has
+    to wait before using it, so the same bucket serves sync callers (which
+    sleep) and async callers (which ``await asyncio.sleep``).
+    """
+
+    def __init__(self, rate: float, burst: float = None) -> None:
+        """
+        :param rate: Tokens added per second.
+        :param burst: Bucket capacity; defaults to one second worth of tokens.
+        """
+        if rate <= 0:
+            raise ValueError('rate must be positive')
+
+        self.rate = rate
+        self.burst = burst if burst is not None else max(1.0, rate)
+        self._tokens = self.burst
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self) -> float:
+        """
+        Take one token and return the seconds to wait before it is valid.
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= 1
+            if self._tokens >= 0:
+                return 0.0
+            return -self._tokens / self.rate
+
+    def try_take(self) -> float:
+        """
+        Take one token if one is available now.
+
+        :return: 0 if a token was taken, else the seconds until one is available.
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return 0.0
+            return (1 - self._tokens) / self.rate
+
+
+class _Slots:
+    """
+    FIFO max-in-flight semaphore usable from threads and event loops alike.
+    """
+
+    def __init__(self, limit: int) -> None:
+        if limit < 1:
+            raise ValueError('max_in_flight must be at least 1')
+
+        self.limit = limit
+        self.in_flight = 0
+        self._waiters = deque()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        with self._lock:
+            if self.in_flight < self.limit and not self._waiters:
+                self.in_flight += 1
+                return
+            event = threading.Event()
+            self._waiters.append(event.set)
+
+        # release() hands its slot directly to us.
+        event.wait()
+
+    async def acquire_async(self):
+        loop = asyncio.get_running_loop()
+
+        with self._lock:
+            if self.in_flight < self.limit and not self._waiters:
+                self.in_flight += 1
+                return
+            future = loop.create_future()
+            self._waiters.append(lambda: loop.call_soon_threadsafe(self._hand_over, future))
+
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # Cancelled after being handed a slot; pass it on.
+                self.release()
+            raise
+
+    def _hand_over(self, future):
+        if future.done():
+            # The waiter was cancelled while queued.
+            self.release()
+        else:
+            future.set_result(None)
+
+    def release(self):
+        with self._lock:
+            if not self._waiters:
+                self.in_flight -= 1
+                return
+            wake = self._waiters.popleft()
+
+        wake()
+
+
+class RateLimiter:
+    """
+    Rate limit and in-flight cap for one scope, e.g. one credential or one device.
+
+    Callers over the limit queue locally. ``stats`` reports the current queue
+    depth and accumulated queue-wait time for autoscaling decisions.
+    """
+
+    def __init__(self, rate: float = None, burst: float = None, max_in_flight: int = None) -> None:
+        """
+        :param rate: Requests per second, or None for no rate limit.
+        :param burst: Requests allowed at once above ``rate``.
+        :param max_in_flight: Maximum concurrent requests, or None for no cap.
+        """
+        self._bucket = TokenBucket(rate, burst) if rate else None
+        self._slots = _Slots(max_in_flight) if max_in_flight else None
+
+        self._lock = threading.Lock()
+        self._queued = 0
+        self._requests = 0
+        self._waits = 0
+        self._wait_seconds = 0.0
+        self._max_wait = 0.0
+
+    @contextlib.contextmanager
+    def limit(self):
+        """
+        Hold a rate token and an in-flight slot for the duration of a request.
+        """
+        started = self._enqueue()
+        holding_slot = False
+        try:
+            if self._slots is not None:
+                self._slots.acquire()
+                holding_slot = True
+            if self._bucket is not None:
+                delay = self._bucket.reserve()
+                if delay:
+                    time.sleep(delay)
+        except BaseException:
+            if holding_slot:
+                self._slots.release()
+            self._dequeue(started, acquired=False)
+            raise
+        self._dequeue(started)
+
+        try:
+            yield
+        finally:
+            if self._slots is not None:
+                self._slots.release()
+
+    @contextlib.asynccontextmanager
+    async def limit_async(self):
+        """
+        asyncio version of ``limit``.
+        """
+        started = self._enqueue()
+        holding_slot = False
+        try:
+            if self._slots is not None:
+                await self._slots.acquire_async()
+                holding_slot = True
+            if self._bucket is not None:
+                delay = self._bucket.reserve()
+                if delay:
+                    await asyncio.sleep(delay)
+        except BaseException:
+            if holding_slot:
+                self._slots.release()
+            self._dequeue(started, acquired=False)
+            raise
+        self._dequeue(started)
+
+        try:
+            yield
+        finally:
+            if self._slots is not None:
+                self._slots.release()
+
+    def _enqueue(self):
+        with self._lock:
+            self._queued += 1
+        return time.monotonic()
+
+    def _dequeue(self, started, acquired=True):
+        waited = time.monotonic() - started
+        with self._lock:
+            self._queued -= 1
+            if not acquired:
+                return
+            self._requests += 1
+            if waited > 0.001:
+                self._waits += 1
+                self._wait_seconds += waited
+                self._max_wait = max(self._max_wait, waited)
+
+    def stats(self) -> dict:
+        """
+        Snapshot of queue depth, in-flight requests and queue-wait time.
+        """
+        with self._lock:
+            return {
+                'queue_depth': self._queued,
+                'in_flight': self._slots.in_flight if self._slots is not None else None,
+                'requests': self._requests,
+                'waits': self._waits,
+                'wait_seconds_total': self._wait_seconds,
+                'max_wait_seconds': self._max_wait,
+            }
+
+
+class Governor:
+    """
+    Client-side rate limiting per credential and per device.
+
+    Share one governor between everything that uses the same client ID (e.g.
+    pass it to Client or Fleet). Every request acquires its device's limiter
+    and then the credential-wide one::
+
+        governor = Governor(rate=20, max_in_flight=32, device_rate=2, device_max_in_flight=4)
+        fleet = Fleet(client_id='...', client_secret='...', governor=governor)
+    """
+
+    def __init__(
+            self,
+            rate: float = None,
+            burst: float = None,
+            max_in_flight: int = None,
+            device_rate: float = None,
+            device_burst: float = None,
+            device_max_in_flight: int = None,
+    ) -> None:
+        self.credential = RateLimiter(rate, burst, max_in_flight)
+
+        self._device_limits = (device_rate, device_burst, device_max_in_flight)
+        self._devices = {}
+        self._lock = threading.Lock()
+
+    def device(self, device_id) -> RateLimiter:
+        """
+        Limiter for one device, created on first use.
+        """
+        limiter = self._devices.get(device_id)
+        if limiter is None:
+            with self._lock:
+                limiter = self._devices.setdefault(device_id, RateLimiter(*self._device_limits))
+        return limiter
+
+    @contextlib.contextmanager
+    def limit(self, device_id=None):
+        if not device_id:
+            with self.credential.limit():
+                yield
+            return
+
+        with self.device(device_id).limit(), self.credential.limit():
+            yield
+
+    @contextlib.asynccontextmanager
+    async def limit_async(self, device_id=None):
+        if not device_id:
+            async with self.credential.limit_async():
+                yield
+            return
+
+        async with self.device(device_id).limit_async(), self.credential.limit_async():
+            yield
+
+    def stats(self) -> dict:
+        """
+        Stats for the credential and for every device seen so far.
+        """
+        with self._lock:
+            devices = dict(self._devices)
+
+        return {
+            'credential': self.credential.stats(),
+            'devices': {device_id: limiter.stats() for device_id, limiter in devices.items()},
+        }
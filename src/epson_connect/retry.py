@@ -0,0 +1,126 @@
+import random
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+
+# Private generator so jitter does not disturb the global random state.
+_random = random.Random()
+
+
+class RetryPolicy:
+    """
+    When and how often AuthCtx retries a failed request.
+
+    Only requests that are safe to repeat are retried after a failure that may
+    have reached the server: idempotent methods, and calls the library marks
+    as idempotent (such as uploads, which overwrite the same upload Key).
+    Rejections that are guaranteed not to have been processed (HTTP 429 and
+    connection timeouts) are retried for every request. Backoff is exponential
+    with full jitter and never shorter than a server's ``Retry-After``.
+    """
+
+    RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+    IDEMPOTENT_METHODS = frozenset({'GET', 'HEAD', 'OPTIONS', 'PUT', 'DELETE'})
+
+    def __init__(
+            self,
+            max_attempts: int = 3,
+            backoff_factor: float = 0.5,
+            max_backoff: float = 30.0,
+            jitter: bool = True,
+            timeout: float = 60.0,
+            deadline: float = None,
+            retry_statuses=RETRY_STATUSES,
+    ) -> None:
+        """
+        :param max_attempts: Total attempts per call, including the first one.
+        :param backoff_factor: Base delay; attempt n waits up to ``factor * 2 ** (n - 1)``.
+        :param max_backoff: Upper bound for a single delay.
+        :param jitter: Randomize delays ("full jitter") to spread out retries.
+        :param timeout: Per-attempt connect/read timeout in seconds, or None.
+        :param deadline: Total seconds a call may take across all attempts, or None.
+        :param retry_statuses: HTTP statuses that are retried.
+        """
+        if max_attempts < 1:
+            raise ValueError('max_attempts must be at least 1')
+
+        self.max_attempts = max_attempts
+        self.backoff_factor = backoff_factor
+        self.max_backoff = max_backoff
+        self.jitter = jitter
+        self.timeout = timeout
+        self.deadline = deadline
+        self.retry_statuses = frozenset(retry_statuses)
+
+    def is_idempotent(self, method: str, idempotent: bool = None) -> bool:
+        if idempotent is not None:
+            return idempotent
+        return method.upper() in self.IDEMPOTENT_METHODS
+
+    def should_retry_status(self, status_code, idempotent: bool) -> bool:
+        if status_code not in self.retry_statuses:
+            return False
+        # A 429 is rejected before processing, so it is safe for any request.
+        return idempotent or status_code == 429
+
+    def call_timeout(self, started: float):
+        """
+        Timeout for the next attempt of a call started at ``started`` (monotonic).
+        """
+        if self.deadline is None:
+            return self.timeout
+
+        remaining = max(self.deadline - (time.monotonic() - started), 0.001)
+        if self.timeout is None:
+            return remaining
+        return min(self.timeout, remaining)
+
+    def delay(self, attempt: int, started: float, retry_after=None):
+        """
+        Seconds to wait before the attempt after ``attempt``, or None to give up.
+        """
+        if attempt >= self.max_attempts:
+            return None
+
+        delay = min(self.max_backoff, self.backoff_factor * 2 ** (attempt - 1))
+        if self.jitter:
+            delay = _random.uniform(0, delay)
+
+        retry_after = parse_retry_after(retry_after)
+        if retry_after is not None:
+            delay = max(delay, retry_after)
+
+        if self.deadline is not None and time.monotonic() - started + delay >= self.deadline:
+            return None
+
+        return delay
+
+
+# Policy that never retries; attempts still get the default timeout.
+NO_RETRY = RetryPolicy(max_attempts=1)
+
+
+def parse_retry_after(value):
+    """
+    Parse a ``Retry-After`` header (delta seconds or HTTP date) into seconds.
+    """
+    if value is None:
+        return None
+
+    if isinstance(value, (int, float)):
+        return max(float(value), 0.0)
+
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+
+    return max((when - datetime.now(timezone.utc)).total_seconds(), 0.0)
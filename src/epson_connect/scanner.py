@@ -9,9 +9,13 @@ class Scanner:
 
     def __init__(self, auth_ctx: AuthCtx) -> None:
         self._auth_ctx = auth_ctx
-        self._path = f'/api/1/scanning/scanners/{self._auth_ctx.device_id}/destinations'
         self._destination_cache = {}
 
+    @property
+    def _path(self):
+        # The device ID is only known once authenticated.
+        return f'/api/1/scanning/scanners/{self._auth_ctx.device_id}/destinations'
+
     def list(self):
         """
         Get scan destinations.
@@ -75,14 +79,18 @@ class Scanner:
         del self._destination_cache[id_]
 
     def _validate_destination(self, name, destination, type_):
-        if len(name) < 1 or len(name) > 32:
-            raise ScannerError('Scan destination name too long.')
+        _validate_destination(name, destination, type_)
+
+
+def _validate_destination(name, destination, type_):
+    if len(name) < 1 or len(name) > 32:
+        raise ScannerError('Scan destination name too long.')
 
-        if len(destination) < 4 or len(destination) > 544:
-            raise ScannerError('Scan destination too long.')
+    if len(destination) < 4 or len(destination) > 544:
+        raise ScannerError('Scan destination too long.')
 
-        if type_ not in self.VALID_DESTINATION_TYPES:
-            raise ScannerError(f'Invalid scan destination type {type_}.')
+    if type_ not in Scanner.VALID_DESTINATION_TYPES:
+        raise ScannerError(f'Invalid scan destination type {type_}.')
 
 
 class ScannerError(ValueError):
@@ -0,0 +1,354 @@
+import heapq
+import itertools
+import logging
+import math
+import threading
+import time
+from collections import defaultdict, deque
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from .batch import percentile
+from .fleet import Fleet
+
+logger = logging.getLogger(__name__)
+
+
+class _Item:
+
+    def __init__(self, seq, file, settings, extension, device, priority, tenant, deadline):
+        self.seq = seq
+        self.file = file
+        self.settings = settings
+        self.extension = extension
+        self.device = device
+        self.priority = priority
+        self.tenant = tenant
+        self.deadline = deadline
+        self.future = Future()
+        self.submitted = time.monotonic()
+        self.started = None
+
+    def sort_key(self):
+        # Jobs with a deadline first, earliest first; then submission order.
+        return (self.deadline if self.deadline is not None else math.inf, self.seq)
+
+
+class PrintScheduler:
+    """
+    Order print jobs by priority, tenant and deadline before they hit the API.
+
+    Jobs are dispatched to ``max_workers`` threads in this order:
+
+    1. Priority class, in the order of ``PRIORITIES`` (``urgent`` first).
+    2. Within a class, a job whose deadline is less than ``deadline_slack``
+       seconds away goes first (earliest deadline first).
+    3. Otherwise tenants take turns in proportion to their weight, so one
+       tenant's large batch can not starve another's prints; each tenant's
+       jobs run earliest deadline first, then in submission order.
+
+    At most ``device_max_in_flight`` jobs run per Fleet device at once. Jobs that
+    have not started by their deadline fail with DeadlineExceeded instead
+    of printing late::
+
+        scheduler = PrintScheduler(fleet, max_workers=16)
+        future = scheduler.submit('./label.pdf', device=email, priority='urgent', tenant='shipping')
+        job_id = future.result()
+
+    ``target`` is a Printer, used for every job, or a Fleet, whose jobs name
+    their ``device``.
+    """
+
+    PRIORITIES = ('urgent', 'normal', 'batch')
+
+    def __init__(
+            self,
+            target,
+            max_workers: int = 8,
+            device_max_in_flight: int = 2,
+            tenant_weights: dict = None,
+            deadline_slack: float = 5.0,
+            latency_samples: int = 10000,
+    ) -> None:
+        """
+        :param target: Printer or Fleet that prints the jobs.
+        :param max_workers: Jobs running at once across all devices.
+        :param device_max_in_flight: Jobs running at once per Fleet device.
+        :param tenant_weights: Share of each tenant within a priority class; default 1.
+        :param deadline_slack: Seconds before a deadline at which a job jumps its tenant's turn.
+        :param latency_samples: Latencies kept per priority class for percentiles.
+        """
+        self._target = target
+        self.max_workers = max_workers
+        self.device_max_in_flight = device_max_in_flight
+        self.deadline_slack = deadline_slack
+        self._weights = tenant_weights or {}
+
+        # priority -> tenant -> device -> heap of (sort key, item). Queues are
+        # split by device so a device at its cap is skipped without scanning
+        # the jobs queued for it.
+        self._queues = {priority: defaultdict(dict) for priority in self.PRIORITIES}
+        # tenant -> work received, scaled by weight.
+        self._served = defaultdict(float)
+        self._device_running = defaultdict(int)
+        self._running = 0
+        self._seq = itertools.count()
+
+        self._counts = defaultdict(int)
+        self._latencies = {
+            priority: deque(maxlen=latency_samples) for priority in self.PRIORITIES
+        }
+
+        self._cond = threading.Condition()
+        self._closed = False
+        self._pool = ThreadPoolExecutor(
+            max_workers=max_workers,
+            thread_name_prefix='epson-connect-scheduler',
+        )
+        self._dispatcher = threading.Thread(
+            target=self._dispatch_loop,
+            name='epson-connect-scheduler-dispatch',
+            daemon=True,
+        )
+        self._dispatcher.start()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def submit(
+            self,
+            file_path,
+            settings=None,
+            extension=None,
+            device=None,
+            priority: str = 'normal',
+            tenant: str = 'default',
+            deadline: float = None,
+    ) -> Future:
+        """
+        Queue a print.
+
+        :param deadline: Seconds from now by which the job must have started.
+        :return: Future resolving to the job ID.
+        """
+        if priority not in self._queues:
+            raise SchedulerError(f'Invalid priority {priority}')
+        if device is None and isinstance(self._target, Fleet):
+            raise SchedulerError('Jobs for a Fleet must name a device.')
+
+        with self._cond:
+            if self._closed:
+                raise SchedulerError('Scheduler is closed')
+
+            item = _Item(
+                next(self._seq),
+                file_path,
+                dict(settings) if isinstance(settings, dict) else settings,
+                extension,
+                device,
+                priority,
+                tenant,
+                time.monotonic() + deadline if deadline is not None else None,
+            )
+            devices = self._queues[priority][tenant]
+            if not devices:
+                # A tenant that was idle does not get to catch up on its
+                # unused share; it starts level with the least served one.
+                active = [self._served[t] for t, d in self._queues[priority].items() if d]
+                self._served[tenant] = max(self._served[tenant], min(active, default=0.0))
+            heapq.heappush(devices.setdefault(device, []), (item.sort_key(), item))
+            self._counts['submitted'] += 1
+            self._cond.notify()
+
+        return item.future
+
+    def _dispatch_loop(self):
+        with self._cond:
+            while not self._closed:
+                while self._running < self.max_workers:
+                    item = self._next_item(time.monotonic())
+                    if item is None:
+                        break
+                    if item.future.set_running_or_notify_cancel():
+                        self._start(item)
+
+                # Wake up periodically to expire jobs past their deadline.
+                self._cond.wait(1.0)
+
+    def _next_item(self, now):
+        # Must hold the lock.
+        for priority in self.PRIORITIES:
+            candidates = []
+            for tenant, devices in list(self._queues[priority].items()):
+                item = self._first_runnable(devices, now)
+                if item is not None:
+                    candidates.append(item)
+                if not devices:
+                    del self._queues[priority][tenant]
+
+            if not candidates:
+                continue
+
+            urgent = [
+                item for item in candidates
+                if item.deadline is not None and item.deadline - now <= self.deadline_slack
+            ]
+            if urgent:
+                item = min(urgent, key=lambda item: item.deadline)
+            else:
+                item = min(candidates, key=lambda item: (self._served[item.tenant], item.seq))
+
+            # The chosen job is at the head of its device's queue.
+            devices = self._queues[priority][item.tenant]
+            heapq.heappop(devices[item.device])
+            if not devices[item.device]:
+                del devices[item.device]
+            if not devices:
+                del self._queues[priority][item.tenant]
+            return item
+
+        return None
+
+    def _first_runnable(self, devices, now):
+        # Must hold the lock. Looks at one job per device: jobs are ordered by
+        # deadline first, so expired jobs are always at the head of a queue.
+        first = None
+        for device, queue in list(devices.items()):
+            while queue:
+                item = queue[0][1]
+                if item.future.cancelled():
+                    heapq.heappop(queue)
+                elif item.deadline is not None and item.deadline < now:
+                    heapq.heappop(queue)
+                    # Moving to running first means a concurrent cancel() can
+                    # no longer make set_exception raise on this thread.
+                    if item.future.set_running_or_notify_cancel():
+                        self._counts['expired'] += 1
+                        item.future.set_exception(
+                            DeadlineExceeded(f'{item.file} missed its deadline'),
+                        )
+                else:
+                    break
+
+            if not queue:
+                del devices[device]
+                continue
+
+            # A Printer target has no devices to spread over; only max_workers applies.
+            at_cap = self._device_running.get(device, 0) >= self.device_max_in_flight
+            if device is not None and at_cap:
+                continue
+            if first is None or queue[0][0] < first.sort_key():
+                first = queue[0][1]
+
+        return first
+
+    def _start(self, item):
+        # Must hold the lock.
+        self._running += 1
+        self._device_running[item.device] += 1
+        self._served[item.tenant] += 1 / self._weights.get(item.tenant, 1)
+        item.started = time.monotonic()
+        self._pool.submit(self._run, item)
+
+    def _run(self, item):
+        try:
+            if item.device is None:
+                job_id = self._target.print(item.file, item.settings, item.extension)
+            else:
+                job_id = self._target.print(item.device, item.file, item.settings, item.extension)
+        except Exception as e:
+            error = e
+        else:
+            error = None
+
+        with self._cond:
+            self._running -= 1
+            self._device_running[item.device] -= 1
+            if not self._device_running[item.device]:
+                del self._device_running[item.device]
+            self._counts['failed' if error else 'completed'] += 1
+            self._latencies[item.priority].append(
+                (item.started - item.submitted, time.monotonic() - item.submitted)
+            )
+            self._cond.notify()
+
+        if error is not None:
+            item.future.set_exception(error)
+        else:
+            item.future.set_result(job_id)
+
+    def metrics(self) -> dict:
+        """
+        Queue depth per priority, tenant and device plus latency percentiles.
+
+        Latencies are in seconds from submission: ``wait`` until a job
+        started and ``total`` until it finished.
+        """
+        with self._cond:
+            queued = {priority: 0 for priority in self.PRIORITIES}
+            tenants = defaultdict(int)
+            devices = defaultdict(int)
+            for priority, tenant_queues in self._queues.items():
+                for tenant, device_queues in tenant_queues.items():
+                    for device, queue in device_queues.items():
+                        queued[priority] += len(queue)
+                        tenants[tenant] += len(queue)
+                        devices[device] += len(queue)
+
+            latencies = {priority: list(samples) for priority, samples in self._latencies.items()}
+
+            metrics = {
+                'queued': queued,
+                'queued_by_tenant': dict(tenants),
+                'queued_by_device': dict(devices),
+                'running': self._running,
+                'running_by_device': dict(self._device_running),
+                'submitted': self._counts['submitted'],
+                'completed': self._counts['completed'],
+                'failed': self._counts['failed'],
+                'expired': self._counts['expired'],
+            }
+
+        metrics['latency'] = {
+            priority: {
+                'wait_p50': percentile([s[0] for s in samples], 50),
+                'wait_p99': percentile([s[0] for s in samples], 99),
+                'total_p50': percentile([s[1] for s in samples], 50),
+                'total_p99': percentile([s[1] for s in samples], 99),
+            }
+            for priority, samples in latencies.items()
+        }
+        return metrics
+
+    def close(self, wait=True):
+        """
+        Stop dispatching; queued jobs that have not started are cancelled.
+        """
+        with self._cond:
+            self._closed = True
+            items = [
+                item
+                for tenant_queues in self._queues.values()
+                for device_queues in tenant_queues.values()
+                for queue in device_queues.values()
+                for _, item in queue
+            ]
+            for tenant_queues in self._queues.values():
+                tenant_queues.clear()
+            self._cond.notify_all()
+
+        for item in items:
+            item.future.cancel()
+
+        self._pool.shutdown(wait=wait)
+
+
+class SchedulerError(ValueError):
+    pass
+
+
+class DeadlineExceeded(SchedulerError):
+    pass
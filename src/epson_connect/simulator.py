@@ -0,0 +1,594 @@
+import argparse
+import base64
+import hashlib
+import itertools
+import json
+import math
+import random
+import re
+import secrets
+import threading
+import time
+from collections import defaultdict
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+from .ratelimit import TokenBucket
+
+CAPABILITIES = {
+    'color_modes': ['color', 'mono'],
+    'resolutions': [360, 720],
+    'media_sizes': [
+        {
+            'media_size': media_size,
+            'media_types': [
+                {
+                    'media_type': 'mt_plainpaper',
+                    'borderless': False,
+                    'sources': ['auto', 'rear', 'front1'],
+                    'print_qualities': ['normal', 'draft'],
+                    '2_sided': True,
+                },
+                {
+                    'media_type': 'mt_photopaper',
+                    'borderless': True,
+                    'sources': ['auto', 'rear'],
+                    'print_qualities': ['high', 'normal'],
+                    '2_sided': False,
+                },
+            ],
+        }
+        for media_size in ('ms_a4', 'ms_a3', 'ms_letter', 'ms_legal', 'ms_l', 'ms_2l')
+    ],
+}
+
+_PRINTER = r'/api/1/printing/printers/(?P<device>[^/]+)'
+_SCANNER = r'/api/1/scanning/scanners/(?P<device>[^/]+)'
+
+# (method, path pattern, handler method); a 'device' group is checked against the token.
+_ROUTES = [
+    ('POST', re.compile(r'/api/1/printing/oauth2/auth/token'), '_token'),
+    ('POST', re.compile(r'/upload'), '_upload'),
+    ('GET', re.compile(_PRINTER), '_device_info'),
+    ('DELETE', re.compile(_PRINTER), '_deauthenticate'),
+    ('GET', re.compile(_PRINTER + r'/capability/(?P<mode>[^/]+)'), '_capability'),
+    ('POST', re.compile(_PRINTER + r'/jobs'), '_create_job'),
+    ('GET', re.compile(_PRINTER + r'/jobs/(?P<job_id>[^/]+)'), '_job_info'),
+    ('POST', re.compile(_PRINTER + r'/jobs/(?P<job_id>[^/]+)/print'), '_print'),
+    ('POST', re.compile(_PRINTER + r'/jobs/(?P<job_id>[^/]+)/cancel'), '_cancel'),
+    ('POST', re.compile(_PRINTER + r'/settings/notification'), '_notification'),
+    ('GET', re.compile(_SCANNER + r'/destinations'), '_list_destinations'),
+    ('POST', re.compile(_SCANNER + r'/destinations'), '_save_destination'),
+    ('DELETE', re.compile(_SCANNER + r'/destinations'), '_remove_destination'),
+]
+
+
+class _Request:
+
+    def __init__(self, method, path, query, headers, body, size):
+        self.method = method
+        self.path = path
+        self.query = query
+        self.headers = headers
+        self.body = body
+        self.size = size
+        self.params = {}
+        self.token = None
+
+    def json(self):
+        return json.loads(self.body or b'{}')
+
+
+class _Token:
+
+    def __init__(self, client_id, email, device_id, lifetime):
+        self.client_id = client_id
+        self.email = email
+        self.device_id = device_id
+        self.access_token = secrets.token_urlsafe(24)
+        self.refresh_token = secrets.token_urlsafe(24)
+        self.expires_at = time.monotonic() + lifetime
+
+
+class _Job:
+
+    def __init__(self, job_id, device_id, settings):
+        self.id = job_id
+        self.device_id = device_id
+        self.settings = settings
+        self.uploaded = 0
+        self.status = 'pending_upload'
+        self.printed_at = None
+        self.created = time.time()
+
+
+class Simulator:
+    """
+    Local stand-in for the Epson Connect API, for benchmarks and load tests.
+
+    Implements the token, print job, upload, print, cancel, capability,
+    device info, notification and scan destination endpoints used by
+    AuthCtx, Printer and Scanner, with configurable latency, failures,
+    token lifetime and rate limits::
+
+        with Simulator(latency=0.05, error_rate=0.01, rate_limit=20) as sim:
+            ec = Client(base_url=sim.url, printer_email='printer@example.com',
+                        client_id='id', client_secret='secret')
+            ec.printer.print('./file.pdf')
+            sim.stats()
+
+    Or from a shell: ``python -m epson_connect.simulator --port 8000 --latency 0.05``.
+
+    Any printer email is accepted; each maps to its own device. Printed jobs
+    complete ``print_seconds`` after they are executed.
+    """
+
+    def __init__(
+            self,
+            host: str = '127.0.0.1',
+            port: int = 0,
+            latency: float = 0.0,
+            jitter: float = 0.0,
+            error_rate: float = 0.0,
+            token_lifetime: int = 3600,
+            rate_limit: float = None,
+            burst: float = None,
+            upload_bandwidth: float = None,
+            print_seconds: float = 1.0,
+            credentials: dict = None,
+            seed: int = None,
+    ) -> None:
+        """
+        :param latency: Seconds added to every response.
+        :param jitter: Up to this many seconds are added on top, uniformly at random.
+        :param error_rate: Fraction of API calls (not token grants) failing with a 503.
+        :param token_lifetime: Seconds access tokens stay valid.
+        :param rate_limit: Requests per second per client ID before answering 429.
+        :param burst: Rate limit bucket size; defaults to one second of requests.
+        :param upload_bandwidth: Upload speed in bytes per second; unlimited if None.
+        :param print_seconds: Seconds from executing a job until it is completed.
+        :param credentials: Client ID to secret; any credentials are accepted if None.
+        :param seed: Seed for latency jitter and injected errors.
+        """
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.token_lifetime = token_lifetime
+        self.rate_limit = rate_limit
+        self.burst = burst
+        self.upload_bandwidth = upload_bandwidth
+        self.print_seconds = print_seconds
+        self._credentials = credentials
+
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._tokens = {}
+        self._refresh_tokens = {}
+        self._buckets = {}
+        self._jobs = {}
+        self._job_ids = itertools.count(1)
+        # device_id -> destination id -> destination
+        self._destinations = defaultdict(dict)
+        self._destination_ids = itertools.count(1)
+        self._counts = defaultdict(int)
+
+        handler = type('Handler', (_Handler,), {'simulator': self})
+        self._server = ThreadingHTTPServer((host, port), handler)
+        self._server.daemon_threads = True
+        self._thread = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f'http://{host}:{port}'
+
+    def start(self) -> 'Simulator':
+        """
+        Serve from a background thread.
+        """
+        self._thread = threading.Thread(
+            target=self._server.serve_forever,
+            args=(0.05,),
+            name='epson-connect-simulator',
+            daemon=True,
+        )
+        self._thread.start()
+        return self
+
+    def serve_forever(self):
+        self._server.serve_forever()
+
+    def stop(self):
+        if self._thread is not None:
+            self._server.shutdown()
+            self._thread.join()
+            self._thread = None
+        self._server.server_close()
+
+    def stats(self) -> dict:
+        """
+        Requests per handler plus totals for injected errors, 429s and uploaded bytes.
+        """
+        with self._lock:
+            return dict(self._counts)
+
+    def _count(self, name, amount=1):
+        with self._lock:
+            self._counts[name] += amount
+
+    def handle(self, method, target, headers, body, size=None):
+        """
+        Answer one request.
+
+        :param size: Body size, for uploads whose body was not kept.
+
+        :return: ``(status, JSON body, extra headers)``.
+        """
+        url = urlsplit(target)
+        request = _Request(
+            method,
+            url.path,
+            parse_qs(url.query),
+            headers,
+            body,
+            len(body) if size is None else size,
+        )
+
+        for route_method, pattern, name in _ROUTES:
+            match = pattern.fullmatch(url.path)
+            if match and route_method == method:
+                request.params = match.groupdict()
+                break
+        else:
+            return _error(HTTPStatus.NOT_FOUND, 'not_found')
+
+        delay = self.latency + (self._random.uniform(0, self.jitter) if self.jitter else 0.0)
+        if delay:
+            time.sleep(delay)
+
+        self._count(name.lstrip('_'))
+        if name == '_token':
+            return self._token(request)
+
+        refused = self._refuse(request)
+        if refused is not None:
+            return refused
+
+        return getattr(self, name)(request)
+
+    def _refuse(self, request):
+        """
+        Authentication, rate limit and injected failures for API calls.
+        """
+        if request.path == '/upload':
+            # Upload URIs are presigned and need no token.
+            job = self._jobs.get((request.query.get('Key') or [''])[0])
+            if job is None:
+                return _error(HTTPStatus.NOT_FOUND, 'job_not_found')
+            request.token = None
+        else:
+            request.token = self._authenticate(request.headers.get('Authorization', ''))
+            if request.token is None:
+                return _error(HTTPStatus.UNAUTHORIZED, 'invalid_token')
+            device_id = request.params.get('device')
+            if device_id is not None and device_id != request.token.device_id:
+                return _error(HTTPStatus.FORBIDDEN, 'forbidden')
+
+        if self.rate_limit and request.token is not None:
+            wait = self._bucket(request.token.client_id).try_take()
+            if wait:
+                self._count('rate_limited')
+                return _error(
+                    HTTPStatus.TOO_MANY_REQUESTS,
+                    'too_many_requests',
+                    {'Retry-After': str(math.ceil(wait))},
+                )
+
+        if self.error_rate and self._random.random() < self.error_rate:
+            self._count('errors')
+            return _error(HTTPStatus.SERVICE_UNAVAILABLE, 'service_unavailable')
+
+        return None
+
+    def _authenticate(self, authorization):
+        scheme, _, access_token = authorization.partition(' ')
+        with self._lock:
+            token = self._tokens.get(access_token) if scheme == 'Bearer' else None
+            if token is None or token.expires_at <= time.monotonic():
+                return None
+            return token
+
+    def _bucket(self, client_id):
+        with self._lock:
+            bucket = self._buckets.get(client_id)
+            if bucket is None:
+                bucket = self._buckets[client_id] = TokenBucket(self.rate_limit, self.burst)
+            return bucket
+
+    def _client(self, authorization):
+        scheme, _, encoded = authorization.partition(' ')
+        if scheme != 'Basic':
+            return None
+        try:
+            client_id, _, client_secret = base64.b64decode(encoded).decode().partition(':')
+        except ValueError:
+            return None
+
+        if not client_id:
+            return None
+        if self._credentials is not None and self._credentials.get(client_id) != client_secret:
+            return None
+        return client_id
+
+    def _token(self, request):
+        client_id = self._client(request.headers.get('Authorization', ''))
+        if client_id is None:
+            return HTTPStatus.UNAUTHORIZED, {'error': 'invalid_client'}, {}
+
+        form = {key: values[0] for key, values in parse_qs(request.body.decode()).items()}
+        grant_type = form.get('grant_type')
+
+        with self._lock:
+            if grant_type == 'password' and form.get('username'):
+                email = form['username']
+                token = _Token(client_id, email, _device_id(email), self.token_lifetime)
+            elif grant_type == 'refresh_token':
+                previous = self._refresh_tokens.get(form.get('refresh_token'))
+                if previous is None or previous.client_id != client_id:
+                    return HTTPStatus.BAD_REQUEST, {'error': 'invalid_grant'}, {}
+                # Like the real API, the refresh token stays the same.
+                self._tokens.pop(previous.access_token, None)
+                token = _Token(client_id, previous.email, previous.device_id, self.token_lifetime)
+                token.refresh_token = previous.refresh_token
+            else:
+                return HTTPStatus.BAD_REQUEST, {'error': 'unsupported_grant_type'}, {}
+
+            self._tokens[token.access_token] = token
+            self._refresh_tokens[token.refresh_token] = token
+            self._counts[f'grant_{grant_type}'] += 1
+
+        return HTTPStatus.OK, {
+            'token_type': 'Bearer',
+            'access_token': token.access_token,
+            'expires_in': str(self.token_lifetime),
+            'refresh_token': token.refresh_token,
+            'subject_id': token.device_id,
+        }, {}
+
+    def _deauthenticate(self, request):
+        with self._lock:
+            for token in list(self._tokens.values()):
+                if token.device_id == request.token.device_id:
+                    self._tokens.pop(token.access_token, None)
+                    self._refresh_tokens.pop(token.refresh_token, None)
+        return HTTPStatus.OK, {}, {}
+
+    def _device_info(self, request):
+        return HTTPStatus.OK, {
+            'printer_name': f'Simulated printer {request.token.email}',
+            'serial_no': request.token.device_id[:10].upper(),
+            'ec_connected': True,
+        }, {}
+
+    def _capability(self, request):
+        if request.params['mode'] not in ('document', 'photo'):
+            return _error(HTTPStatus.BAD_REQUEST, 'invalid_print_mode')
+        return HTTPStatus.OK, CAPABILITIES, {}
+
+    def _create_job(self, request):
+        try:
+            settings = request.json()
+        except ValueError:
+            return _error(HTTPStatus.BAD_REQUEST, 'invalid_json')
+        if not settings.get('job_name') or not settings.get('print_mode'):
+            return _error(HTTPStatus.BAD_REQUEST, 'invalid_settings')
+
+        job_id = f'sim-{next(self._job_ids):08d}'
+        with self._lock:
+            self._jobs[job_id] = _Job(job_id, request.token.device_id, settings)
+
+        return HTTPStatus.CREATED, {
+            'id': job_id,
+            'upload_uri': f'{self.url}/upload?Key={job_id}',
+        }, {}
+
+    def _upload(self, request):
+        if self.upload_bandwidth:
+            time.sleep(request.size / self.upload_bandwidth)
+
+        with self._lock:
+            job = self._jobs[request.query['Key'][0]]
+            job.uploaded = request.size
+            job.status = 'pending'
+            self._counts['uploaded_bytes'] += request.size
+
+        return HTTPStatus.OK, {}, {}
+
+    def _job(self, request):
+        job = self._jobs.get(request.params['job_id'])
+        if job is None or job.device_id != request.token.device_id:
+            return None
+        if job.printed_at is not None and job.status == 'pending':
+            if time.monotonic() - job.printed_at >= self.print_seconds:
+                job.status = 'completed'
+        return job
+
+    def _print(self, request):
+        with self._lock:
+            job = self._job(request)
+            if job is None:
+                return _error(HTTPStatus.NOT_FOUND, 'job_not_found')
+            if not job.uploaded:
+                return _error(HTTPStatus.BAD_REQUEST, 'file_not_uploaded')
+            if job.printed_at is None:
+                job.printed_at = time.monotonic()
+        return HTTPStatus.ACCEPTED, {}, {}
+
+    def _cancel(self, request):
+        with self._lock:
+            job = self._job(request)
+            if job is None:
+                return _error(HTTPStatus.NOT_FOUND, 'job_not_found')
+            if job.status not in ('pending', 'pending_held', 'pending_upload'):
+                return _error(HTTPStatus.BAD_REQUEST, 'job_not_cancelable')
+            job.status = 'canceled'
+        return HTTPStatus.ACCEPTED, {}, {}
+
+    def _job_info(self, request):
+        with self._lock:
+            job = self._job(request)
+            if job is None:
+                return _error(HTTPStatus.NOT_FOUND, 'job_not_found')
+            return HTTPStatus.OK, {
+                'status': job.status,
+                'status_reason': 'job_completed' if job.status == 'completed' else '',
+                'start_date': time.strftime('%Y-%m-%dT%H:%M:%S', time.gmtime(job.created)),
+                'job_name': job.settings['job_name'],
+                'total_pages': 1,
+                'update_date': time.strftime('%Y-%m-%dT%H:%M:%S', time.gmtime()),
+            }, {}
+
+    def _notification(self, request):
+        return HTTPStatus.OK, {}, {}
+
+    def _list_destinations(self, request):
+        with self._lock:
+            destinations = list(self._destinations[request.token.device_id].values())
+        return HTTPStatus.OK, {'destinations': destinations}, {}
+
+    def _save_destination(self, request):
+        destination = request.json()
+        with self._lock:
+            destinations = self._destinations[request.token.device_id]
+            if 'id' in destination:
+                if destination['id'] not in destinations:
+                    return _error(HTTPStatus.NOT_FOUND, 'destination_not_found')
+            else:
+                destination['id'] = f'dest-{next(self._destination_ids)}'
+            destinations[destination['id']] = destination
+        return HTTPStatus.OK, destination, {}
+
+    def _remove_destination(self, request):
+        with self._lock:
+            removed = self._destinations[request.token.device_id].pop(
+                request.json().get('id'),
+                None,
+            )
+        if removed is None:
+            return _error(HTTPStatus.NOT_FOUND, 'destination_not_found')
+        return HTTPStatus.OK, {}, {}
+
+
+class _Handler(BaseHTTPRequestHandler):
+    # Keep-alive, so client connection pools behave as they do against the real API.
+    protocol_version = 'HTTP/1.1'
+    # Headers and body are written separately; do not let Nagle hold back the body.
+    disable_nagle_algorithm = True
+    simulator = None
+
+    def _respond(self):
+        if urlsplit(self.path).path == '/upload':
+            # Count uploaded bytes without keeping them, so memory use
+            # measured in-process is the client's.
+            size = sum(len(chunk) for chunk in self._read_body())
+            body = b''
+        else:
+            body = b''.join(self._read_body())
+            size = len(body)
+
+        status, payload, headers = self.simulator.handle(
+            self.command, self.path, self.headers, body, size,
+        )
+
+        data = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    do_GET = do_POST = do_DELETE = _respond
+
+    def _read_body(self, chunk_size=64 * 1024):
+        if self.headers.get('Transfer-Encoding', '').lower() == 'chunked':
+            while True:
+                size = int(self.rfile.readline().split(b';')[0], 16)
+                if not size:
+                    # Skip trailers up to the blank line ending the body.
+                    while self.rfile.readline().strip():
+                        pass
+                    return
+                yield self.rfile.read(size)
+                self.rfile.readline()
+
+        remaining = int(self.headers.get('Content-Length') or 0)
+        while remaining > 0:
+            chunk = self.rfile.read(min(remaining, chunk_size))
+            if not chunk:
+                return
+            remaining -= len(chunk)
+            yield chunk
+
+    def log_message(self, *args):
+        pass
+
+
+def _error(status, code, headers=None):
+    return status, {'code': code, 'message': status.phrase}, headers or {}
+
+
+def _device_id(email):
+    return hashlib.sha1(email.encode()).hexdigest()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog='python -m epson_connect.simulator',
+        description='Local stand-in for the Epson Connect API.',
+    )
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument('--latency', type=float, default=0.0, help='seconds per response')
+    parser.add_argument('--jitter', type=float, default=0.0, help='extra random seconds')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='fraction failing with 503')
+    parser.add_argument('--token-lifetime', type=int, default=3600, help='seconds')
+    parser.add_argument('--rate-limit', type=float, help='requests per second per client ID')
+    parser.add_argument('--burst', type=float, help='rate limit bucket size')
+    parser.add_argument('--upload-bandwidth', type=float, help='bytes per second')
+    parser.add_argument('--print-seconds', type=float, default=1.0, help='seconds to complete')
+    parser.add_argument('--seed', type=int)
+    args = parser.parse_args(argv)
+
+    simulator = Simulator(
+        host=args.host,
+        port=args.port,
+        latency=args.latency,
+        jitter=args.jitter,
+        error_rate=args.error_rate,
+        token_lifetime=args.token_lifetime,
+        rate_limit=args.rate_limit,
+        burst=args.burst,
+        upload_bandwidth=args.upload_bandwidth,
+        print_seconds=args.print_seconds,
+        seed=args.seed,
+    )
+    print(f'Epson Connect simulator listening on {simulator.url}', flush=True)
+    try:
+        simulator.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        simulator.stop()
+
+
+if __name__ == '__main__':
+    main()
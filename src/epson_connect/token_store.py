@@ -0,0 +1,128 @@
+import contextlib
+import json
+import os
+import tempfile
+import threading
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover
+    fcntl = None
+    import msvcrt
+
+
+class TokenStore:
+    """
+    Interface for persisting OAuth tokens between AuthCtx instances and processes.
+
+    Tokens are stored as dicts with ``access_token``, ``refresh_token``,
+    ``expires_at`` (a POSIX timestamp) and ``subject_id``, keyed by
+    ``token_key(client_id, printer_email)``. Subclass and implement ``get``,
+    ``set`` and ``delete`` to back the store with e.g. Redis.
+    """
+
+    def get(self, key: str):
+        """
+        Return the token stored under ``key`` or None.
+        """
+        raise NotImplementedError
+
+    def set(self, key: str, token: dict):
+        """
+        Store ``token`` under ``key``.
+        """
+        raise NotImplementedError
+
+    def delete(self, key: str):
+        """
+        Remove any token stored under ``key``.
+        """
+        raise NotImplementedError
+
+
+class MemoryTokenStore(TokenStore):
+    """
+    Process-local token store, e.g. to share tokens between clients in one process.
+    """
+
+    def __init__(self) -> None:
+        self._tokens = {}
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            token = self._tokens.get(key)
+            return dict(token) if token else None
+
+    def set(self, key, token):
+        with self._lock:
+            self._tokens[key] = dict(token)
+
+    def delete(self, key):
+        with self._lock:
+            self._tokens.pop(key, None)
+
+
+class FileTokenStore(TokenStore):
+    """
+    JSON file token store shared between processes.
+
+    Writes take an exclusive lock on ``<path>.lock`` and atomically replace
+    the file, so concurrent processes never see a partially written store.
+    """
+
+    def __init__(self, path) -> None:
+        self._path = os.fspath(path)
+        self._lock_path = self._path + '.lock'
+        self._thread_lock = threading.Lock()
+
+    def get(self, key):
+        with self._locked():
+            return self._read().get(key)
+
+    def set(self, key, token):
+        with self._locked():
+            tokens = self._read()
+            tokens[key] = dict(token)
+            self._write(tokens)
+
+    def delete(self, key):
+        with self._locked():
+            tokens = self._read()
+            if tokens.pop(key, None) is not None:
+                self._write(tokens)
+
+    @contextlib.contextmanager
+    def _locked(self):
+        with self._thread_lock:
+            fd = os.open(self._lock_path, os.O_RDWR | os.O_CREAT, 0o600)
+            try:
+                if fcntl is not None:
+                    fcntl.flock(fd, fcntl.LOCK_EX)
+                else:  # pragma: no cover
+                    msvcrt.locking(fd, msvcrt.LK_LOCK, 1)
+                yield
+            finally:
+                os.close(fd)
+
+    def _read(self) -> dict:
+        try:
+            with open(self._path) as fp:
+                return json.load(fp)
+        except (FileNotFoundError, ValueError):
+            return {}
+
+    def _write(self, tokens: dict):
+        directory = os.path.dirname(os.path.abspath(self._path))
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.tokens-')
+        try:
+            with os.fdopen(fd, 'w') as fp:
+                json.dump(tokens, fp)
+            os.replace(tmp_path, self._path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+
+def token_key(client_id: str, printer_email: str) -> str:
+    return f'{client_id}:{printer_email}'
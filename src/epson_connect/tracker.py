@@ -0,0 +1,291 @@
+import asyncio
+import heapq
+import itertools
+import logging
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Optional
+
+from .printer import Printer
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class JobTransition:
+    """
+    A job's status changed from ``old_status`` (None when first seen) to ``new_status``.
+    """
+
+    job_id: str
+    old_status: Optional[str]
+    new_status: str
+    info: dict
+
+
+class _Job:
+
+    def __init__(self, job_id, now, interval):
+        self.job_id = job_id
+        self.future = Future()
+        self.started = now
+        self.interval = interval
+        self.next_poll = now
+        self.status = None
+        self.errors = 0
+
+
+class JobTracker:
+    """
+    Wait for many print jobs on one printer without polling each one yourself.
+
+    Every tracked job is polled by a single background scheduler. Intervals
+    start at ``min_interval``, grow by ``backoff`` while a job's status stays
+    the same (up to ``max_interval``) and are shortened again when a job
+    approaches the typical completion time seen so far. Waiters on the same
+    job share one future, so any number of them cost one poll per interval::
+
+        tracker = JobTracker(client.printer)
+        job_id = client.printer.print('./file.pdf')
+        info = tracker.wait(job_id, timeout=300)
+
+    Jobs resolve with their final job info once their status is one of
+    ``TERMINAL_STATUSES``.
+    """
+
+    TERMINAL_STATUSES = frozenset({'completed', 'canceled', 'aborted'})
+
+    def __init__(
+            self,
+            printer: Printer,
+            min_interval: float = 1.0,
+            max_interval: float = 30.0,
+            backoff: float = 1.5,
+            expected_seconds: float = None,
+            max_errors: int = 3,
+            max_workers: int = 4,
+    ) -> None:
+        """
+        :param min_interval: Seconds between the first polls of a job.
+        :param max_interval: Upper bound for the interval of long-running jobs.
+        :param backoff: Factor the interval grows by while a status is unchanged.
+        :param expected_seconds: Initial guess of how long a job takes; refined
+            from jobs seen to finish.
+        :param max_errors: Consecutive failed polls after which a job's future fails.
+        :param max_workers: Polls running concurrently.
+        """
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.backoff = backoff
+        self.max_errors = max_errors
+
+        self._printer = printer
+        self._expected = expected_seconds
+        self._listeners = []
+
+        self._jobs = {}
+        # (next poll, sequence, job); stale entries are skipped.
+        self._schedule = []
+        self._sequence = itertools.count()
+        self._cond = threading.Condition()
+        self._closed = False
+        self._thread = None
+        self._pool = ThreadPoolExecutor(
+            max_workers=max_workers,
+            thread_name_prefix='epson-connect-job-poll',
+        )
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __len__(self):
+        return len(self._jobs)
+
+    @property
+    def expected_seconds(self):
+        """
+        Smoothed time jobs took to finish, or None before the first one did.
+        """
+        return self._expected
+
+    def add_listener(self, callback):
+        """
+        Call ``callback(JobTransition)`` on every status change.
+
+        Callbacks run on the tracker's threads and must not block.
+        """
+        self._listeners.append(callback)
+
+    def remove_listener(self, callback):
+        self._listeners.remove(callback)
+
+    def track(self, job_id) -> Future:
+        """
+        Start tracking a job; tracking the same job again returns the same future.
+        """
+        with self._cond:
+            if self._closed:
+                raise RuntimeError('JobTracker is closed')
+
+            job = self._jobs.get(job_id)
+            if job is None:
+                job = self._jobs[job_id] = _Job(job_id, time.monotonic(), self.min_interval)
+                self._push(job)
+                self._start()
+
+            return job.future
+
+    def wait(self, job_id, timeout: float = None) -> dict:
+        """
+        Block until a job finishes and return its final job info.
+
+        Raises concurrent.futures.TimeoutError if it does not finish in time;
+        the job keeps being tracked for other waiters.
+        """
+        return self.track(job_id).result(timeout)
+
+    async def wait_async(self, job_id, timeout: float = None) -> dict:
+        """
+        asyncio version of ``wait``.
+        """
+        # Shield the shared future so a cancelled waiter does not cancel it for everyone.
+        future = asyncio.shield(asyncio.wrap_future(self.track(job_id)))
+        return await asyncio.wait_for(future, timeout)
+
+    def update(self, job_id, info: dict):
+        """
+        Apply job info obtained elsewhere, e.g. from a notification callback.
+
+        Unknown jobs are ignored.
+        """
+        with self._cond:
+            job = self._jobs.get(job_id)
+        if job is not None:
+            self._apply(job, info)
+
+    def close(self):
+        """
+        Stop polling; waiters on unfinished jobs see their futures cancelled.
+        """
+        with self._cond:
+            self._closed = True
+            jobs = list(self._jobs.values())
+            self._jobs.clear()
+            self._schedule.clear()
+            self._cond.notify_all()
+
+        for job in jobs:
+            job.future.cancel()
+
+        self._pool.shutdown(wait=False)
+
+    def _start(self):
+        # Must hold the lock.
+        if self._thread is None:
+            self._thread = threading.Thread(
+                target=self._run,
+                name='epson-connect-job-tracker',
+                daemon=True,
+            )
+            self._thread.start()
+
+    def _push(self, job):
+        # Must hold the lock.
+        heapq.heappush(self._schedule, (job.next_poll, next(self._sequence), job))
+        self._cond.notify()
+
+    def _run(self):
+        with self._cond:
+            while not self._closed:
+                now = time.monotonic()
+                while self._schedule and self._schedule[0][0] <= now:
+                    when, _, job = heapq.heappop(self._schedule)
+                    if self._jobs.get(job.job_id) is job and job.next_poll == when:
+                        self._pool.submit(self._poll, job)
+
+                timeout = self._schedule[0][0] - now if self._schedule else None
+                self._cond.wait(timeout)
+
+    def _poll(self, job):
+        try:
+            info = self._printer.job_info(job.job_id)
+        except Exception as e:
+            self._poll_failed(job, e)
+        else:
+            self._apply(job, info)
+
+    def _poll_failed(self, job, error):
+        with self._cond:
+            if self._jobs.get(job.job_id) is not job:
+                return
+
+            job.errors += 1
+            if job.errors < self.max_errors:
+                logger.info('Polling job %s failed, retrying: %s', job.job_id, error)
+                self._reschedule(job, changed=False)
+                return
+
+            del self._jobs[job.job_id]
+
+        job.future.set_exception(error)
+
+    def _apply(self, job, info):
+        status = info.get('status')
+
+        with self._cond:
+            if self._jobs.get(job.job_id) is not job:
+                # Already finished, e.g. by a notification racing a poll.
+                return
+
+            old_status, job.status = job.status, status
+            job.errors = 0
+
+            done = status in self.TERMINAL_STATUSES
+            if done:
+                del self._jobs[job.job_id]
+                self._observe(time.monotonic() - job.started)
+            else:
+                self._reschedule(job, changed=status != old_status)
+
+        if status != old_status:
+            transition = JobTransition(job.job_id, old_status, status, info)
+            for listener in list(self._listeners):
+                try:
+                    listener(transition)
+                except Exception:
+                    logger.exception('Job transition listener failed')
+
+        if done:
+            job.future.set_result(info)
+
+    def _reschedule(self, job, changed):
+        # Must hold the lock.
+        now = time.monotonic()
+
+        if changed:
+            job.interval = self.min_interval
+        else:
+            job.interval = min(job.interval * self.backoff, self.max_interval)
+
+        interval = job.interval
+        if self._expected is not None:
+            # Check back right when the job should be done rather than a
+            # long backed-off interval later.
+            remaining = self._expected - (now - job.started)
+            if 0 < remaining < interval:
+                interval = max(remaining, self.min_interval)
+
+        job.next_poll = now + interval
+        self._push(job)
+
+    def _observe(self, seconds):
+        # Must hold the lock.
+        if self._expected is None:
+            self._expected = seconds
+        else:
+            self._expected += 0.2 * (seconds - self._expected)
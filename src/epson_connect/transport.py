@@ -0,0 +1,53 @@
+import requests
+from requests.adapters import HTTPAdapter
+
+
+class Transport:
+    """
+    Pooled, keep-alive HTTP transport.
+
+    A single transport is meant to be shared by every AuthCtx (and therefore
+    every Printer and Scanner) created from one Client so that TCP and TLS
+    connections to the API are reused instead of being re-established on
+    every call.
+    """
+
+    def __init__(
+            self,
+            pool_connections: int = 10,
+            pool_maxsize: int = 10,
+            pool_block: bool = False,
+            session: requests.Session = None,
+    ) -> None:
+        """
+        :param pool_connections: Number of per-host connection pools to cache.
+        :param pool_maxsize: Maximum number of connections kept alive per host.
+        :param pool_block: Block when the pool is exhausted instead of opening
+            throwaway connections.
+        :param session: Optional pre-configured session to use.
+        """
+        self._session = session or requests.Session()
+
+        adapter = HTTPAdapter(
+            pool_connections=pool_connections,
+            pool_maxsize=pool_maxsize,
+            pool_block=pool_block,
+        )
+        self._session.mount('https://', adapter)
+        self._session.mount('http://', adapter)
+
+    @property
+    def session(self) -> requests.Session:
+        return self._session
+
+    def request(self, method, url, **kwargs) -> requests.Response:
+        """
+        Send a request over a pooled connection.
+        """
+        return self._session.request(method, url, **kwargs)
+
+    def close(self):
+        """
+        Close all pooled connections.
+        """
+        self._session.close()
@@ -0,0 +1,168 @@
+import os
+import pathlib
+
+CHUNK_SIZE = 64 * 1024
+
+
+class UploadSource:
+    """
+    A memory-bounded upload body.
+
+    Accepts a file path, a binary file-like object, or a bytes-like object and
+    exposes it as a streamable body with a known length so that uploads never
+    have to hold a whole document in memory::
+
+        with UploadSource('./file.pdf') as source:
+            requests.post(url, data=source.body, headers={'Content-Length': str(source.length)})
+    """
+
+    def __init__(self, source, extension: str = None) -> None:
+        """
+        :param source: Path, binary file object, ``bytes``, ``bytearray`` or ``memoryview``.
+        :param extension: File extension such as ``'.pdf'``. Required when it can
+            not be derived from ``source``.
+        """
+        self._source = source
+        self._fp = None
+        self._owns_fp = False
+
+        name = None
+        if isinstance(source, (str, os.PathLike)):
+            name = source
+        elif hasattr(source, 'read'):
+            name = getattr(source, 'name', None)
+        elif not isinstance(source, (bytes, bytearray, memoryview)):
+            raise UploadError(f'Can not upload object of type {type(source).__name__}.')
+
+        if not extension and isinstance(name, (str, os.PathLike)):
+            extension = pathlib.Path(name).suffix
+
+        if not extension:
+            raise UploadError('Can not determine file extension; pass "extension".')
+
+        if not extension.startswith('.'):
+            extension = '.' + extension
+
+        self.extension = extension.lower()
+        self.length = None
+        self.body = None
+        self._start = 0
+
+    def __enter__(self):
+        self.open()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def open(self):
+        source = self._source
+
+        if isinstance(source, (str, os.PathLike)):
+            self._fp = open(source, 'rb')
+            self._owns_fp = True
+            self.length = os.fstat(self._fp.fileno()).st_size
+            self.body = self._fp
+        elif hasattr(source, 'read'):
+            self._fp = source
+            self.length = _remaining_length(source)
+            if self.length is None:
+                # Unsized, unseekable stream: the only way to learn its length.
+                self.body = source.read()
+                self.length = len(self.body)
+            else:
+                self.body = source
+        elif isinstance(source, memoryview):
+            view = source.cast('B') if source.format != 'B' or source.ndim != 1 else source
+            self.length = view.nbytes
+            self.body = _BufferReader(view)
+        else:
+            self.length = len(source)
+            self.body = source
+
+        if hasattr(self.body, 'tell'):
+            self._start = self.body.tell()
+
+    def close(self):
+        if self._owns_fp and self._fp is not None:
+            self._fp.close()
+        self._fp = None
+        self._owns_fp = False
+
+    def rewind(self):
+        """
+        Move a streamed body back to where it started, e.g. to retry an upload.
+        """
+        if hasattr(self.body, 'seek'):
+            self.body.seek(self._start)
+
+    def chunks(self, chunk_size: int = CHUNK_SIZE):
+        """
+        Iterate over the body in chunks of at most ``chunk_size`` bytes.
+        """
+        body = self.body
+        if isinstance(body, (bytes, bytearray)):
+            body = _BufferReader(memoryview(body))
+
+        while True:
+            chunk = body.read(chunk_size)
+            if not chunk:
+                return
+            yield chunk
+
+
+class _BufferReader:
+    """
+    File-like, zero-copy reader over a buffer.
+    """
+
+    def __init__(self, view: memoryview) -> None:
+        self._view = view
+        self._pos = 0
+
+    def __len__(self):
+        return self._view.nbytes
+
+    def read(self, size=-1) -> bytes:
+        end = self._view.nbytes if size is None or size < 0 else self._pos + size
+        chunk = self._view[self._pos:end].tobytes()
+        self._pos += len(chunk)
+        return chunk
+
+    def tell(self) -> int:
+        return self._pos
+
+    def seek(self, offset, whence=os.SEEK_SET) -> int:
+        if whence == os.SEEK_CUR:
+            offset += self._pos
+        elif whence == os.SEEK_END:
+            offset += self._view.nbytes
+        self._pos = min(max(offset, 0), self._view.nbytes)
+        return self._pos
+
+
+def _remaining_length(fp):
+    """
+    Number of bytes left to read from ``fp`` or None if unknown.
+    """
+    try:
+        position = fp.tell()
+    except (AttributeError, OSError):
+        return None
+
+    try:
+        return os.fstat(fp.fileno()).st_size - position
+    except (AttributeError, OSError, ValueError):
+        pass
+
+    try:
+        end = fp.seek(0, os.SEEK_END)
+        fp.seek(position)
+    except (AttributeError, OSError):
+        return None
+
+    return end - position
+
+
+class UploadError(ValueError):
+    pass
@@ -0,0 +1,207 @@
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+
+from .upload import UploadSource
+
+
+class UploadCache:
+    """
+    Content-addressed, in-memory cache of files that are printed repeatedly.
+
+    A file is read and hashed once; later prints of the unchanged file (same
+    size, mtime and inode) only cost a ``stat`` and upload straight from
+    memory. Contents are stored once per SHA-256 digest however many paths
+    point at them, and preprocessed variants (see ``derive``) are cached
+    next to them. Total memory is bounded by ``max_bytes`` and the number of
+    remembered paths by ``max_files`` (least recently used first out)::
+
+        cache = UploadCache(max_bytes=64 * 1024 * 1024)
+        ec = Client(..., upload_cache=cache)
+        ec.printer.print('./shipping-label.pdf')
+        cache.stats()['hit_ratio']
+    """
+
+    def __init__(
+            self,
+            max_bytes: int = 256 * 1024 * 1024,
+            max_file_bytes: int = 32 * 1024 * 1024,
+            max_files: int = 16384,
+    ) -> None:
+        """
+        :param max_bytes: Memory used for contents and derived variants.
+        :param max_file_bytes: Larger files are streamed from disk as usual.
+        :param max_files: Paths whose signature and digest are remembered.
+        """
+        self.max_bytes = max_bytes
+        self.max_file_bytes = max_file_bytes
+        self.max_files = max_files
+
+        # path -> ((size, mtime_ns, inode), digest), least recently used first.
+        # Outlives evicted contents so they can be reloaded without rehashing.
+        self._files = OrderedDict()
+        # digest or (digest, variant) -> bytes, least recently used first.
+        self._contents = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+
+        self._stats = dict.fromkeys(
+            ('hits', 'misses', 'reloads', 'bypassed', 'derived_hits', 'derived_misses'),
+            0,
+        )
+
+    def source(self, file, extension: str = None) -> UploadSource:
+        """
+        UploadSource for ``file``, served from memory when possible.
+
+        Only paths are cached; other sources are passed through.
+        """
+        if not isinstance(file, (str, os.PathLike)):
+            return UploadSource(file, extension)
+
+        extension = UploadSource(file, extension).extension
+        digest, content = self.load(file)
+        if content is None:
+            return UploadSource(file, extension)
+        return UploadSource(memoryview(content), extension)
+
+    def load(self, path):
+        """
+        Digest and contents of a file, or ``(None, None)`` if it is too large to cache.
+        """
+        path = os.path.abspath(path)
+        stat = os.stat(path)
+        signature = (stat.st_size, stat.st_mtime_ns, stat.st_ino)
+
+        if stat.st_size > self.max_file_bytes:
+            self._count('bypassed')
+            return None, None
+
+        with self._lock:
+            known = self._files.get(path)
+            if known is not None and known[0] == signature:
+                content = self._contents.get(known[1])
+                if content is not None:
+                    self._files.move_to_end(path)
+                    self._contents.move_to_end(known[1])
+                    self._stats['hits'] += 1
+                    return known[1], content
+
+        if known is not None and known[0] == signature:
+            # Unchanged, but its contents were evicted: read without rehashing.
+            with open(path, 'rb') as f:
+                content = f.read()
+            digest = known[1]
+            self._count('reloads')
+        else:
+            digest, content = _read_and_hash(path)
+            self._count('misses')
+
+        with self._lock:
+            self._files[path] = (signature, digest)
+            self._files.move_to_end(path)
+            while len(self._files) > self.max_files:
+                self._files.popitem(last=False)
+            content = self._store(digest, content)
+
+        return digest, content
+
+    def derive(self, digest: str, variant, transform, content: bytes = None) -> bytes:
+        """
+        Cached result of ``transform(content)`` for the content with ``digest``.
+
+        :param variant: Hashable description of the transform and its
+            options, e.g. ``('photo', 'ms_a4', 'normal', 85)``.
+        :param content: The content, in case it was evicted since ``load``.
+        """
+        derived = self.get_derived(digest, variant)
+        if derived is not None:
+            return derived
+
+        if content is None:
+            with self._lock:
+                content = self._contents.get(digest)
+            if content is None:
+                raise KeyError(digest)
+
+        return self.put_derived(digest, variant, transform(content))
+
+    def get_derived(self, digest: str, variant) -> bytes:
+        """
+        A variant stored with ``put_derived``, or None.
+        """
+        key = (digest, variant)
+        with self._lock:
+            derived = self._contents.get(key)
+            if derived is None:
+                return None
+            self._contents.move_to_end(key)
+            self._stats['derived_hits'] += 1
+            return derived
+
+    def put_derived(self, digest: str, variant, derived: bytes) -> bytes:
+        with self._lock:
+            self._stats['derived_misses'] += 1
+            return self._store((digest, variant), derived)
+
+    def _store(self, key, content):
+        # Must hold the lock.
+        existing = self._contents.get(key)
+        if existing is not None:
+            self._contents.move_to_end(key)
+            return existing
+
+        if len(content) > self.max_bytes:
+            return content
+
+        self._contents[key] = content
+        self._size += len(content)
+        while self._size > self.max_bytes:
+            _, evicted = self._contents.popitem(last=False)
+            self._size -= len(evicted)
+        return content
+
+    def _count(self, name):
+        with self._lock:
+            self._stats[name] += 1
+
+    def invalidate(self, path=None):
+        """
+        Forget one file, or everything when ``path`` is None.
+        """
+        with self._lock:
+            if path is None:
+                self._files.clear()
+                self._contents.clear()
+                self._size = 0
+            else:
+                self._files.pop(os.path.abspath(path), None)
+
+    def stats(self) -> dict:
+        """
+        Hit counts and ratio, plus memory in use.
+
+        ``hits`` were served from memory after a ``stat``; ``reloads`` were
+        re-read without rehashing; ``misses`` were read and hashed.
+        """
+        with self._lock:
+            stats = dict(self._stats)
+            stats['bytes'] = self._size
+            stats['files'] = len(self._files)
+
+        lookups = stats['hits'] + stats['reloads'] + stats['misses']
+        stats['hit_ratio'] = stats['hits'] / lookups if lookups else 0.0
+        return stats
+
+
+def _read_and_hash(path, chunk_size=1024 * 1024):
+    # Hash each chunk as it is read, while it is still in the CPU cache,
+    # instead of walking the whole file a second time afterwards.
+    digest = hashlib.sha256()
+    chunks = []
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+            chunks.append(chunk)
+    return digest.hexdigest(), b''.join(chunks)
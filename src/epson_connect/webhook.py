@@ -0,0 +1,216 @@
+import asyncio
+import hmac
+import json
+import logging
+from http import HTTPStatus
+from urllib.parse import parse_qs
+
+logger = logging.getLogger(__name__)
+
+
+class WebhookReceiver:
+    """
+    Receive job status notifications registered with ``Printer.notification``.
+
+    Each notification is a JSON object (or list of objects) carrying the job
+    ID in ``job_id`` (or ``id``) and the job info fields, e.g. ``status``. It
+    is handed to every registered JobTracker, resolving waiters without
+    polling, and to every listener.
+
+    Use the receiver as a WSGI app (``receiver.wsgi``), an ASGI app
+    (``receiver.asgi``) or run it standalone::
+
+        tracker = JobTracker(client.printer, min_interval=30)
+        receiver = WebhookReceiver([tracker], token='s3cret')
+        server = await receiver.serve(port=8080)
+        client.printer.notification('https://example.com/?token=s3cret')
+
+    When ``token`` is set, requests must carry it in the ``token`` query
+    parameter, so the callback URL doubles as a shared secret.
+    """
+
+    def __init__(self, trackers=(), token: str = None, path: str = '/', max_body: int = 64 * 1024):
+        """
+        :param trackers: JobTrackers to update.
+        :param token: Secret expected in the ``token`` query parameter, or None.
+        :param path: Path notifications are posted to.
+        :param max_body: Largest accepted request body in bytes.
+        """
+        self._trackers = list(trackers)
+        self._listeners = []
+        self._token = token
+        self.path = path
+        self.max_body = max_body
+
+    def add_tracker(self, tracker):
+        self._trackers.append(tracker)
+
+    def add_listener(self, callback):
+        """
+        Call ``callback(job_id, info)`` for every notification received.
+        """
+        self._listeners.append(callback)
+
+    def dispatch(self, notification: dict):
+        """
+        Hand one notification to the trackers and listeners.
+        """
+        job_id = notification.get('job_id') or notification.get('id')
+        if not job_id:
+            raise WebhookError('Notification has no job ID')
+
+        for tracker in self._trackers:
+            tracker.update(job_id, notification)
+
+        for listener in self._listeners:
+            try:
+                listener(job_id, notification)
+            except Exception:
+                logger.exception('Notification listener failed')
+
+    def handle(self, method: str, path: str, query: str, body: bytes) -> int:
+        """
+        Process one request independently of the server it came from.
+
+        :return: HTTP status code for the response.
+        """
+        if path != self.path:
+            return HTTPStatus.NOT_FOUND
+        if method != 'POST':
+            return HTTPStatus.METHOD_NOT_ALLOWED
+        if self._token is not None:
+            token = parse_qs(query).get('token', [''])[0]
+            if not hmac.compare_digest(token.encode(), self._token.encode()):
+                return HTTPStatus.FORBIDDEN
+
+        try:
+            payload = json.loads(body)
+            notifications = payload if isinstance(payload, list) else [payload]
+            for notification in notifications:
+                self.dispatch(notification)
+        except (ValueError, AttributeError, WebhookError) as e:
+            logger.info('Rejected notification: %s', e)
+            return HTTPStatus.BAD_REQUEST
+
+        return HTTPStatus.OK
+
+    def wsgi(self, environ, start_response):
+        """
+        WSGI application.
+        """
+        try:
+            length = int(environ.get('CONTENT_LENGTH') or 0)
+        except ValueError:
+            length = -1
+
+        if 0 <= length <= self.max_body:
+            status = self.handle(
+                environ['REQUEST_METHOD'],
+                environ.get('PATH_INFO') or '/',
+                environ.get('QUERY_STRING', ''),
+                environ['wsgi.input'].read(length),
+            )
+        else:
+            status = HTTPStatus.REQUEST_ENTITY_TOO_LARGE
+
+        start_response(f'{status.value} {status.phrase}', [('Content-Length', '0')])
+        return [b'']
+
+    async def asgi(self, scope, receive, send):
+        """
+        ASGI application.
+        """
+        if scope['type'] == 'lifespan':
+            while True:
+                message = await receive()
+                if message['type'] == 'lifespan.startup':
+                    await send({'type': 'lifespan.startup.complete'})
+                elif message['type'] == 'lifespan.shutdown':
+                    await send({'type': 'lifespan.shutdown.complete'})
+                    return
+
+        body = b''
+        status = None
+        while True:
+            message = await receive()
+            body += message.get('body', b'')
+            if len(body) > self.max_body:
+                status = HTTPStatus.REQUEST_ENTITY_TOO_LARGE
+                break
+            if not message.get('more_body'):
+                break
+
+        if status is None:
+            status = self.handle(
+                scope['method'],
+                scope['path'],
+                scope.get('query_string', b'').decode('latin-1'),
+                body,
+            )
+
+        await send({
+            'type': 'http.response.start',
+            'status': status.value,
+            'headers': [(b'content-length', b'0')],
+        })
+        await send({'type': 'http.response.body', 'body': b''})
+
+    async def serve(self, host: str = '0.0.0.0', port: int = 8080) -> asyncio.AbstractServer:
+        """
+        Start a standalone HTTP/1.1 server on the running event loop.
+
+        :return: The started server; close it with ``server.close()``.
+        """
+        return await asyncio.start_server(self._serve_connection, host, port)
+
+    async def _serve_connection(self, reader, writer):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    return
+
+                method, target, version = request_line.decode('latin-1').split()
+                headers = await _read_headers(reader)
+
+                length = int(headers.get('content-length') or 0)
+                if length > self.max_body:
+                    status = HTTPStatus.REQUEST_ENTITY_TOO_LARGE
+                elif 'chunked' in headers.get('transfer-encoding', ''):
+                    status = HTTPStatus.LENGTH_REQUIRED
+                else:
+                    body = await reader.readexactly(length)
+                    path, _, query = target.partition('?')
+                    status = self.handle(method, path, query, body)
+
+                keep_alive = status < 400 and version == 'HTTP/1.1'
+                if headers.get('connection', '').lower() == 'close':
+                    keep_alive = False
+
+                connection = 'keep-alive' if keep_alive else 'close'
+                writer.write((
+                    f'{version} {status.value} {status.phrase}\r\n'
+                    f'Content-Length: 0\r\n'
+                    f'Connection: {connection}\r\n\r\n'
+                ).encode('latin-1'))
+                await writer.drain()
+                if not keep_alive:
+                    return
+        except (ValueError, asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+
+async def _read_headers(reader) -> dict:
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b'\r\n', b'\n', b''):
+            return headers
+        name, _, value = line.decode('latin-1').partition(':')
+        headers[name.strip().lower()] = value.strip()
+
+
+class WebhookError(ValueError):
+    pass
@@ -0,0 +1,39 @@
+import collections
+import threading
+
+import pytest
+
+Request = collections.namedtuple('Request', 'method path data json headers')
+
+
+class FakeAuthCtx:
+    """
+    Stands in for AuthCtx in Printer tests.
+
+    Every request is recorded in ``requests`` and answered by
+    ``respond(request)``, which creates a job unless a test replaces it.
+    """
+
+    device_id = 'dev-1'
+
+    def __init__(self):
+        self.requests = []
+        self.lock = threading.Lock()
+
+    def send(self, method, path, data=None, json=None, headers=None, **kwargs):
+        # Uploads may be streamed; keep the bytes so tests can compare them.
+        if data is not None and hasattr(data, 'read'):
+            data = data.read()
+
+        request = Request(method, path, data, json, headers)
+        with self.lock:
+            self.requests.append(request)
+        return self.respond(request)
+
+    def respond(self, request):
+        return {'id': 'job-1', 'upload_uri': 'https://example.com/upload?Key=abc'}
+
+
+@pytest.fixture
+def auth_ctx():
+    return FakeAuthCtx()
@@ -0,0 +1,238 @@
+import asyncio
+import json
+import threading
+from datetime import datetime, timedelta
+
+import httpx
+import pytest
+
+from epson_connect.aio import AsyncAuthCtx, AsyncClient, AsyncTransport
+from epson_connect.printer import PrinterError
+from epson_connect.printer_settings import PrintSettingError
+from epson_connect.retry import RetryPolicy
+from epson_connect.scanner import ScannerError
+
+
+def make_client(handler):
+    transport = AsyncTransport(client=httpx.AsyncClient(transport=httpx.MockTransport(handler)))
+    return AsyncClient(
+        base_url='https://example.com',
+        printer_email='example@print.epsonconnect.com',
+        client_id='abc',
+        client_secret='123',
+        transport=transport,
+    )
+
+
+class FakeApi:
+    def __init__(self):
+        self.calls = []
+        self.token_grants = 0
+
+    def __call__(self, request):
+        path = request.url.path
+        self.calls.append((request.method, path))
+
+        if path == '/api/1/printing/oauth2/auth/token':
+            self.token_grants += 1
+            assert request.headers['Authorization'].startswith('Basic ')
+            return httpx.Response(200, json={
+                'refresh_token': 'rf-123',
+                'expires_in': '3600',
+                'access_token': 'at-5678',
+                'subject_id': 'dev-1',
+            })
+
+        if path.startswith('/api/'):
+            assert request.headers['Authorization'] == 'Bearer at-5678'
+
+        if path == '/api/1/printing/printers/dev-1/jobs':
+            body = json.loads(request.content)
+            return httpx.Response(200, json={
+                'id': 'job-' + body['job_name'],
+                'upload_uri': 'https://example.com/upload?Key=k1',
+            })
+        if path == '/upload':
+            assert request.url.params['Key'] == 'k1'
+            assert request.url.params['File'] == '1.pdf'
+            assert request.content == b'%PDF-1.4'
+            return httpx.Response(200, content=b'{}')
+        if path.endswith('/print'):
+            return httpx.Response(200, json={})
+        if path.startswith('/api/1/printing/printers/dev-1/jobs/'):
+            return httpx.Response(200, json={'status': 'completed'})
+        if path == '/api/1/scanning/scanners/dev-1/destinations':
+            if request.method == 'GET':
+                return httpx.Response(200, json={'destinations': []})
+            body = json.loads(request.content)
+            body.setdefault('id', 'dest-1')
+            return httpx.Response(200, json=body)
+
+        return httpx.Response(404, json={'code': 'not_found'})
+
+
+def test_async_print(tmp_path):
+    pdf = tmp_path / 'doc.pdf'
+    pdf.write_bytes(b'%PDF-1.4')
+    api = FakeApi()
+
+    async def main():
+        async with make_client(api) as client:
+            job_id = await client.printer.print(str(pdf), {'job_name': 'a'})
+            info = await client.printer.job_info(job_id)
+            return job_id, info
+
+    job_id, info = asyncio.run(main())
+
+    assert job_id == 'job-a'
+    assert info == {'status': 'completed'}
+    assert api.calls[-2] == ('POST', '/api/1/printing/printers/dev-1/jobs/job-a/print')
+
+
+def test_async_concurrent_prints_share_one_token(tmp_path):
+    pdf = tmp_path / 'doc.pdf'
+    pdf.write_bytes(b'%PDF-1.4')
+    api = FakeApi()
+
+    async def main():
+        async with make_client(api) as client:
+            await client.warmup()
+            client._auth_ctx._access_token = ''
+            client._auth_ctx._expires_at = datetime.now() - timedelta(hours=1)
+            return await asyncio.gather(*(
+                client.printer.print(str(pdf), {'job_name': str(i)})
+                for i in range(200)
+            ))
+
+    job_ids = asyncio.run(main())
+
+    assert len(set(job_ids)) == 200
+    assert api.token_grants == 2
+
+
+def test_async_client_built_outside_the_loop(tmp_path):
+    pdf = tmp_path / 'doc.pdf'
+    pdf.write_bytes(b'%PDF-1.4')
+    api = FakeApi()
+
+    # E.g. at import time of a web app, or in a worker thread without a loop.
+    clients = []
+    thread = threading.Thread(target=lambda: clients.append(make_client(api)))
+    thread.start()
+    thread.join()
+    client = clients[0]
+
+    async def main():
+        async with client:
+            return await asyncio.gather(*(
+                client.printer.print(str(pdf), {'job_name': str(i)})
+                for i in range(20)
+            ))
+
+    assert len(set(asyncio.run(main()))) == 20
+    # All 20 prints contended for one grant.
+    assert api.token_grants == 1
+
+
+def test_async_printer_validation():
+    api = FakeApi()
+
+    async def main():
+        client = make_client(api)
+        with pytest.raises(PrintSettingError):
+            await client.printer.print_setting({'job_name': 'a', 'print_mode': 'bad'})
+        with pytest.raises(PrinterError):
+            await client.printer.cancel_print('job-a', operated_by='nobody')
+        with pytest.raises(PrinterError):
+            await client.printer.cancel_print('job-a')
+        await client.close()
+
+    asyncio.run(main())
+
+
+def test_async_scanner_crud():
+    api = FakeApi()
+
+    async def main():
+        async with make_client(api) as client:
+            scanner = client.scanner
+            assert await scanner.list() == {'destinations': []}
+
+            dest = await scanner.add('name', 'to@example.com')
+            assert dest['id'] == 'dest-1'
+
+            dest = await scanner.update('dest-1', name='other')
+            assert dest['alias_name'] == 'other'
+            assert dest['destination'] == 'to@example.com'
+
+            with pytest.raises(ScannerError):
+                await scanner.update('dest-2', name='other')
+
+            await scanner.remove('dest-1')
+            assert scanner._destination_cache == {}
+
+    asyncio.run(main())
+
+
+def test_async_background_refresh():
+    api = FakeApi()
+
+    async def main():
+        transport = AsyncTransport(
+            client=httpx.AsyncClient(transport=httpx.MockTransport(api)),
+        )
+        auth_ctx = AsyncAuthCtx(
+            'https://example.com',
+            'example@print.epsonconnect.com',
+            'abc',
+            '123',
+            transport=transport,
+            refresh_ratio=0.5,
+        )
+        await auth_ctx._auth()
+        assert api.token_grants == 1
+
+        # Pretend half the lifetime has passed before the refresher first sleeps.
+        auth_ctx._refresh_at = datetime.now()
+        for _ in range(100):
+            await asyncio.sleep(0.01)
+            if api.token_grants == 2:
+                break
+
+        await auth_ctx.close()
+        await transport.close()
+
+    asyncio.run(main())
+    assert api.token_grants == 2
+
+
+def test_async_retry_sends_refreshed_token():
+    seen = []
+
+    def handler(request):
+        seen.append(request.headers['Authorization'])
+        status = 503 if len(seen) == 1 else 200
+        return httpx.Response(status, json={})
+
+    async def main():
+        transport = AsyncTransport(client=httpx.AsyncClient(transport=httpx.MockTransport(handler)))
+        auth_ctx = AsyncAuthCtx(
+            'https://example.com',
+            'example@print.epsonconnect.com',
+            'abc',
+            '123',
+            transport=transport,
+            retry_policy=RetryPolicy(backoff_factor=0),
+        )
+        tokens = iter(['at-1', 'at-2'])
+
+        async def refresh():
+            # Stands in for a refresh (inline or background) between attempts.
+            auth_ctx._access_token = next(tokens)
+
+        auth_ctx._auth = refresh
+        await auth_ctx.send('GET', '/info')
+        await transport.close()
+
+    asyncio.run(main())
+    assert seen == ['Bearer at-1', 'Bearer at-2']
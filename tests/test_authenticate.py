@@ -1,4 +1,8 @@
+import json
+import threading
+import time
 from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 from unittest import mock
 
 import pytest
@@ -48,6 +52,7 @@ def test_auth_ctx(mocker):
         client_id='ghi',
         client_secret='789',
     )
+    auth_ctx.warmup()
 
     # Second access with expired token
     def mock_send_two(
@@ -107,7 +112,7 @@ def test_auth_ctx_api_to_auth_error():
                 printer_email='example3@print.epsonconnect.com',
                 client_id='ghi',
                 client_secret='789',
-            )
+            ).warmup()
 
 
 def test_auth_ctx_api_error():
@@ -120,11 +125,11 @@ def test_auth_ctx_api_error():
                 printer_email='example3@print.epsonconnect.com',
                 client_id='ghi',
                 client_secret='789',
-            )
+            ).warmup()
 
 
 @mock.patch('epson_connect.authenticate.AuthCtx._auth')
-@mock.patch('requests.request')
+@mock.patch('requests.Session.request')
 def test_auth_ctx_send_status_ok(req, _auth):
     mock_resp = requests.Response()
     mock_resp.encoding = 'utf8'
@@ -144,7 +149,7 @@ def test_auth_ctx_send_status_ok(req, _auth):
 
 
 @mock.patch('epson_connect.authenticate.AuthCtx._auth')
-@mock.patch('requests.request')
+@mock.patch('requests.Session.request')
 def test_auth_ctx_send_api_error(req, _auth):
     mock_resp = requests.Response()
     mock_resp.encoding = 'utf8'
@@ -166,7 +171,7 @@ def test_auth_ctx_send_api_error(req, _auth):
 
 
 @mock.patch('epson_connect.authenticate.AuthCtx._auth')
-@mock.patch('requests.request')
+@mock.patch('requests.Session.request')
 def test_auth_ctx_send_non_json_response(req, _auth):
     mock_resp = requests.Response()
     mock_resp.encoding = 'utf8'
@@ -219,6 +224,169 @@ def test_auth_ctx_deauthenticate(send):
         client_id='ghi',
         client_secret='789',
     )
+    auth_ctx.warmup()
     auth_ctx._deauthenticate()
 
     send.assert_called_with('DELETE', '/api/1/printing/printers/test_subj_id')
+
+
+@mock.patch('epson_connect.authenticate.AuthCtx.send')
+def test_auth_ctx_lazy(send):
+    send.return_value = {
+        'refresh_token': 'rf-123',
+        'expires_in': '3600',
+        'access_token': 'at-5678',
+        'subject_id': 'test_subj_id',
+    }
+
+    auth_ctx = AuthCtx(
+        base_url='https://example.com/my/path',
+        printer_email='example3@print.epsonconnect.com',
+        client_id='ghi',
+        client_secret='789',
+    )
+    send.assert_not_called()
+
+    # Nothing to cancel before the first grant.
+    auth_ctx._deauthenticate()
+    send.assert_not_called()
+
+    assert auth_ctx.device_id == 'test_subj_id'
+    assert auth_ctx.device_id == 'test_subj_id'
+    send.assert_called_once()
+
+
+@mock.patch.object(AuthCtx, 'EXPIRY_MARGIN', timedelta(0))
+def test_auth_ctx_background_refresh():
+    grants = []
+    refreshed = threading.Event()
+
+    def send(method, path, data=None, headers=None, auth=None):
+        grants.append((data['grant_type'], threading.current_thread().name))
+        if len(grants) > 1:
+            refreshed.set()
+        return {
+            'refresh_token': 'rf-123',
+            'expires_in': '1',
+            'access_token': f'at-{len(grants)}',
+            'subject_id': 'test_subj_id',
+        }
+
+    with mock.patch('epson_connect.authenticate.AuthCtx.send', side_effect=send):
+        auth_ctx = AuthCtx(
+            base_url='https://example.com/my/path',
+            printer_email='example3@print.epsonconnect.com',
+            client_id='ghi',
+            client_secret='789',
+            refresh_ratio=0.2,
+        )
+        auth_ctx.warmup()
+        assert refreshed.wait(2)
+        auth_ctx.close()
+
+    assert grants[0] == ('password', threading.current_thread().name)
+    assert grants[1] == ('refresh_token', 'epson-connect-token-refresh')
+    # The token was replaced well before it expired.
+    assert auth_ctx._token_valid()
+    assert auth_ctx.default_headers['Authorization'] != 'Bearer at-1'
+
+
+def test_auth_ctx_refresh_ratio_validation():
+    with pytest.raises(ValueError):
+        AuthCtx(
+            base_url='https://example.com/my/path',
+            printer_email='example3@print.epsonconnect.com',
+            client_id='ghi',
+            client_secret='789',
+            refresh_ratio=1.5,
+        )
+
+
+@mock.patch.object(AuthCtx, 'EXPIRY_MARGIN', timedelta(seconds=5))
+def test_auth_ctx_expiry_margin():
+    with mock.patch('epson_connect.authenticate.AuthCtx._auth'):
+        auth_ctx = AuthCtx(
+            base_url='https://example.com/my/path',
+            printer_email='example3@print.epsonconnect.com',
+            client_id='ghi',
+            client_secret='789',
+        )
+
+    auth_ctx._expires_at = datetime.now() + timedelta(seconds=2)
+    assert not auth_ctx._token_valid()
+
+    auth_ctx._expires_at = datetime.now() + timedelta(seconds=10)
+    assert auth_ctx._token_valid()
+
+
+class MockTokenHandler(BaseHTTPRequestHandler):
+    grants = []
+    lock = threading.Lock()
+
+    def do_POST(self):
+        length = int(self.headers['Content-Length'])
+        grant = self.rfile.read(length).decode()
+        with self.lock:
+            self.grants.append(grant)
+            count = len(self.grants)
+
+        # A slow token endpoint widens the window for a thundering herd.
+        time.sleep(0.1)
+        self._reply({
+            'refresh_token': 'rf-123',
+            'expires_in': '3600',
+            'access_token': f'at-{count}',
+            'subject_id': 'test_subj_id',
+        })
+
+    def do_GET(self):
+        self._reply({'authorization': self.headers['Authorization']})
+
+    def _reply(self, body):
+        data = json.dumps(body).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, *args):
+        pass
+
+
+def test_auth_ctx_single_flight_refresh():
+    MockTokenHandler.grants = []
+    server = ThreadingHTTPServer(('127.0.0.1', 0), MockTokenHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    try:
+        auth_ctx = AuthCtx(
+            base_url=f'http://127.0.0.1:{server.server_port}',
+            printer_email='example3@print.epsonconnect.com',
+            client_id='ghi',
+            client_secret='789',
+        )
+        auth_ctx.warmup()
+        assert len(MockTokenHandler.grants) == 1
+
+        # Expire the token, then hit the API from 32 threads at once.
+        auth_ctx._expires_at = datetime.now()
+        barrier = threading.Barrier(32)
+        results = []
+
+        def worker():
+            barrier.wait()
+            results.append(auth_ctx.send('GET', '/api/1/printing/printers/test_subj_id'))
+
+        threads = [threading.Thread(target=worker) for _ in range(32)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    assert len(MockTokenHandler.grants) == 2
+    assert 'grant_type=refresh_token' in MockTokenHandler.grants[1]
+    assert results == [{'authorization': 'Bearer at-2'}] * 32
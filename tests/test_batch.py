@@ -0,0 +1,230 @@
+import asyncio
+import random
+import threading
+import time
+
+import pytest
+
+from epson_connect.aio import AsyncClient
+from epson_connect.batch import (BatchResult, PrintJobResult, PrintReport,
+                                 summarize_reports)
+from epson_connect.client import Client
+from epson_connect.printer import Printer, PrinterError
+from epson_connect.retry import RetryPolicy
+from epson_connect.simulator import Simulator
+
+CREDENTIALS = dict(printer_email='printer@example.com', client_id='id', client_secret='secret')
+
+
+@pytest.fixture(autouse=True)
+def preserve_random_state():
+    # Job names are random; keep the seeded sequence other tests rely on.
+    state = random.getstate()
+    yield
+    random.setstate(state)
+
+
+class SlowApi:
+    """
+    Answers a FakeAuthCtx slowly, tracking how many requests overlap.
+    """
+
+    def __init__(self):
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.lock = threading.Lock()
+
+    def __call__(self, request):
+        with self.lock:
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        time.sleep(0.01)
+        with self.lock:
+            self.in_flight -= 1
+
+        if request.path.endswith('/jobs'):
+            return {
+                'id': 'job-' + request.json['job_name'],
+                'upload_uri': 'https://example.com/upload?Key=k',
+            }
+        return {}
+
+
+def test_print_many(tmp_path, auth_ctx):
+    files = []
+    for i in range(8):
+        path = tmp_path / f'{i}.pdf'
+        path.write_bytes(b'%PDF')
+        files.append(str(path))
+    files.insert(3, str(tmp_path / 'bad.exe'))
+    files.append((b'%PDF', '.pdf'))
+
+    settings = {'print_mode': 'document'}
+    api = auth_ctx.respond = SlowApi()
+
+    batch = Printer(auth_ctx).print_many(files, settings, max_workers=4)
+
+    assert len(batch) == 10
+    assert [r.file for r in batch] == files
+    assert len(batch.succeeded) == 9
+    assert [r.file for r in batch.failed] == [str(tmp_path / 'bad.exe')]
+    assert isinstance(batch.failed[0].error, PrinterError)
+
+    # Every job got its own name and the caller's settings were left alone.
+    job_names = {r.json['job_name'] for r in auth_ctx.requests if r.path.endswith('/jobs')}
+    assert len(job_names) == 9
+    assert settings == {'print_mode': 'document'}
+
+    # Stages of different jobs overlapped.
+    assert api.max_in_flight > 1
+    assert batch.jobs_per_second > 0
+    assert batch.mean_job_seconds > 0
+
+
+def test_async_print_many():
+    from epson_connect.aio.printer import AsyncPrinter
+
+    class FakeAsyncAuthCtx:
+        device_id = 'dev-1'
+
+        async def _auth(self):
+            pass
+
+        async def send(self, method, path, data=None, json=None, headers=None, idempotent=None):
+            await asyncio.sleep(0.01)
+            if path.endswith('/jobs'):
+                return {
+                    'id': 'job-' + json['job_name'],
+                    'upload_uri': 'https://example.com/upload?Key=k',
+                }
+            if data is not None:
+                async for _ in data():
+                    pass
+            return {}
+
+    files = [(b'%PDF', '.pdf')] * 20 + [(b'', '.exe')]
+    batch = asyncio.run(AsyncPrinter(FakeAsyncAuthCtx()).print_many(files, max_concurrency=5))
+
+    assert len(batch.succeeded) == 20
+    assert len(batch.failed) == 1
+    assert len({r.job_id for r in batch.succeeded}) == 20
+
+
+def test_batch_result_stats():
+    batch = BatchResult([
+        PrintJobResult('a', job_id='1', elapsed=1.0),
+        PrintJobResult('b', error=ValueError(), elapsed=3.0),
+    ], elapsed=2.0)
+
+    assert batch.jobs_per_second == 0.5
+    assert batch.mean_job_seconds == 2.0
+    assert BatchResult().jobs_per_second == 0.0
+
+
+def test_print_detailed():
+    with Simulator(print_seconds=0, token_lifetime=5) as simulator:
+        with Client(base_url=simulator.url, **CREDENTIALS) as ec:
+            # Tokens count as expired 5 seconds early, so job creation refreshes first.
+            report = ec.printer.print(b'%PDF-1.4', {'job_name': 'detailed'}, '.pdf', detailed=True)
+
+            simulator.token_lifetime = 3600
+            simulator.error_rate = 1.0
+            batch = ec.printer.print_many([(b'%PDF-1.4', '.pdf')], detailed=True)
+
+    assert isinstance(report, PrintReport)
+    assert report.job_id
+    assert list(report.stages) == ['prepare', 'create', 'upload', 'execute']
+    assert report.elapsed >= sum(report.stages.values())
+    assert report.slowest_stage in report.stages
+    assert report.retries == {'prepare': 0, 'create': 0, 'upload': 0, 'execute': 0}
+    assert report.upload_bytes == 8
+    assert report.upload_throughput > 0
+    assert report.inline_token_refresh
+    assert 0 < report.token_seconds < report.elapsed
+
+    assert batch.failed and batch.failed[0].report is None
+
+
+def test_print_detailed_retries():
+    retry_policy = RetryPolicy(max_attempts=3, backoff_factor=0)
+    # Uploads are not rate limited, so only the execute call waits for a token.
+    with Simulator(print_seconds=0, rate_limit=1, burst=1) as simulator:
+        with Client(base_url=simulator.url, retry_policy=retry_policy, **CREDENTIALS) as ec:
+            batch = ec.printer.print_many([(b'%PDF-1.4', '.pdf')], detailed=True)
+
+    assert not batch.failed
+    summary = batch.summary()
+    assert summary['jobs'] == 1
+    assert summary['retries'] == {'prepare': 0, 'create': 0, 'upload': 0, 'execute': 1}
+    assert summary['bottleneck'] == 'execute'
+    # The client authenticates lazily, during the first job.
+    assert summary['inline_token_refreshes'] == 1
+
+
+def test_async_print_detailed():
+    async def main():
+        async with AsyncClient(base_url=simulator.url, **CREDENTIALS) as ec:
+            return await ec.printer.print_many([(b'%PDF-1.4', '.pdf')] * 3, detailed=True)
+
+    with Simulator(print_seconds=0) as simulator:
+        batch = asyncio.run(main())
+
+    assert [r.report.job_id for r in batch] == [r.job_id for r in batch]
+    assert all(r.report.upload_bytes == 8 for r in batch)
+    assert batch.summary()['jobs'] == 3
+
+
+def test_print_detailed_upload_bytes_any_upload_path():
+    import httpx
+
+    from epson_connect.aio import AsyncTransport
+
+    def handler(request):
+        if request.url.path.endswith('/token'):
+            return httpx.Response(200, json={
+                'refresh_token': 'rf', 'expires_in': '3600', 'access_token': 'at',
+                'subject_id': 'dev-1',
+            })
+        if request.url.path.endswith('/jobs'):
+            return httpx.Response(200, json={
+                'id': 'job-1',
+                'upload_uri': 'https://files.example.com/v2/objects/abc?Key=k1',
+            })
+        return httpx.Response(200, json={})
+
+    async def main():
+        transport = AsyncTransport(client=httpx.AsyncClient(transport=httpx.MockTransport(handler)))
+        async with AsyncClient(
+                base_url='https://example.com', transport=transport, **CREDENTIALS,
+        ) as ec:
+            return await ec.printer.print(b'%PDF-1.4', extension='.pdf', detailed=True)
+
+    report = asyncio.run(main())
+
+    assert report.upload_bytes == 8
+    assert report.upload_throughput > 0
+
+
+def test_summarize_reports():
+    reports = [
+        PrintReport(
+            job_id=str(i),
+            elapsed=1.0 + i,
+            stages={'prepare': 0.0, 'create': 0.1, 'upload': 0.5 + i, 'execute': 0.4},
+            retries={'create': 1} if i == 0 else {},
+            upload_bytes=1000,
+            inline_token_refresh=i == 1,
+        )
+        for i in range(4)
+    ]
+
+    summary = summarize_reports(reports, percentiles=(50, 100))
+    assert summary['jobs'] == 4
+    assert summary['elapsed'] == {'p50': 2.0, 'p100': 4.0, 'mean': 2.5, 'max': 4.0}
+    assert summary['stages']['upload']['p100'] == 3.5
+    assert summary['upload_throughput']['max'] == 2000
+    assert summary['retries'] == {'prepare': 0, 'create': 1, 'upload': 0, 'execute': 0}
+    assert summary['inline_token_refreshes'] == 1
+    assert summary['bottleneck'] == 'upload'
+
+    assert summarize_reports([])['bottleneck'] is None
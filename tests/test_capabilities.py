@@ -0,0 +1,148 @@
+import time
+
+import pytest
+
+from epson_connect.capabilities import Capabilities, CapabilityCache
+from epson_connect.printer import Printer
+from epson_connect.printer_settings import (PrintSettingError,
+                                            merge_with_default_settings)
+
+CAPABILITIES = {
+    'color_modes': ['color', 'mono'],
+    'resolutions': [360],
+    'media_sizes': [
+        {
+            'media_size': 'ms_a4',
+            'media_types': [
+                {
+                    'media_type': 'mt_plainpaper',
+                    'borderless': False,
+                    'sources': ['auto', 'rear'],
+                    'print_qualities': ['normal', 'draft'],
+                    '2_sided': True,
+                },
+                {
+                    'media_type': 'mt_photopaper',
+                    'borderless': True,
+                    'sources': ['auto', 'rear'],
+                    'print_qualities': ['high', 'normal'],
+                    '2_sided': False,
+                },
+            ],
+        },
+    ],
+}
+
+
+def settings(**print_setting):
+    print_setting.setdefault('media_size', 'ms_a4')
+    return merge_with_default_settings({'job_name': 'job', 'print_setting': print_setting})
+
+
+def test_capabilities_accept_supported_settings():
+    capabilities = Capabilities(CAPABILITIES)
+
+    capabilities.validate(settings())
+    capabilities.validate(settings(media_type='mt_photopaper', borderless=True))
+    capabilities.validate(settings(color_mode='mono', **{'2_sided': 'long'}))
+    capabilities.validate(merge_with_default_settings({'job_name': 'job'}))
+
+
+@pytest.mark.parametrize('print_setting, message', [
+    ({'media_size': 'ms_a3'}, 'Paper size ms_a3'),
+    ({'media_type': 'mt_hagaki'}, 'Media type mt_hagaki'),
+    ({'borderless': True}, 'Borderless printing'),
+    ({'source': 'front1'}, 'Source front1'),
+    ({'print_quality': 'high'}, 'Print quality high'),
+    ({'media_type': 'mt_photopaper', '2_sided': 'long'}, '2-sided printing'),
+])
+def test_capabilities_reject_unsupported_settings(print_setting, message):
+    with pytest.raises(PrintSettingError) as e:
+        Capabilities(CAPABILITIES).validate(settings(**print_setting))
+    assert message in str(e.value)
+
+
+def test_capabilities_skip_missing_keys():
+    Capabilities({}).validate(settings(media_size='ms_a3', borderless=True))
+
+    with pytest.raises(PrintSettingError):
+        Capabilities({'color_modes': ['mono']}).validate(settings())
+
+
+def test_capability_cache_ttl_and_invalidate(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(time, 'monotonic', lambda: now[0])
+
+    cache = CapabilityCache(ttl=60)
+    cache.set('dev-1', 'document', CAPABILITIES)
+    cache.set('dev-1', 'photo', CAPABILITIES)
+    cache.set('dev-2', 'document', CAPABILITIES)
+
+    assert cache.get('dev-1', 'document').raw is CAPABILITIES
+    assert cache.get('dev-3', 'document') is None
+
+    cache.invalidate('dev-1', 'photo')
+    assert cache.get('dev-1', 'photo') is None
+    assert len(cache) == 2
+
+    cache.invalidate(mode='document')
+    assert len(cache) == 0
+
+    cache.set('dev-1', 'document', CAPABILITIES)
+    now[0] += 61
+    assert cache.get('dev-1', 'document') is None
+    assert len(cache) == 0
+
+
+@pytest.fixture
+def auth_ctx(auth_ctx):
+    respond = auth_ctx.respond
+
+    def capabilities(request):
+        if request.path.endswith('/capability/document'):
+            return CAPABILITIES
+        return respond(request)
+
+    auth_ctx.respond = capabilities
+    return auth_ctx
+
+
+def calls(auth_ctx):
+    return [(request.method, request.path) for request in auth_ctx.requests]
+
+
+def test_printer_caches_capabilities(auth_ctx):
+    printer = Printer(auth_ctx)
+
+    assert printer.capabilities('document') == CAPABILITIES
+    assert printer.capabilities('document') == CAPABILITIES
+    assert len(auth_ctx.requests) == 1
+
+    printer.capabilities('document', refresh=True)
+    assert len(auth_ctx.requests) == 2
+
+
+def test_printer_checks_capabilities_before_creating_job(auth_ctx):
+    cache = CapabilityCache()
+    printer = Printer(auth_ctx, cache, check_capabilities=True)
+
+    with pytest.raises(PrintSettingError):
+        printer.print_setting(settings(borderless=True))
+    assert calls(auth_ctx) == [('GET', '/api/1/printing/printers/dev-1/capability/document')]
+
+    # Cached capabilities are reused by other printers sharing the cache.
+    Printer(auth_ctx, cache, check_capabilities=True).print_setting(settings())
+    assert calls(auth_ctx)[1:] == [('POST', '/api/1/printing/printers/dev-1/jobs')]
+
+
+def test_printer_does_not_check_capabilities_by_default(auth_ctx):
+    Printer(auth_ctx).print_setting(settings(borderless=True))
+    assert calls(auth_ctx) == [('POST', '/api/1/printing/printers/dev-1/jobs')]
+
+
+def test_printer_check_settings_fills_in_defaults(auth_ctx):
+    user_settings = {'job_name': 'job', 'print_setting': {'media_size': 'ms_a3'}}
+
+    with pytest.raises(PrintSettingError):
+        Printer(auth_ctx).check_settings(user_settings)
+    assert user_settings == {'job_name': 'job', 'print_setting': {'media_size': 'ms_a3'}}
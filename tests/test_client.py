@@ -6,6 +6,7 @@ import pytest
 from epson_connect.client import Client, ClientError
 from epson_connect.printer import Printer
 from epson_connect.scanner import Scanner
+from epson_connect.transport import Transport
 
 
 def test_client_init(mocker):
@@ -15,6 +16,7 @@ def test_client_init(mocker):
             printer_email: str,
             client_id: str,
             client_secret: str,
+            **kwargs,
     ) -> None:
         assert base_url == 'https://example.com/my/path'
         assert printer_email == 'example2@print.epsonconnect.com'
@@ -48,6 +50,7 @@ def test_client_init_env_vars(mocker):
                 printer_email: str,
                 client_id: str,
                 client_secret: str,
+                **kwargs,
         ) -> None:
             assert base_url == Client.EC_BASE_URL
             assert printer_email == 'epsonsample@print.epsonconnect.com'
@@ -167,3 +170,70 @@ def test_client_scanner(mocker):
         client_id='def',
         client_secret='456',
     ).scanner, Scanner)
+
+
+def test_client_shares_transport(mocker):
+    def mock_auth_ctx_send(
+            self,
+            *args,
+            **kwargs,
+    ):
+        return {
+            'refresh_token': 'rf-123',
+            'expires_in': '3600',
+            'access_token': 'at-5678',
+            'subject_id': 'test_subj_id',
+        }
+
+    mocker.patch(
+        'epson_connect.client.AuthCtx.send',
+        mock_auth_ctx_send,
+    )
+
+    transport = Transport(pool_maxsize=4)
+
+    with Client(
+        base_url='https://example.com/my/path',
+        printer_email='example2@print.epsonconnect.com',
+        client_id='def',
+        client_secret='456',
+        transport=transport,
+    ) as client:
+        assert client.printer._auth_ctx.transport is transport
+        assert client.scanner._auth_ctx.transport is transport
+
+        adapter = transport.session.get_adapter('https://api.epsonconnect.com')
+        assert adapter._pool_maxsize == 4
+
+
+def test_client_profiles(mocker):
+    def mock_auth_ctx_send(
+            self,
+            *args,
+            **kwargs,
+    ):
+        return {
+            'refresh_token': 'rf-123',
+            'expires_in': '3600',
+            'access_token': 'at-5678',
+            'subject_id': 'test_subj_id',
+        }
+
+    mocker.patch(
+        'epson_connect.client.AuthCtx.send',
+        mock_auth_ctx_send,
+    )
+
+    ec = Client(
+        base_url='https://example.com/my/path',
+        printer_email='example2@print.epsonconnect.com',
+        client_id='def',
+        client_secret='456',
+        profiles={'labels': {'print_mode': 'photo'}},
+    )
+    ec.profiles.add('mono', print_setting={'color_mode': 'mono'})
+
+    # Every printer handed out sees the same profiles.
+    assert ec.printer.profiles is ec.profiles
+    assert ec.printer.profiles['labels'].print_mode == 'photo'
+    assert set(ec.printer.profiles) == {'labels', 'mono'}
@@ -0,0 +1,196 @@
+import asyncio
+
+import pytest
+
+from epson_connect import authenticate
+from epson_connect.aio import AsyncClient
+from epson_connect.authenticate import ApiError, AuthenticationError
+from epson_connect.client import Client
+from epson_connect.events import (Events, RequestEvent, TokenEvent,
+                                  endpoint_template)
+from epson_connect.retry import RetryPolicy
+from epson_connect.simulator import Simulator
+
+CREDENTIALS = dict(printer_email='printer@example.com', client_id='id', client_secret='secret')
+
+
+@pytest.fixture
+def simulator():
+    with Simulator(print_seconds=0) as simulator:
+        yield simulator
+
+
+def test_endpoint_template():
+    assert endpoint_template('/api/1/printing/printers/abc123/jobs/j-1/print') == \
+        '/api/1/printing/printers/{device_id}/jobs/{job_id}/print'
+    assert endpoint_template('/api/1/scanning/scanners/abc123/destinations') == \
+        '/api/1/scanning/scanners/{device_id}/destinations'
+    assert endpoint_template('/upload?Key=abc&File=1.pdf') == '/upload'
+
+
+def test_events_print(simulator):
+    events = Events()
+    seen = []
+    events.subscribe(seen.append)
+
+    with Client(base_url=simulator.url, events=events, **CREDENTIALS) as ec:
+        ec.printer.print(b'%PDF-1.4', {'job_name': 'events'}, '.pdf')
+
+    grant, token, create, upload, print_ = seen
+    assert token == TokenEvent(
+        grant_type='password',
+        duration=token.duration,
+        inline=True,
+        started_at=token.started_at,
+    )
+    assert grant.endpoint == '/api/1/printing/oauth2/auth/token'
+    assert create.method == 'POST'
+    assert create.endpoint == '/api/1/printing/printers/{device_id}/jobs'
+    assert create.status == 201
+    assert create.bytes_received > 0
+    assert upload.endpoint == '/upload'
+    assert upload.bytes_sent == 8
+    assert print_.endpoint == '/api/1/printing/printers/{device_id}/jobs/{job_id}/print'
+    assert all(e.attempts == 1 and e.retries == 0 for e in (grant, create, upload, print_))
+    assert all('server' in e.timings and e.duration > 0 for e in (grant, create, upload, print_))
+
+
+def test_events_retries_and_errors():
+    events = Events()
+    seen = []
+    events.subscribe(seen.append)
+
+    with Simulator(error_rate=1.0, seed=1) as simulator:
+        with Client(
+                base_url=simulator.url,
+                events=events,
+                retry_policy=RetryPolicy(max_attempts=3, backoff_factor=0),
+                **CREDENTIALS,
+        ) as ec:
+            with pytest.raises(ApiError):
+                ec.printer.info()
+
+    request = seen[-1]
+    assert request.status == 503
+    assert request.attempts == 3
+    assert request.retries == 2
+
+    seen.clear()
+    with Simulator(credentials={'id': 'other'}) as simulator:
+        with pytest.raises(AuthenticationError):
+            Client(base_url=simulator.url, events=events, **CREDENTIALS).warmup()
+
+    request, token = seen
+    assert request.status == 401
+    assert token.grant_type == 'password'
+    assert isinstance(token.error, AuthenticationError)
+
+
+def test_events_subscriber_errors_are_logged(simulator, caplog):
+    events = Events()
+    seen = []
+
+    def broken(event):
+        raise RuntimeError('broken subscriber')
+
+    events.subscribe(broken)
+    events.subscribe(seen.append)
+
+    with Client(base_url=simulator.url, events=events, **CREDENTIALS) as ec:
+        ec.printer.info()
+
+    assert len(seen) == 3
+    assert 'broken subscriber' in caplog.text
+
+    events.unsubscribe(broken)
+    events.unsubscribe(seen.append)
+    assert events.subscribers == ()
+
+
+def test_events_not_built_without_subscribers(simulator, monkeypatch):
+    def fail(*args, **kwargs):
+        raise AssertionError('event built without subscribers')
+
+    monkeypatch.setattr(authenticate, 'request_event', fail)
+    monkeypatch.setattr(authenticate, 'token_event', fail)
+
+    with Client(base_url=simulator.url, events=Events(), **CREDENTIALS) as ec:
+        ec.printer.info()
+
+
+def test_events_async_timings(simulator):
+    events = Events()
+    seen = []
+    events.subscribe(seen.append)
+
+    async def main():
+        async with AsyncClient(base_url=simulator.url, events=events, **CREDENTIALS) as ec:
+            await ec.printer.info()
+
+    asyncio.run(main())
+
+    grant, token, info = seen
+    assert token.grant_type == 'password'
+    assert info == RequestEvent(
+        method='GET',
+        endpoint='/api/1/printing/printers/{device_id}',
+        status=200,
+        bytes_sent=info.bytes_sent,
+        bytes_received=info.bytes_received,
+        duration=info.duration,
+        attempts=1,
+        started_at=info.started_at,
+        timings=info.timings,
+    )
+    # The first request opens the connection; the second reuses it.
+    assert {'connect', 'send', 'wait', 'server'} <= set(grant.timings)
+    assert {'send', 'wait', 'server'} <= set(info.timings)
+    assert 'connect' not in info.timings
+
+
+def test_prometheus_subscriber(simulator):
+    prometheus_client = pytest.importorskip('prometheus_client')
+    from epson_connect.instrumentation import PrometheusSubscriber
+
+    registry = prometheus_client.CollectorRegistry()
+    events = Events()
+    events.subscribe(PrometheusSubscriber(registry))
+
+    with Client(base_url=simulator.url, events=events, **CREDENTIALS) as ec:
+        ec.printer.info()
+
+    labels = {'method': 'GET', 'endpoint': '/api/1/printing/printers/{device_id}'}
+    assert registry.get_sample_value(
+        'epson_connect_requests_total', dict(labels, status='200'),
+    ) == 1
+    assert registry.get_sample_value('epson_connect_request_duration_seconds_count', labels) == 1
+    assert registry.get_sample_value(
+        'epson_connect_token_grants_total',
+        {'grant_type': 'password', 'inline': 'true', 'outcome': 'ok'},
+    ) == 1
+
+
+def test_opentelemetry_subscriber(simulator):
+    pytest.importorskip('opentelemetry.sdk')
+    from opentelemetry.sdk.trace import TracerProvider
+    from opentelemetry.sdk.trace.export import SimpleSpanProcessor
+    from opentelemetry.sdk.trace.export.in_memory_span_exporter import \
+        InMemorySpanExporter
+
+    from epson_connect.instrumentation import OpenTelemetrySubscriber
+
+    exporter = InMemorySpanExporter()
+    provider = TracerProvider()
+    provider.add_span_processor(SimpleSpanProcessor(exporter))
+    events = Events()
+    events.subscribe(OpenTelemetrySubscriber(provider.get_tracer('test')))
+
+    with Client(base_url=simulator.url, events=events, **CREDENTIALS) as ec:
+        ec.printer.info()
+
+    names = [span.name for span in exporter.get_finished_spans()]
+    assert names == [
+        'POST /api/1/printing/oauth2/auth/token',
+        'epson_connect token grant',
+        'GET /api/1/printing/printers/{device_id}',
+    ]
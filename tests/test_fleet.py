@@ -0,0 +1,131 @@
+import threading
+import time
+
+import pytest
+
+from epson_connect.authenticate import AuthenticationError
+from epson_connect.fleet import Fleet
+
+
+class FakeSend:
+    def __init__(self):
+        self.grants = []
+        self.calls = []
+        self.lock = threading.Lock()
+
+    def __call__(self, auth_ctx, method, path, data=None, json=None, headers=None, auth=None):
+        if auth is not None:
+            email = data['username']
+            if email.startswith('bad'):
+                return {'error': 'invalid_grant'}
+            with self.lock:
+                self.grants.append(email)
+            time.sleep(0.01)
+            return {
+                'refresh_token': 'rf-123',
+                'expires_in': '3600',
+                'access_token': 'at-5678',
+                'subject_id': 'dev-' + email.split('@')[0],
+            }
+
+        self.calls.append((method, path))
+        return {'status': 'completed'}
+
+
+def make_fleet(**kwargs):
+    return Fleet(base_url='https://example.com', client_id='abc', client_secret='123', **kwargs)
+
+
+@pytest.fixture(autouse=True)
+def patch_send(monkeypatch):
+    send = FakeSend()
+
+    def fake(auth_ctx, *args, **kwargs):
+        return send(auth_ctx, *args, **kwargs)
+
+    monkeypatch.setattr('epson_connect.authenticate.AuthCtx.send', fake)
+    return send
+
+
+def test_fleet_lazy_and_routed(patch_send):
+    with make_fleet() as fleet:
+        assert len(fleet) == 0
+        assert patch_send.grants == []
+
+        assert fleet.job_info('p1@print.epsonconnect.com', 'job-1') == {'status': 'completed'}
+        fleet.job_info('dev-p1', 'job-2')
+        fleet.job_info('p2@print.epsonconnect.com', 'job-3')
+
+    assert patch_send.grants == ['p1@print.epsonconnect.com', 'p2@print.epsonconnect.com']
+    assert patch_send.calls == [
+        ('GET', '/api/1/printing/printers/dev-p1/jobs/job-1'),
+        ('GET', '/api/1/printing/printers/dev-p1/jobs/job-2'),
+        ('GET', '/api/1/printing/printers/dev-p2/jobs/job-3'),
+    ]
+
+
+def test_fleet_shares_transport(patch_send):
+    fleet = make_fleet()
+    a = fleet.auth_ctx('p1@print.epsonconnect.com')
+    b = fleet.auth_ctx('p2@print.epsonconnect.com')
+    assert a is not b
+    assert a.transport is b.transport
+
+
+def test_fleet_concurrent_auth_is_single_flight(patch_send):
+    fleet = make_fleet()
+    emails = [f'p{i % 10}@print.epsonconnect.com' for i in range(100)]
+
+    assert fleet.warmup(emails, max_workers=32) == {}
+    assert sorted(patch_send.grants) == sorted(set(emails))
+    assert len(fleet) == 10
+
+
+def test_fleet_warmup_errors(patch_send):
+    fleet = make_fleet()
+    errors = fleet.warmup(['ok@print.epsonconnect.com', 'bad@print.epsonconnect.com'])
+
+    assert list(errors) == ['bad@print.epsonconnect.com']
+    assert isinstance(errors['bad@print.epsonconnect.com'], AuthenticationError)
+    assert len(fleet) == 1
+
+
+def test_fleet_evicts_least_recently_used(patch_send):
+    fleet = make_fleet(max_devices=2)
+    fleet.auth_ctx('p1@print.epsonconnect.com')
+    fleet.auth_ctx('p2@print.epsonconnect.com')
+    fleet.auth_ctx('p1@print.epsonconnect.com')
+    fleet.auth_ctx('p3@print.epsonconnect.com')
+
+    assert len(fleet) == 2
+    assert list(fleet._contexts) == ['p1@print.epsonconnect.com', 'p3@print.epsonconnect.com']
+
+    # Evicted devices are transparently re-authenticated.
+    fleet.auth_ctx('p2@print.epsonconnect.com')
+    assert patch_send.grants.count('p2@print.epsonconnect.com') == 2
+
+
+def test_fleet_addresses_evicted_device_by_id(patch_send):
+    fleet = make_fleet(idle_timeout=60)
+    fleet.auth_ctx('p1@print.epsonconnect.com')
+    fleet._contexts['p1@print.epsonconnect.com'][1] -= 120
+    assert fleet.evict_idle() == 1
+
+    assert fleet.job_info('dev-p1', 'job-1') == {'status': 'completed'}
+    assert patch_send.grants == ['p1@print.epsonconnect.com'] * 2
+    assert patch_send.calls == [('GET', '/api/1/printing/printers/dev-p1/jobs/job-1')]
+
+    fleet.close()
+    assert fleet._emails == {}
+
+
+def test_fleet_evicts_idle(patch_send):
+    fleet = make_fleet(idle_timeout=60)
+    fleet.auth_ctx('p1@print.epsonconnect.com')
+    fleet.auth_ctx('p2@print.epsonconnect.com')
+
+    assert fleet.evict_idle() == 0
+
+    fleet._contexts['p1@print.epsonconnect.com'][1] -= 120
+    assert fleet.evict_idle() == 1
+    assert list(fleet._contexts) == ['p2@print.epsonconnect.com']
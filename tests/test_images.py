@@ -0,0 +1,105 @@
+import asyncio
+import io
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from epson_connect.images import ImageOptimizer, optimize_image, target_pixels
+from epson_connect.printer import Printer
+from epson_connect.upload_cache import UploadCache
+
+Image = pytest.importorskip('PIL.Image')
+
+
+def make_image(size=(2000, 1500), mode='RGB', fmt='PNG', **save_kwargs):
+    image = Image.effect_noise(size, 64).convert(mode)
+    out = io.BytesIO()
+    image.save(out, fmt, **save_kwargs)
+    return out.getvalue()
+
+
+def test_target_pixels():
+    assert target_pixels('ms_a4', 'normal') == (2480, 3508)
+    assert target_pixels('ms_l', 'draft') == (526, 750)
+
+
+def test_optimize_image_downsamples_to_page():
+    optimized = optimize_image(make_image(), 'ms_l', 'draft', quality=80)
+
+    with Image.open(io.BytesIO(optimized)) as image:
+        assert image.format == 'JPEG'
+        # Landscape image on a portrait page: fit the rotated page.
+        assert image.size == (701, 526)
+
+
+def test_optimize_image_flattens_and_strips_metadata():
+    exif = Image.Exif()
+    exif[0x010F] = 'Camera maker'
+    content = make_image((800, 600), mode='RGBA', exif=exif)
+
+    with Image.open(io.BytesIO(optimize_image(content))) as image:
+        assert image.mode == 'RGB'
+        assert image.size == (800, 600)
+        assert not image.getexif()
+
+
+def test_optimize_image_strips_metadata_from_small_jpegs():
+    exif = Image.Exif()
+    exif[0x010F] = 'Camera maker'
+    content = make_image((200, 100), fmt='JPEG', quality=20, exif=exif)
+
+    # Re-encoding at a higher quality makes it larger, but drops the metadata.
+    optimized = optimize_image(content, quality=95)
+    assert len(optimized) >= len(content)
+    with Image.open(io.BytesIO(optimized)) as image:
+        assert image.size == (200, 100)
+        assert not image.getexif()
+
+
+def test_image_optimizer_uses_process_pool():
+    with ImageOptimizer(quality=70, max_workers=1) as optimizer:
+        print_setting = {'media_size': 'ms_l', 'print_quality': 'draft'}
+        optimized = optimizer.optimize(make_image((1200, 1200)), print_setting)
+        optimized_async = asyncio.run(optimizer.optimize_async(make_image((100, 100))))
+
+    with Image.open(io.BytesIO(optimized)) as image:
+        assert image.size == (526, 526)
+    with Image.open(io.BytesIO(optimized_async)) as image:
+        assert image.size == (100, 100)
+
+
+def test_printer_optimizes_photos(tmp_path, auth_ctx):
+    path = tmp_path / 'photo.png'
+    path.write_bytes(make_image())
+    cache = UploadCache()
+    settings = {
+        'job_name': 'photo',
+        'print_mode': 'photo',
+        'print_setting': {'media_size': 'ms_l', 'print_quality': 'draft'},
+    }
+
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        optimizer = ImageOptimizer(executor=executor)
+        printer = Printer(auth_ctx, upload_cache=cache, image_optimizer=optimizer)
+        printer.print(str(path), dict(settings))
+        printer.print(str(path), dict(settings))
+
+    upload = auth_ctx.requests[1]
+    assert upload.path.endswith('File=1.jpg')
+    assert upload.headers['Content-Type'] == 'image/jpeg'
+    assert len(upload.data) < path.stat().st_size / 10
+    with Image.open(io.BytesIO(upload.data)) as image:
+        assert image.size == (701, 526)
+
+    stats = cache.stats()
+    assert (stats['derived_hits'], stats['derived_misses']) == (1, 1)
+
+
+def test_printer_leaves_documents_alone(tmp_path, auth_ctx):
+    printer = Printer(auth_ctx, image_optimizer=ImageOptimizer(executor=ThreadPoolExecutor(1)))
+
+    printer.print(b'%PDF-', {'job_name': 'doc', 'print_mode': 'photo'}, extension='pdf')
+    printer.print(b'png', {'job_name': 'doc', 'print_mode': 'document'}, extension='png')
+
+    uploads = [request.data for request in auth_ctx.requests if 'Key=' in request.path]
+    assert uploads == [b'%PDF-', b'png']
@@ -0,0 +1,160 @@
+import io
+import threading
+
+import pytest
+
+from epson_connect.pdf import PdfSplitter, page_ranges
+from epson_connect.printer import Printer, PrinterError
+
+pypdf = pytest.importorskip('pypdf')
+
+
+def make_pdf(pages):
+    writer = pypdf.PdfWriter()
+    for _ in range(pages):
+        writer.add_blank_page(width=595, height=842)
+    out = io.BytesIO()
+    writer.write(out)
+    return out.getvalue()
+
+
+def test_page_ranges():
+    assert page_ranges(7, 3) == [(1, 3), (4, 6), (7, 7)]
+    assert page_ranges(6, 3) == [(1, 3), (4, 6)]
+    assert page_ranges(0, 3) == []
+
+    with pytest.raises(ValueError):
+        page_ranges(7, 0)
+
+
+def test_splitter(tmp_path):
+    path = tmp_path / 'doc.pdf'
+    path.write_bytes(make_pdf(5))
+    splitter = PdfSplitter(path, pages_per_chunk=2)
+
+    assert splitter.page_count == 5
+    assert len(splitter) == 3
+
+    chunks = list(splitter)
+    assert [(first, last) for first, last, _ in chunks] == [(1, 2), (3, 4), (5, 5)]
+    assert [len(pypdf.PdfReader(io.BytesIO(c)).pages) for _, _, c in chunks] == [2, 2, 1]
+
+
+class PdfApi:
+    """
+    Answers a FakeAuthCtx for split prints; uploads of the ranges named by
+    ``fail_pages`` fail and those named by ``slow_pages`` are slow.
+    """
+
+    def __init__(self, fail_pages=None, slow_pages=None):
+        self.executed = []
+        self.uploaded = []
+        self.cancelled = []
+        self.fail_pages = fail_pages
+        self.slow_pages = slow_pages
+        self.fail_upload = self.slow_upload = None
+        self._count = 0
+        self._lock = threading.Lock()
+
+    def __call__(self, request):
+        method, path, json = request.method, request.path, request.json
+        if path.endswith('/jobs'):
+            with self._lock:
+                self._count += 1
+                job_id = f'job-{self._count}'
+            if self.fail_pages and json['job_name'].endswith(self.fail_pages):
+                self.fail_upload = job_id
+            if self.slow_pages and json['job_name'].endswith(self.slow_pages):
+                self.slow_upload = job_id
+            return {'id': job_id, 'upload_uri': f'https://example.com/upload?Key={job_id}'}
+
+        if 'Key=' in path:
+            job_id = path.split('Key=')[1].split('&')[0]
+            if job_id == self.slow_upload:
+                threading.Event().wait(0.2)
+            if job_id == self.fail_upload:
+                # Still well before a slow upload finishes.
+                threading.Event().wait(0.05)
+                raise RuntimeError('upload failed')
+            self.uploaded.append(job_id)
+            return None
+
+        if method == 'GET':
+            return {'status': 'pending'}
+        if path.endswith('/cancel'):
+            self.cancelled.append(path.split('/')[-2])
+            return None
+
+        self.executed.append(path.split('/')[-2])
+        return None
+
+
+def test_print_pdf_executes_in_page_order(tmp_path, auth_ctx):
+    path = tmp_path / 'doc.pdf'
+    path.write_bytes(make_pdf(7))
+    api = auth_ctx.respond = PdfApi(slow_pages='(pages 1-2)')
+    events = []
+
+    result = Printer(auth_ctx).print_pdf(
+        path,
+        {'job_name': 'manual'},
+        pages_per_job=2,
+        progress=lambda stage, chunk: events.append((stage, chunk.first_page)),
+    )
+
+    assert result.ok
+    assert result.page_count == 7
+    assert result.pages_printed == 7
+    assert [(c.first_page, c.last_page) for c in result] == [(1, 2), (3, 4), (5, 6), (7, 7)]
+    # The first range uploaded last, but still printed first.
+    assert api.uploaded[-1] == result.chunks[0].job_id
+    assert api.executed == [c.job_id for c in result]
+    assert result.job_ids == api.executed
+    assert [page for stage, page in events if stage == 'printed'] == [1, 3, 5, 7]
+
+
+def test_print_pdf_names_jobs_by_range(tmp_path, auth_ctx):
+    path = tmp_path / 'doc.pdf'
+    path.write_bytes(make_pdf(3))
+    auth_ctx.respond = PdfApi()
+
+    Printer(auth_ctx).print_pdf(path, {'job_name': 'x' * 256}, pages_per_job=2, max_workers=1)
+
+    names = [r.json['job_name'] for r in auth_ctx.requests if r.path.endswith('/jobs')]
+    assert names == ['x' * 244 + ' (pages 1-2)', 'x' * 244 + ' (pages 3-3)']
+
+
+def test_print_pdf_stops_after_failure(tmp_path, auth_ctx):
+    path = tmp_path / 'doc.pdf'
+    path.write_bytes(make_pdf(6))
+    api = auth_ctx.respond = PdfApi(fail_pages='(pages 3-4)')
+
+    result = Printer(auth_ctx).print_pdf(
+        path, {'job_name': 'manual'}, pages_per_job=2, max_workers=1,
+    )
+
+    assert not result.ok
+    assert api.executed == [result.chunks[0].job_id]
+    assert result.pages_printed == 2
+    assert isinstance(result.chunks[1].error, RuntimeError)
+    assert all(not c.printed and c.error is not None for c in result.chunks[1:])
+
+
+def test_print_pdf_prints_ranges_before_a_failure(tmp_path, auth_ctx):
+    path = tmp_path / 'doc.pdf'
+    path.write_bytes(make_pdf(6))
+    # Pages 3-4 fail to upload while pages 1-2 are still uploading.
+    api = auth_ctx.respond = PdfApi(slow_pages='(pages 1-2)', fail_pages='(pages 3-4)')
+
+    result = Printer(auth_ctx).print_pdf(
+        path, {'job_name': 'manual'}, pages_per_job=2, max_workers=4,
+    )
+
+    first, failed, after = result.chunks
+    assert api.executed == [first.job_id]
+    assert first.printed and first.error is None
+    assert isinstance(failed.error, RuntimeError)
+    assert isinstance(after.error, PrinterError)
+    # Jobs created for ranges that were not printed are cancelled.
+    assert sorted(api.cancelled) == sorted([failed.job_id, after.job_id])
+    assert failed.cancelled and after.cancelled and not first.cancelled
@@ -0,0 +1,221 @@
+import asyncio
+import io
+import sqlite3
+import threading
+
+import pytest
+
+from epson_connect.print_queue import PrintQueue, PrintQueueError
+from epson_connect.printer import PrinterError
+from epson_connect.printer_settings import PrintSettingError
+
+
+class Crash(BaseException):
+    """
+    Simulates the process dying mid-job.
+    """
+
+
+class FakePrinter:
+
+    def __init__(self, crash_on=None, fail_on=None):
+        self.crash_on = crash_on
+        self.fail_on = fail_on
+        self.calls = []
+        self.status = {}
+        self.lock = threading.Lock()
+
+    def _call(self, name, *args):
+        with self.lock:
+            self.calls.append((name, *args))
+        if name == self.crash_on:
+            self.crash_on = None
+            raise Crash()
+        if name == self.fail_on:
+            raise RuntimeError(name)
+
+    def print_setting(self, settings):
+        job_id = f'job-{len(self.calls)}'
+        self._call('print_setting', settings['job_name'])
+        return {'id': job_id, 'upload_uri': f'https://example.com/upload?Key={job_id}'}
+
+    def upload_file(self, upload_uri, file, print_mode, extension=None):
+        self._call('upload_file', upload_uri, file, extension)
+
+    def execute_print(self, job_id):
+        self._call('execute_print', job_id)
+        self.status[job_id] = 'completed'
+
+    def job_info(self, job_id):
+        self._call('job_info', job_id)
+        return {'status': self.status.get(job_id, 'pending')}
+
+
+class AsyncFakePrinter:
+
+    def __init__(self):
+        self.printer = FakePrinter()
+
+    async def print_setting(self, settings):
+        return self.printer.print_setting(settings)
+
+    async def upload_file(self, *args):
+        return self.printer.upload_file(*args)
+
+    async def execute_print(self, job_id):
+        return self.printer.execute_print(job_id)
+
+    async def job_info(self, job_id):
+        return self.printer.job_info(job_id)
+
+
+def names(printer):
+    return [call[0] for call in printer.calls]
+
+
+def test_queue_prints_with_worker_pool(tmp_path):
+    printer = FakePrinter()
+    files = [b'%PDF-' + bytes([i]) for i in range(50)]
+
+    with PrintQueue(tmp_path / 'q.db', printer, max_workers=4) as queue:
+        ids = queue.enqueue_many([(f, 'pdf') for f in files], {'job_name': 'batch'})
+        assert ids == list(range(1, 51))
+        assert queue.stats()['queued'] == 50
+
+        queue.start()
+        assert queue.drain(timeout=10)
+
+        assert queue.stats()['done'] == 50
+        assert queue.get(ids[0])['stage'] == 'done'
+
+    assert names(printer).count('execute_print') == 50
+    uploaded = sorted(call[2] for call in printer.calls if call[0] == 'upload_file')
+    assert uploaded == sorted(files)
+
+
+def test_queue_validates_on_enqueue(tmp_path):
+    with PrintQueue(tmp_path / 'q.db') as queue:
+        with pytest.raises(PrinterError):
+            queue.enqueue(b'data', extension='exe')
+        with pytest.raises(PrintSettingError):
+            queue.enqueue(b'data', {'job_name': 'job', 'print_mode': 'nope'}, extension='pdf')
+        with pytest.raises(PrintQueueError):
+            queue.enqueue(io.BytesIO(b'data'), {'job_name': 'job'}, extension='pdf')
+        assert queue.pending() == 0
+
+
+@pytest.mark.parametrize('crash_on, expected', [
+    # Crashed before the job was created: create it after the restart.
+    ('print_setting', ['print_setting', 'upload_file', 'execute_print']),
+    # Crashed while uploading: upload again to the same job.
+    ('upload_file', ['upload_file', 'execute_print']),
+])
+def test_queue_resumes_at_interrupted_stage(tmp_path, crash_on, expected):
+    path = tmp_path / 'q.db'
+    printer = FakePrinter(crash_on=crash_on)
+
+    queue = PrintQueue(path, printer)
+    queue.enqueue(b'data', {'job_name': 'job'}, extension='pdf')
+    with pytest.raises(Crash):
+        queue.process()
+    queue.close()
+
+    printer.calls.clear()
+    with PrintQueue(path, printer) as queue:
+        assert queue.process()
+        assert queue.stats()['done'] == 1
+
+    assert names(printer) == expected
+
+
+def test_queue_does_not_print_twice_after_crash_during_execute(tmp_path):
+    path = tmp_path / 'q.db'
+    printer = FakePrinter()
+
+    def crash_after_execute(job_id):
+        printer.status[job_id] = 'completed'
+        raise Crash()
+
+    printer.execute_print = crash_after_execute
+
+    queue = PrintQueue(path, printer)
+    queue_id = queue.enqueue(b'data', {'job_name': 'job'}, extension='pdf')
+    with pytest.raises(Crash):
+        queue.process()
+    assert queue.get(queue_id)['stage'] == 'executing'
+    queue.close()
+
+    printer.calls.clear()
+    with PrintQueue(path, printer) as queue:
+        assert queue.process()
+        assert queue.get(queue_id)['stage'] == 'done'
+
+    assert names(printer) == ['job_info']
+
+
+def test_queue_does_not_execute_again_after_crash_during_execute(tmp_path):
+    path = tmp_path / 'q.db'
+    printer = FakePrinter(crash_on='execute_print')
+
+    queue = PrintQueue(path, printer)
+    queue_id = queue.enqueue(b'data', {'job_name': 'job'}, extension='pdf')
+    with pytest.raises(Crash):
+        queue.process()
+    queue.close()
+
+    # The API still reports the job as pending, but the interrupted call may
+    # have started the print.
+    printer.calls.clear()
+    with PrintQueue(path, printer) as queue:
+        assert queue.process()
+        job = queue.get(queue_id)
+        assert job['stage'] == 'failed'
+        assert 'Interrupted while executing' in job['error']
+
+    assert names(printer) == ['job_info']
+
+
+def test_queue_rolls_back_failed_claim(tmp_path):
+    with PrintQueue(tmp_path / 'q.db') as queue:
+        queue.enqueue(b'data', {'job_name': 'job'}, extension='pdf')
+
+        # Fails inside the claim's transaction.
+        queue._db.execute('ALTER TABLE print_jobs RENAME TO moved')
+        with pytest.raises(sqlite3.OperationalError):
+            queue._claim()
+        assert not queue._db.in_transaction
+
+        queue._db.execute('ALTER TABLE moved RENAME TO print_jobs')
+        assert queue._claim()['id'] == 1
+
+
+def test_queue_retries_then_fails(tmp_path):
+    printer = FakePrinter(fail_on='upload_file')
+
+    with PrintQueue(tmp_path / 'q.db', printer, max_attempts=2) as queue:
+        queue_id = queue.enqueue(b'data', {'job_name': 'job'}, extension='pdf')
+        assert queue.process()
+        assert queue.get(queue_id)['stage'] == 'created'
+        assert queue.get(queue_id)['attempts'] == 1
+
+        # Backing off before the next attempt.
+        assert not queue.process()
+        queue._execute('UPDATE print_jobs SET available_at = 0')
+
+        assert queue.process()
+        job = queue.get(queue_id)
+        assert job['stage'] == 'failed'
+        assert 'upload_file' in job['error']
+
+    assert names(printer) == ['print_setting', 'upload_file', 'upload_file']
+
+
+def test_queue_drain_async(tmp_path):
+    printer = AsyncFakePrinter()
+
+    with PrintQueue(tmp_path / 'q.db') as queue:
+        queue.enqueue_many([(b'data', 'pdf')] * 20, {'job_name': 'job'})
+        asyncio.run(queue.drain_async(printer, concurrency=5))
+        assert queue.stats()['done'] == 20
+
+    assert names(printer.printer).count('execute_print') == 20
@@ -1,21 +1,29 @@
+import json
 import random
 
 import pytest
 
+from epson_connect.printer import Printer
 from epson_connect.printer_settings import (
+    PrintProfiles,
     PrintSettingError,
+    PrintSettings,
     merge_with_default_settings,
     validate_settings,
 )
 
-# Fix randomized job names for tests.
-random.seed(0)
+
+@pytest.fixture(autouse=True, scope='module')
+def seeded_random():
+    # Fix randomized job names for tests. Seeded when the module's tests start
+    # rather than on import, as tests collected earlier may use random too.
+    random.seed(0)
 
 
 def test_merge_with_default_settings_none():
     settings = merge_with_default_settings()
     assert settings == {
-        'job_name': 'job-yWAcqGFz',
+        'job_name': 'job-RNvnAvOp',
         'print_mode': 'document',
     }
 
@@ -38,7 +46,7 @@ def test_merge_with_default_settings_with_single_print_setting():
         },
     })
     assert settings == {
-        'job_name': 'job-YtEwLnGi',
+        'job_name': 'job-yEVAoNGn',
         'print_mode': 'document',
         'print_setting': {
             'media_size': 'ms_tabloid',
@@ -308,3 +316,88 @@ def test_validate_settings():
             'collate': True,
         },
     })
+
+
+def test_merge_with_default_settings_does_not_modify_input():
+    settings = {'print_setting': {'copies': 2}}
+    merged = merge_with_default_settings(settings)
+
+    assert settings == {'print_setting': {'copies': 2}}
+    assert merged['print_setting']['copies'] == 2
+    assert merged['print_setting']['media_size'] == 'ms_a4'
+
+
+def test_print_settings():
+    settings = PrintSettings(print_setting={'media_size': 'ms_letter', 'copies': 2})
+
+    assert settings.job_name is None
+    assert settings.print_mode == 'document'
+    assert dict(settings) == {
+        'print_mode': 'document',
+        'print_setting': merge_with_default_settings(dict(settings))['print_setting'],
+    }
+    assert settings['print_setting']['media_size'] == 'ms_letter'
+
+    body = json.loads(settings.body('my-job'))
+    assert body == dict(settings, job_name='my-job')
+
+    # Each job gets its own name unless the settings have one.
+    assert json.loads(settings.body())['job_name'] != json.loads(settings.body())['job_name']
+    named = PrintSettings.from_dict({'job_name': 'labels', 'print_mode': 'photo'})
+    assert json.loads(named.body()) == {'job_name': 'labels', 'print_mode': 'photo'}
+    assert PrintSettings.from_dict(named) is named
+
+
+def test_print_settings_is_validated_and_immutable():
+    with pytest.raises(PrintSettingError):
+        PrintSettings(print_setting={'copies': 100})
+    with pytest.raises(PrintSettingError):
+        PrintSettings.from_dict({'extra-key': None})
+    with pytest.raises(PrintSettingError):
+        PrintSettings().body('a' * 300)
+
+    settings = PrintSettings(print_setting={'copies': 2})
+    with pytest.raises(AttributeError):
+        settings.print_mode = 'photo'
+    settings.print_setting['copies'] = 50
+    assert settings['print_setting']['copies'] == 2
+
+
+def test_printer_sends_encoded_settings(auth_ctx):
+    settings = PrintSettings(job_name='labels')
+    Printer(auth_ctx).print(b'%PDF', settings, '.pdf')
+
+    request = auth_ctx.requests[0]
+    assert request.path == '/api/1/printing/printers/dev-1/jobs'
+    assert request.data == b'{"job_name": "labels", "print_mode": "document"}'
+    assert request.json is None
+
+
+def test_print_profiles():
+    profiles = PrintProfiles({'labels': {'job_name': 'label', 'print_mode': 'photo'}})
+    duplex = profiles.add('duplex', print_setting={'2_sided': 'long'})
+
+    assert profiles['duplex'] is duplex
+    assert profiles.resolve('duplex') is duplex
+    assert profiles.resolve({'print_mode': 'photo'}) == {'print_mode': 'photo'}
+    assert 'labels' in profiles
+    assert len(profiles) == 2
+
+    with pytest.raises(PrintSettingError, match='Unknown print profile'):
+        profiles['missing']
+    with pytest.raises(PrintSettingError):
+        profiles.add('bad', {'print_mode': 'bad'})
+
+    profiles.remove('labels')
+    assert list(profiles) == ['duplex']
+
+
+def test_printer_prints_with_profile(auth_ctx):
+    printer = Printer(auth_ctx)
+    printer.profiles.add('labels', job_name='label', print_mode='photo')
+
+    printer.print(b'%PDF', 'labels', '.pdf')
+    printer.print_many([(b'%PDF', '.pdf')], 'labels')
+
+    bodies = [r.data for r in auth_ctx.requests if r.path.endswith('/jobs')]
+    assert bodies == [b'{"job_name": "label", "print_mode": "photo"}'] * 2
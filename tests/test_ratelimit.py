@@ -0,0 +1,201 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from epson_connect.authenticate import AuthCtx
+from epson_connect.ratelimit import Governor, RateLimiter, TokenBucket
+
+
+def test_token_bucket_burst_then_rate():
+    bucket = TokenBucket(rate=10, burst=2)
+
+    assert bucket.reserve() == 0
+    assert bucket.reserve() == 0
+    assert bucket.reserve() == pytest.approx(0.1, abs=0.01)
+    assert bucket.reserve() == pytest.approx(0.2, abs=0.01)
+
+
+def test_token_bucket_rejects_bad_rate():
+    with pytest.raises(ValueError):
+        TokenBucket(rate=0)
+
+
+def test_limiter_rate_across_threads():
+    limiter = RateLimiter(rate=50, burst=1)
+
+    def call():
+        with limiter.limit():
+            pass
+
+    started = time.monotonic()
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        for _ in range(11):
+            pool.submit(call)
+
+    # First call is free, the other ten are spaced 20ms apart.
+    assert time.monotonic() - started >= 0.18
+    stats = limiter.stats()
+    assert stats['requests'] == 11
+    assert stats['queue_depth'] == 0
+    assert stats['waits'] >= 9
+    assert stats['wait_seconds_total'] > 0
+
+
+def test_limiter_caps_in_flight_across_threads():
+    limiter = RateLimiter(max_in_flight=3)
+    lock = threading.Lock()
+    active = peak = 0
+    depths = []
+
+    def call():
+        nonlocal active, peak
+        with limiter.limit():
+            with lock:
+                active += 1
+                peak = max(peak, active)
+            depths.append(limiter.stats()['queue_depth'])
+            time.sleep(0.01)
+            with lock:
+                active -= 1
+
+    with ThreadPoolExecutor(max_workers=12) as pool:
+        for _ in range(36):
+            pool.submit(call)
+
+    assert peak == 3
+    assert max(depths) > 0
+    assert limiter.stats()['in_flight'] == 0
+    assert limiter.stats()['requests'] == 36
+
+
+def test_limiter_caps_in_flight_async():
+    limiter = RateLimiter(max_in_flight=4)
+    active = peak = 0
+
+    async def call():
+        nonlocal active, peak
+        async with limiter.limit_async():
+            active += 1
+            peak = max(peak, active)
+            await asyncio.sleep(0.005)
+            active -= 1
+
+    async def main():
+        await asyncio.gather(*(call() for _ in range(40)))
+
+    asyncio.run(main())
+
+    assert peak == 4
+    assert limiter.stats()['in_flight'] == 0
+
+
+def test_limiter_releases_slot_of_cancelled_waiter():
+    limiter = RateLimiter(max_in_flight=1)
+
+    async def hold(release):
+        async with limiter.limit_async():
+            await release.wait()
+
+    async def main():
+        release = asyncio.Event()
+        holder = asyncio.create_task(hold(release))
+        await asyncio.sleep(0)
+        waiter = asyncio.create_task(hold(asyncio.Event()))
+        await asyncio.sleep(0)
+        waiter.cancel()
+        release.set()
+        await holder
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+
+        async with limiter.limit_async():
+            pass
+
+    asyncio.run(asyncio.wait_for(main(), 5))
+
+    assert limiter.stats()['in_flight'] == 0
+    assert limiter.stats()['queue_depth'] == 0
+
+
+def test_limiter_shared_between_threads_and_event_loop():
+    limiter = RateLimiter(max_in_flight=1)
+    order = []
+
+    with limiter.limit():
+        async def call():
+            async with limiter.limit_async():
+                order.append('async')
+
+        thread = threading.Thread(target=asyncio.run, args=(call(),))
+        thread.start()
+        time.sleep(0.05)
+        order.append('sync')
+
+    thread.join(5)
+    assert order == ['sync', 'async']
+
+
+def test_governor_limits_each_device_separately():
+    governor = Governor(device_max_in_flight=1)
+    lock = threading.Lock()
+    active = {}
+    peak = {}
+
+    def call(device_id):
+        with governor.limit(device_id):
+            with lock:
+                active[device_id] = active.get(device_id, 0) + 1
+                peak[device_id] = max(peak.get(device_id, 0), active[device_id])
+            time.sleep(0.01)
+            with lock:
+                active[device_id] -= 1
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        for i in range(16):
+            pool.submit(call, f'device-{i % 2}')
+
+    assert peak == {'device-0': 1, 'device-1': 1}
+
+    stats = governor.stats()
+    assert stats['credential']['requests'] == 16
+    assert stats['devices']['device-0']['requests'] == 8
+    assert stats['devices']['device-1']['requests'] == 8
+
+
+def test_auth_ctx_sends_through_governor(mocker):
+    governor = Governor(max_in_flight=2, device_max_in_flight=1)
+
+    def request(self, method, url, **kwargs):
+        credential = governor.stats()['credential']
+        assert credential['in_flight'] == 1
+        resp = mocker.Mock(status_code=200, headers={})
+        if url.endswith(AuthCtx.TOKEN_PATH):
+            resp.json.return_value = {
+                'refresh_token': 'refresh_token',
+                'access_token': 'access_token',
+                'expires_in': 3600,
+                'subject_id': 'subject_id',
+            }
+        else:
+            assert governor.stats()['devices']['subject_id']['in_flight'] == 1
+            resp.json.return_value = {'ok': True}
+        return resp
+
+    mocker.patch('requests.Session.request', request)
+
+    auth_ctx = AuthCtx(
+        'https://example.com',
+        'printer@example.com',
+        'client_id',
+        'client_secret',
+        governor=governor,
+    )
+    assert auth_ctx.send('get', '/api/1/printing/printers/subject_id') == {'ok': True}
+
+    stats = governor.stats()
+    assert stats['credential']['requests'] == 2
+    assert stats['credential']['in_flight'] == 0
+    assert stats['devices']['subject_id']['requests'] == 1
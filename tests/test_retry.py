@@ -0,0 +1,214 @@
+import json
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest import mock
+
+import pytest
+import requests
+
+from epson_connect.authenticate import ApiError, AuthCtx
+from epson_connect.printer import Printer
+from epson_connect.retry import RetryPolicy, parse_retry_after
+
+
+class FaultInjectingHandler(BaseHTTPRequestHandler):
+    """
+    Replies with the queued faults for a path before succeeding.
+
+    A fault is an HTTP status, optionally with a Retry-After value, or
+    ('sleep', seconds) to stall the response.
+    """
+
+    faults = {}
+    requests = []
+
+    def do_GET(self):
+        self._handle()
+
+    def do_POST(self):
+        self._handle()
+
+    def _handle(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        body = self.rfile.read(length)
+        self.requests.append((self.command, self.path, body, self.headers['Authorization']))
+
+        queue = self.faults.get(self.path.split('?')[0], [])
+        fault = queue.pop(0) if queue else None
+
+        if isinstance(fault, tuple) and fault[0] == 'sleep':
+            time.sleep(fault[1])
+            fault = None
+
+        if fault is None:
+            self._reply(200, {'ok': True})
+        else:
+            status, retry_after = fault if isinstance(fault, tuple) else (fault, None)
+            self._reply(status, {'code': f'error_{status}'}, retry_after)
+
+    def _reply(self, status, body, retry_after=None):
+        data = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        if retry_after is not None:
+            self.send_header('Retry-After', retry_after)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    FaultInjectingHandler.faults = {}
+    FaultInjectingHandler.requests = []
+    server = ThreadingHTTPServer(('127.0.0.1', 0), FaultInjectingHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def make_auth_ctx(server, **policy):
+    policy.setdefault('backoff_factor', 0.01)
+    with mock.patch('epson_connect.authenticate.AuthCtx._auth'):
+        return AuthCtx(
+            base_url=f'http://127.0.0.1:{server.server_port}',
+            printer_email='example3@print.epsonconnect.com',
+            client_id='ghi',
+            client_secret='789',
+            retry_policy=RetryPolicy(**policy),
+        )
+
+
+def test_retry_idempotent_with_retry_after(server):
+    FaultInjectingHandler.faults['/info'] = [(503, '0'), 502]
+    auth_ctx = make_auth_ctx(server)
+
+    with mock.patch.object(auth_ctx, '_auth'):
+        assert auth_ctx.send('GET', '/info') == {'ok': True}
+
+    assert len(FaultInjectingHandler.requests) == 3
+
+
+def test_retry_honors_retry_after_delay(server):
+    FaultInjectingHandler.faults['/info'] = [(429, '1')]
+    auth_ctx = make_auth_ctx(server)
+
+    start = time.monotonic()
+    with mock.patch.object(auth_ctx, '_auth'):
+        auth_ctx.send('GET', '/info')
+
+    assert time.monotonic() - start >= 1
+
+
+def test_no_retry_for_non_idempotent(server):
+    FaultInjectingHandler.faults['/jobs'] = [500]
+    auth_ctx = make_auth_ctx(server)
+
+    with mock.patch.object(auth_ctx, '_auth'):
+        with pytest.raises(ApiError) as e:
+            auth_ctx.send('POST', '/jobs', json={})
+
+    assert e.value.status_code == 500
+    assert len(FaultInjectingHandler.requests) == 1
+
+
+def test_retry_429_for_non_idempotent(server):
+    FaultInjectingHandler.faults['/jobs'] = [(429, '0')]
+    auth_ctx = make_auth_ctx(server)
+
+    with mock.patch.object(auth_ctx, '_auth'):
+        assert auth_ctx.send('POST', '/jobs', json={}) == {'ok': True}
+
+    assert len(FaultInjectingHandler.requests) == 2
+
+
+def test_retry_gives_up_after_max_attempts(server):
+    FaultInjectingHandler.faults['/info'] = [503, 503, 503, 503]
+    auth_ctx = make_auth_ctx(server, max_attempts=3)
+
+    with mock.patch.object(auth_ctx, '_auth'):
+        with pytest.raises(ApiError) as e:
+            auth_ctx.send('GET', '/info')
+
+    assert e.value.status_code == 503
+    assert len(FaultInjectingHandler.requests) == 3
+
+
+def test_retry_sends_refreshed_token(server):
+    FaultInjectingHandler.faults['/info'] = [503]
+    auth_ctx = make_auth_ctx(server)
+    tokens = iter(['at-1', 'at-2'])
+
+    def refresh():
+        # Stands in for a refresh (inline or background) between attempts.
+        auth_ctx._access_token = next(tokens)
+
+    with mock.patch.object(auth_ctx, '_auth', side_effect=refresh):
+        auth_ctx.send('GET', '/info')
+
+    assert [r[3] for r in FaultInjectingHandler.requests] == ['Bearer at-1', 'Bearer at-2']
+
+
+def test_retry_upload_resends_streamed_body(server, tmp_path):
+    FaultInjectingHandler.faults['/upload'] = [502]
+    path = tmp_path / 'doc.pdf'
+    path.write_bytes(b'%PDF-1.4 body')
+
+    auth_ctx = make_auth_ctx(server)
+    auth_ctx._subject_id = 'dev-1'
+    with mock.patch.object(auth_ctx, '_auth'):
+        Printer(auth_ctx).upload_file('https://example.com/upload?Key=k1', str(path), 'document')
+
+    assert [r[2] for r in FaultInjectingHandler.requests] == [b'%PDF-1.4 body'] * 2
+
+
+def test_retry_read_timeout(server):
+    FaultInjectingHandler.faults['/slow'] = [('sleep', 0.5), ('sleep', 0.5)]
+    auth_ctx = make_auth_ctx(server, timeout=0.1, max_attempts=2)
+
+    with mock.patch.object(auth_ctx, '_auth'):
+        with pytest.raises(requests.Timeout):
+            auth_ctx.send('GET', '/slow')
+
+    assert len(FaultInjectingHandler.requests) == 2
+
+
+def test_retry_total_deadline(server):
+    FaultInjectingHandler.faults['/info'] = [(503, '5')]
+    auth_ctx = make_auth_ctx(server, deadline=1)
+
+    start = time.monotonic()
+    with mock.patch.object(auth_ctx, '_auth'):
+        with pytest.raises(ApiError):
+            auth_ctx.send('GET', '/info')
+
+    # Waiting out Retry-After would blow the deadline, so it gives up at once.
+    assert time.monotonic() - start < 1
+    assert len(FaultInjectingHandler.requests) == 1
+
+
+def test_retry_policy_backoff():
+    policy = RetryPolicy(max_attempts=4, backoff_factor=1, max_backoff=3, jitter=False)
+    started = time.monotonic()
+
+    assert [policy.delay(n, started) for n in range(1, 5)] == [1, 2, 3, None]
+    assert policy.delay(1, started, retry_after='10') == 10
+
+    jittered = RetryPolicy(backoff_factor=1)
+    assert 0 <= jittered.delay(2, started) <= 2
+
+
+def test_parse_retry_after():
+    assert parse_retry_after(None) is None
+    assert parse_retry_after('7') == 7
+    assert parse_retry_after('soon') is None
+
+    later = format_datetime(datetime.now(timezone.utc) + timedelta(seconds=30), usegmt=True)
+    assert 25 < parse_retry_after(later) <= 30
@@ -0,0 +1,216 @@
+import threading
+import time
+
+import pytest
+
+from epson_connect.scheduler import (DeadlineExceeded, PrintScheduler,
+                                     SchedulerError, _Item, percentile)
+
+
+class FakePrinter:
+    """
+    Records the order jobs run in; the first job blocks until released.
+    """
+
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.order = []
+        self.release = threading.Event()
+        self.lock = threading.Lock()
+        self.active = {}
+        self.peak = {}
+
+    def print(self, *args):
+        device, file = (None, args[0]) if len(args) == 3 else args[:2]
+        with self.lock:
+            self.order.append(file)
+            self.active[device] = self.active.get(device, 0) + 1
+            self.peak[device] = max(self.peak.get(device, 0), self.active[device])
+        if file == 'blocker':
+            self.release.wait(5)
+        time.sleep(self.delay)
+        with self.lock:
+            self.active[device] -= 1
+        return f'job-{file}'
+
+
+def run_blocked(printer, scheduler, submit):
+    """
+    Occupy the only worker, queue jobs with ``submit`` and return their run order.
+    """
+    blocker = scheduler.submit('blocker')
+    while not printer.order:
+        time.sleep(0.001)
+    futures = submit()
+    printer.release.set()
+    for future in [blocker, *futures]:
+        future.exception(timeout=5)
+    return printer.order[1:]
+
+
+def test_scheduler_runs_urgent_jobs_first():
+    printer = FakePrinter()
+
+    with PrintScheduler(printer, max_workers=1) as scheduler:
+        order = run_blocked(printer, scheduler, lambda: [
+            scheduler.submit('batch-1', priority='batch'),
+            scheduler.submit('normal-1'),
+            scheduler.submit('batch-2', priority='batch'),
+            scheduler.submit('urgent-1', priority='urgent'),
+        ])
+
+    assert order == ['urgent-1', 'normal-1', 'batch-1', 'batch-2']
+
+
+def test_scheduler_shares_fairly_between_tenants():
+    printer = FakePrinter()
+
+    with PrintScheduler(printer, max_workers=1) as scheduler:
+        order = run_blocked(printer, scheduler, lambda: [
+            *[scheduler.submit(f'a-{i}', tenant='a') for i in range(4)],
+            *[scheduler.submit(f'b-{i}', tenant='b') for i in range(2)],
+        ])
+
+    # The blocker ran as tenant "default", so both tenants start level.
+    assert order == ['a-0', 'b-0', 'a-1', 'b-1', 'a-2', 'a-3']
+
+
+def test_scheduler_weights_tenants():
+    printer = FakePrinter()
+
+    with PrintScheduler(printer, max_workers=1, tenant_weights={'b': 2}) as scheduler:
+        order = run_blocked(printer, scheduler, lambda: [
+            *[scheduler.submit(f'a-{i}', tenant='a') for i in range(3)],
+            *[scheduler.submit(f'b-{i}', tenant='b') for i in range(4)],
+        ])
+
+    assert order == ['a-0', 'b-0', 'b-1', 'a-1', 'b-2', 'b-3', 'a-2']
+
+
+def test_scheduler_deadlines():
+    printer = FakePrinter()
+
+    with PrintScheduler(printer, max_workers=1, deadline_slack=60) as scheduler:
+        futures = {}
+
+        def submit():
+            futures['late'] = scheduler.submit('late', tenant='a', deadline=0.01)
+            futures['a'] = scheduler.submit('a', tenant='a')
+            futures['soon'] = scheduler.submit('soon', tenant='b', deadline=30)
+            time.sleep(0.05)
+            return list(futures.values())
+
+        order = run_blocked(printer, scheduler, submit)
+
+    assert order == ['soon', 'a']
+    with pytest.raises(DeadlineExceeded):
+        futures['late'].result()
+    assert scheduler.metrics()['expired'] == 1
+
+
+def test_scheduler_caps_jobs_per_device():
+    printer = FakePrinter(delay=0.01)
+
+    class FakeFleet:
+        print = printer.print
+
+    with PrintScheduler(FakeFleet(), max_workers=4, device_max_in_flight=1) as scheduler:
+        futures = [scheduler.submit(f'f-{i}', device=f'dev-{i % 2}') for i in range(10)]
+        assert [f.result(timeout=5) for f in futures] == [f'job-f-{i}' for i in range(10)]
+
+    assert printer.peak == {'dev-0': 1, 'dev-1': 1}
+
+
+def test_scheduler_does_not_cap_a_printer_target():
+    printer = FakePrinter(delay=0.05)
+
+    with PrintScheduler(printer, max_workers=4, device_max_in_flight=1) as scheduler:
+        futures = [scheduler.submit(f'f-{i}') for i in range(4)]
+        for future in futures:
+            future.result(timeout=5)
+
+    assert printer.peak[None] > 1
+
+
+def test_scheduler_expires_job_cancelled_concurrently():
+    scheduler = PrintScheduler(FakePrinter(), max_workers=1)
+    scheduler.close()
+
+    item = _Item(0, 'late', None, None, None, 'normal', 'default', deadline=0)
+    # Cancelled after the dispatcher checked, before it expires the job.
+    item.future.cancel()
+    item.future.cancelled = lambda: False
+    devices = {None: [(item.sort_key(), item)]}
+
+    assert scheduler._first_runnable(devices, now=1) is None
+    assert devices == {}
+    assert scheduler.metrics()['expired'] == 0
+
+
+def test_scheduler_skips_capped_devices_without_scanning():
+    scheduler = PrintScheduler(FakePrinter(), max_workers=1, device_max_in_flight=1)
+    scheduler.close()
+
+    checked = []
+    backlog = []
+    for seq in range(1000):
+        item = _Item(seq, f'f-{seq}', None, None, 'dev-0', 'normal', 'default', None)
+        item.future.cancelled = lambda seq=seq: checked.append(seq) or False
+        backlog.append((item.sort_key(), item))
+    other = _Item(1000, 'other', None, None, 'dev-1', 'normal', 'default', None)
+    devices = {'dev-0': backlog, 'dev-1': [(other.sort_key(), other)]}
+
+    scheduler._device_running['dev-0'] = 1
+    assert scheduler._first_runnable(devices, now=0) is other
+    # Only the head of the capped device's queue was looked at.
+    assert checked == [0]
+
+
+def test_scheduler_metrics_and_errors():
+    printer = FakePrinter()
+
+    with PrintScheduler(printer, max_workers=1) as scheduler:
+        with pytest.raises(SchedulerError):
+            scheduler.submit('x', priority='whenever')
+
+        blocker = scheduler.submit('blocker')
+        while not printer.order:
+            time.sleep(0.001)
+        queued = [scheduler.submit('q', tenant='t', priority='urgent') for _ in range(3)]
+
+        metrics = scheduler.metrics()
+        assert metrics['queued'] == {'urgent': 3, 'normal': 0, 'batch': 0}
+        assert metrics['queued_by_tenant'] == {'t': 3}
+        assert metrics['running'] == 1
+
+        printer.release.set()
+        for future in [blocker, *queued]:
+            future.result(timeout=5)
+
+    metrics = scheduler.metrics()
+    assert metrics['completed'] == 4
+    assert metrics['latency']['urgent']['total_p99'] > 0
+    assert metrics['latency']['batch']['total_p99'] is None
+
+
+def test_scheduler_close_cancels_queued_jobs():
+    printer = FakePrinter()
+    scheduler = PrintScheduler(printer, max_workers=1)
+    scheduler.submit('blocker')
+    while not printer.order:
+        time.sleep(0.001)
+    queued = scheduler.submit('queued')
+
+    scheduler.close(wait=False)
+    printer.release.set()
+
+    assert queued.cancelled()
+    with pytest.raises(SchedulerError):
+        scheduler.submit('x')
+
+
+def test_percentile():
+    assert percentile([], 99) is None
+    assert percentile([3, 1, 2], 50) == 2
+    assert percentile(list(range(1, 101)), 99) == 99
+    assert percentile(list(range(1, 101)), 100) == 100
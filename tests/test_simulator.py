@@ -0,0 +1,123 @@
+import time
+
+import pytest
+import requests
+
+from epson_connect.authenticate import ApiError, AuthenticationError
+from epson_connect.client import Client
+from epson_connect.retry import RetryPolicy
+from epson_connect.simulator import Simulator
+
+
+@pytest.fixture
+def simulator():
+    with Simulator(print_seconds=0.05) as simulator:
+        yield simulator
+
+
+def client(simulator, **kwargs):
+    return Client(
+        base_url=simulator.url,
+        printer_email='printer@example.com',
+        client_id='id',
+        client_secret='secret',
+        **kwargs,
+    )
+
+
+def test_simulator_print_flow(simulator):
+    with client(simulator) as ec:
+        printer = ec.printer
+        job_id = printer.print(b'%PDF-1.4', {'job_name': 'sim'}, '.pdf')
+
+        info = printer.job_info(job_id)
+        assert info['status'] == 'pending'
+        assert info['job_name'] == 'sim'
+
+        time.sleep(0.06)
+        assert printer.job_info(job_id)['status'] == 'completed'
+
+        job_id = printer.print(b'%PDF-1.4', {'job_name': 'sim'}, '.pdf')
+        printer.cancel_print(job_id)
+        assert printer.job_info(job_id)['status'] == 'canceled'
+
+        assert printer.info()['ec_connected']
+        assert printer.capabilities('document')['color_modes'] == ['color', 'mono']
+
+    stats = simulator.stats()
+    assert stats['token'] == 1
+    assert stats['create_job'] == stats['upload'] == stats['print'] == 2
+    assert stats['uploaded_bytes'] == 16
+
+
+def test_simulator_scanner(simulator):
+    with client(simulator) as ec:
+        scanner = ec.scanner
+        destination = scanner.add('me', 'me@example.com')
+        scanner.update(destination['id'], 'you', 'you@example.com', 'mail')
+        assert scanner.list()['destinations'] == [{
+            'id': destination['id'],
+            'alias_name': 'you',
+            'type': 'mail',
+            'destination': 'you@example.com',
+        }]
+
+        scanner.remove(destination['id'])
+        assert scanner.list()['destinations'] == []
+
+
+def test_simulator_token_expiry(simulator):
+    # Tokens count as expired 5 seconds early, so every call refreshes first.
+    simulator.token_lifetime = 5
+
+    with client(simulator) as ec:
+        ec.printer.info()
+        ec.printer.info()
+
+    stats = simulator.stats()
+    assert stats['grant_password'] == 1
+    assert stats['grant_refresh_token'] == 2
+
+
+def test_simulator_rejects_bad_credentials():
+    with Simulator(credentials={'id': 'secret'}) as simulator:
+        ec = Client(
+            base_url=simulator.url,
+            printer_email='printer@example.com',
+            client_id='id',
+            client_secret='wrong',
+        )
+        assert 'token' not in simulator.stats()
+
+        with pytest.raises(AuthenticationError):
+            ec.warmup()
+
+        response = requests.get(f'{simulator.url}/api/1/printing/printers/abc')
+        assert response.status_code == 401
+
+
+def test_simulator_errors_and_rate_limits():
+    with Simulator(error_rate=1.0, seed=1) as simulator:
+        with client(simulator, retry_policy=RetryPolicy(max_attempts=2, backoff_factor=0)) as ec:
+            with pytest.raises(ApiError) as e:
+                ec.printer.info()
+        assert e.value.status_code == 503
+        assert simulator.stats()['errors'] == 2
+
+    with Simulator(rate_limit=1, burst=2) as simulator:
+        with client(simulator, retry_policy=RetryPolicy(max_attempts=1)) as ec:
+            ec.printer.info()
+            ec.printer.info()
+            with pytest.raises(ApiError) as e:
+                ec.printer.info()
+        assert e.value.status_code == 429
+        assert simulator.stats()['rate_limited'] == 1
+
+
+def test_simulator_chunked_upload(simulator):
+    with client(simulator) as ec:
+        job = ec.printer.print_setting({'job_name': 'chunked', 'print_mode': 'document'})
+
+    response = requests.post(job['upload_uri'], data=iter([b'%PDF', b'-1.4']))
+    assert response.status_code == 200
+    assert simulator.stats()['uploaded_bytes'] == 8
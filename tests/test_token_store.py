@@ -0,0 +1,120 @@
+import threading
+import time
+from unittest import mock
+
+import pytest
+
+from epson_connect.authenticate import ApiError, AuthCtx
+from epson_connect.token_store import (FileTokenStore, MemoryTokenStore,
+                                       token_key)
+
+TOKEN_BODY = {
+    'refresh_token': 'rf-123',
+    'expires_in': '3600',
+    'access_token': 'at-5678',
+    'subject_id': 'test_subj_id',
+}
+
+
+def make_auth_ctx(store):
+    return AuthCtx(
+        base_url='https://example.com/my/path',
+        printer_email='example3@print.epsonconnect.com',
+        client_id='ghi',
+        client_secret='789',
+        token_store=store,
+    )
+
+
+@pytest.mark.parametrize('store_factory', [
+    lambda tmp_path: MemoryTokenStore(),
+    lambda tmp_path: FileTokenStore(tmp_path / 'tokens.json'),
+])
+def test_token_store_roundtrip(tmp_path, store_factory):
+    store = store_factory(tmp_path)
+
+    assert store.get('a') is None
+    store.set('a', {'access_token': 'x'})
+    store.set('b', {'access_token': 'y'})
+    assert store.get('a') == {'access_token': 'x'}
+
+    store.delete('a')
+    store.delete('missing')
+    assert store.get('a') is None
+    assert store.get('b') == {'access_token': 'y'}
+
+
+def test_file_token_store_concurrent_writers(tmp_path):
+    path = tmp_path / 'tokens.json'
+
+    def write(i):
+        FileTokenStore(path).set(f'key-{i}', {'access_token': str(i)})
+
+    threads = [threading.Thread(target=write, args=(i,)) for i in range(20)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    store = FileTokenStore(path)
+    assert all(store.get(f'key-{i}') == {'access_token': str(i)} for i in range(20))
+
+
+def test_auth_ctx_reuses_stored_token(tmp_path):
+    store = FileTokenStore(tmp_path / 'tokens.json')
+
+    with mock.patch('epson_connect.authenticate.AuthCtx.send') as send:
+        send.return_value = dict(TOKEN_BODY)
+        make_auth_ctx(store).warmup()
+    assert send.call_count == 1
+
+    key = token_key('ghi', 'example3@print.epsonconnect.com')
+    assert store.get(key)['access_token'] == 'at-5678'
+
+    # A new "process" picks the token up without touching the token endpoint.
+    with mock.patch('epson_connect.authenticate.AuthCtx.send') as send:
+        auth_ctx = make_auth_ctx(FileTokenStore(tmp_path / 'tokens.json'))
+    send.assert_not_called()
+    assert auth_ctx.device_id == 'test_subj_id'
+    assert auth_ctx.default_headers['Authorization'] == 'Bearer at-5678'
+
+
+def test_auth_ctx_refreshes_expired_stored_token():
+    store = MemoryTokenStore()
+    key = token_key('ghi', 'example3@print.epsonconnect.com')
+    store.set(key, {
+        'access_token': 'old',
+        'refresh_token': 'rf-old',
+        'expires_at': time.time() - 1,
+        'subject_id': 'test_subj_id',
+    })
+
+    with mock.patch('epson_connect.authenticate.AuthCtx.send') as send:
+        send.return_value = dict(TOKEN_BODY)
+        make_auth_ctx(store).warmup()
+
+    assert send.call_args.kwargs['data'] == {
+        'grant_type': 'refresh_token',
+        'refresh_token': 'rf-old',
+    }
+    assert store.get(key)['access_token'] == 'at-5678'
+
+
+def test_auth_ctx_falls_back_to_password_grant():
+    store = MemoryTokenStore()
+    key = token_key('ghi', 'example3@print.epsonconnect.com')
+    store.set(key, {
+        'access_token': 'old',
+        'refresh_token': 'revoked',
+        'expires_at': time.time() - 1,
+        'subject_id': 'test_subj_id',
+    })
+
+    with mock.patch('epson_connect.authenticate.AuthCtx.send') as send:
+        send.side_effect = [ApiError('invalid_grant'), dict(TOKEN_BODY)]
+        auth_ctx = make_auth_ctx(store)
+        auth_ctx.warmup()
+
+    assert send.call_args.kwargs['data']['grant_type'] == 'password'
+    assert auth_ctx._refresh_token == 'rf-123'
+    assert store.get(key)['refresh_token'] == 'rf-123'
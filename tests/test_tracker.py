@@ -0,0 +1,151 @@
+import asyncio
+import concurrent.futures
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from epson_connect.tracker import JobTracker, JobTransition, _Job
+
+
+class FakePrinter:
+    """
+    Returns the next scripted status of a job on every job_info call.
+    """
+
+    def __init__(self, statuses):
+        self.statuses = {job_id: list(s) for job_id, s in statuses.items()}
+        self.calls = []
+        self.lock = threading.Lock()
+
+    def job_info(self, job_id):
+        with self.lock:
+            self.calls.append(job_id)
+            statuses = self.statuses[job_id]
+            status = statuses.pop(0) if len(statuses) > 1 else statuses[0]
+        if isinstance(status, Exception):
+            raise status
+        return {'status': status}
+
+
+def test_tracker_waits_for_completion_and_emits_transitions():
+    printer = FakePrinter({'job-1': ['pending', 'processing', 'processing', 'completed']})
+    transitions = []
+
+    with JobTracker(printer, min_interval=0.01, max_interval=0.02) as tracker:
+        tracker.add_listener(transitions.append)
+        assert tracker.wait('job-1', timeout=5) == {'status': 'completed'}
+        assert len(tracker) == 0
+
+    assert transitions == [
+        JobTransition('job-1', None, 'pending', {'status': 'pending'}),
+        JobTransition('job-1', 'pending', 'processing', {'status': 'processing'}),
+        JobTransition('job-1', 'processing', 'completed', {'status': 'completed'}),
+    ]
+    assert printer.calls == ['job-1'] * 4
+
+
+def test_tracker_coalesces_waiters():
+    printer = FakePrinter({'job-1': ['pending'] * 5 + ['completed']})
+
+    with JobTracker(printer, min_interval=0.01, max_interval=0.01) as tracker:
+        with ThreadPoolExecutor(max_workers=50) as pool:
+            results = list(pool.map(lambda _: tracker.wait('job-1', timeout=5), range(50)))
+
+    assert results == [{'status': 'completed'}] * 50
+    assert len(printer.calls) == 6
+
+
+def test_tracker_tracks_many_jobs():
+    printer = FakePrinter({f'job-{i}': ['pending', 'completed'] for i in range(100)})
+
+    with JobTracker(printer, min_interval=0.01, max_interval=0.01) as tracker:
+        futures = [tracker.track(f'job-{i}') for i in range(100)]
+        done, _ = concurrent.futures.wait(futures, timeout=5)
+
+    assert len(done) == 100
+    assert len(printer.calls) == 200
+    assert tracker.expected_seconds is not None
+
+
+def test_tracker_timeout_keeps_tracking():
+    printer = FakePrinter({'job-1': ['pending']})
+
+    with JobTracker(printer, min_interval=0.01, max_interval=0.01) as tracker:
+        with pytest.raises(concurrent.futures.TimeoutError):
+            tracker.wait('job-1', timeout=0.05)
+        assert len(tracker) == 1
+
+        printer.statuses['job-1'] = ['canceled']
+        assert tracker.wait('job-1', timeout=5) == {'status': 'canceled'}
+
+
+def test_tracker_update_resolves_waiters():
+    printer = FakePrinter({'job-1': ['pending']})
+
+    with JobTracker(printer, min_interval=10, max_interval=10) as tracker:
+        future = tracker.track('job-1')
+        tracker.update('job-1', {'status': 'completed', 'source': 'callback'})
+        tracker.update('job-2', {'status': 'completed'})
+
+        assert future.result(timeout=5) == {'status': 'completed', 'source': 'callback'}
+
+
+def test_tracker_fails_after_repeated_errors():
+    printer = FakePrinter({'job-1': [ValueError('boom')]})
+
+    with JobTracker(printer, min_interval=0.01, max_errors=3) as tracker:
+        with pytest.raises(ValueError):
+            tracker.wait('job-1', timeout=5)
+
+    assert len(printer.calls) == 3
+
+
+def test_tracker_backs_off_and_speeds_up_near_expected_completion():
+    tracker = JobTracker(FakePrinter({}), min_interval=1, max_interval=8, backoff=2)
+    tracker._push = lambda job: None
+    job = _Job('job-1', time.monotonic(), 1)
+    intervals = []
+    for _ in range(5):
+        tracker._reschedule(job, changed=False)
+        intervals.append(job.interval)
+    assert intervals == [2, 4, 8, 8, 8]
+
+    tracker._reschedule(job, changed=True)
+    assert job.interval == 1
+
+    # A job expected to finish in 3 seconds is polled then, not 8 seconds later.
+    job.interval = 4
+    tracker._expected = 3
+    tracker._reschedule(job, changed=False)
+    assert job.interval == 8
+    assert job.next_poll - job.started == pytest.approx(3, abs=0.1)
+
+    tracker.close()
+
+
+def test_tracker_wait_async_shares_future():
+    printer = FakePrinter({'job-1': ['pending', 'pending', 'completed']})
+
+    async def main(tracker):
+        waiter = asyncio.ensure_future(tracker.wait_async('job-1'))
+        await asyncio.sleep(0)
+        waiter.cancel()
+        return await asyncio.gather(*(tracker.wait_async('job-1', timeout=5) for _ in range(10)))
+
+    with JobTracker(printer, min_interval=0.01) as tracker:
+        results = asyncio.run(main(tracker))
+
+    assert results == [{'status': 'completed'}] * 10
+    assert len(printer.calls) == 3
+
+
+def test_tracker_close_cancels_waiters():
+    tracker = JobTracker(FakePrinter({'job-1': ['pending']}), min_interval=10)
+    future = tracker.track('job-1')
+    tracker.close()
+
+    assert future.cancelled()
+    with pytest.raises(RuntimeError):
+        tracker.track('job-2')
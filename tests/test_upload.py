@@ -0,0 +1,95 @@
+import io
+from unittest import mock
+
+import pytest
+
+from epson_connect.printer import Printer, PrinterError
+from epson_connect.upload import UploadError, UploadSource
+
+
+def test_upload_source_path(tmp_path):
+    path = tmp_path / 'doc.PDF'
+    path.write_bytes(b'x' * 200_000)
+
+    with UploadSource(str(path)) as source:
+        assert source.extension == '.pdf'
+        assert source.length == 200_000
+        # Streamed from the open file rather than read into memory.
+        assert source.body.name == str(path)
+        assert b''.join(source.chunks()) == b'x' * 200_000
+
+    assert source.body.closed
+
+
+def test_upload_source_file_object(tmp_path):
+    path = tmp_path / 'doc.pdf'
+    path.write_bytes(b'0123456789')
+
+    with open(path, 'rb') as fp:
+        fp.read(4)
+        with UploadSource(fp) as source:
+            assert source.extension == '.pdf'
+            assert source.length == 6
+        assert not fp.closed
+
+
+def test_upload_source_buffers():
+    with UploadSource(io.BytesIO(b'abc'), extension='png') as source:
+        assert source.extension == '.png'
+        assert source.length == 3
+
+    with UploadSource(b'abcd', extension='.jpg') as source:
+        assert source.length == 4
+        assert source.body == b'abcd'
+
+    view = memoryview(bytearray(b'abcdef'))[1:5]
+    with UploadSource(view, extension='.pdf') as source:
+        assert source.length == 4
+        assert len(source.body) == 4
+        assert list(source.chunks(chunk_size=3)) == [b'bcd', b'e']
+
+
+def test_upload_source_unseekable_stream():
+    class Stream:
+        def __init__(self):
+            self._data = io.BytesIO(b'streamed')
+
+        def read(self, size=-1):
+            return self._data.read(size)
+
+    with UploadSource(Stream(), extension='.pdf') as source:
+        assert source.length == 8
+
+
+def test_upload_source_errors():
+    with pytest.raises(UploadError):
+        UploadSource(b'abc')
+
+    with pytest.raises(UploadError):
+        UploadSource(12, extension='.pdf')
+
+
+def test_printer_upload_file_streams(tmp_path):
+    path = tmp_path / 'doc.pdf'
+    path.write_bytes(b'%PDF-1.4')
+
+    auth_ctx = mock.Mock()
+    printer = Printer(auth_ctx)
+    printer.upload_file('https://example.com/upload?Key=k1', str(path), 'document')
+
+    (method, upload_path), kwargs = auth_ctx.send.call_args
+    assert method == 'POST'
+    assert upload_path == '/upload?Key=k1&File=1.pdf'
+    assert kwargs['headers'] == {
+        'Content-Type': 'application/octet-stream',
+        'Content-Length': '8',
+    }
+    assert kwargs['data'].name == str(path)
+
+    printer.upload_file('https://example.com/upload?Key=k1', b'\xff\xd8', 'photo', '.jpg')
+    (_, upload_path), kwargs = auth_ctx.send.call_args
+    assert upload_path == '/upload?Key=k1&File=1.jpg'
+    assert kwargs['data'] == b'\xff\xd8'
+
+    with pytest.raises(PrinterError):
+        printer.upload_file('https://example.com/upload?Key=k1', b'', 'document', '.exe')
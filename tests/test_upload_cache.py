@@ -0,0 +1,139 @@
+import hashlib
+import os
+
+from epson_connect.printer import Printer
+from epson_connect.upload_cache import UploadCache, _read_and_hash
+
+
+def test_upload_cache_hits_skip_reads(tmp_path, mocker):
+    path = tmp_path / 'label.pdf'
+    path.write_bytes(b'%PDF-label')
+    cache = UploadCache()
+
+    digest, content = cache.load(path)
+    assert content == b'%PDF-label'
+
+    read = mocker.patch('builtins.open', side_effect=AssertionError('file was read'))
+    for _ in range(9):
+        assert cache.load(path) == (digest, content)
+    read.assert_not_called()
+
+    stats = cache.stats()
+    assert stats['hits'] == 9
+    assert stats['misses'] == 1
+    assert stats['hit_ratio'] == 0.9
+    assert stats['bytes'] == len(content)
+
+
+def test_upload_cache_detects_changes(tmp_path):
+    path = tmp_path / 'label.pdf'
+    path.write_bytes(b'one')
+    cache = UploadCache()
+    first, _ = cache.load(path)
+
+    path.write_bytes(b'two')
+    os.utime(path, ns=(0, 10 ** 9))
+    second, content = cache.load(path)
+
+    assert content == b'two'
+    assert first != second
+    assert cache.stats()['misses'] == 2
+
+
+def test_upload_cache_stores_identical_contents_once(tmp_path):
+    cache = UploadCache()
+    for name in ('a.pdf', 'b.pdf'):
+        (tmp_path / name).write_bytes(b'same')
+
+    assert cache.load(tmp_path / 'a.pdf')[0] == cache.load(tmp_path / 'b.pdf')[0]
+    assert cache.stats()['bytes'] == 4
+    assert cache.stats()['files'] == 2
+
+
+def test_upload_cache_evicts_and_reloads_without_rehashing(tmp_path, mocker):
+    cache = UploadCache(max_bytes=10)
+    (tmp_path / 'a.pdf').write_bytes(b'a' * 6)
+    (tmp_path / 'b.pdf').write_bytes(b'b' * 6)
+
+    digest, _ = cache.load(tmp_path / 'a.pdf')
+    cache.load(tmp_path / 'b.pdf')
+    assert cache.stats()['bytes'] == 6
+
+    sha256 = mocker.patch('hashlib.sha256')
+    assert cache.load(tmp_path / 'a.pdf') == (digest, b'a' * 6)
+    sha256.assert_not_called()
+    assert cache.stats()['reloads'] == 1
+
+
+def test_upload_cache_bounds_remembered_paths(tmp_path):
+    cache = UploadCache(max_files=2)
+    for name in ('a.pdf', 'b.pdf', 'c.pdf'):
+        (tmp_path / name).write_bytes(b'same')
+
+    cache.load(tmp_path / 'a.pdf')
+    cache.load(tmp_path / 'b.pdf')
+    cache.load(tmp_path / 'a.pdf')
+    cache.load(tmp_path / 'c.pdf')
+    assert cache.stats()['files'] == 2
+
+    # b.pdf was least recently used, so it is read and hashed again.
+    cache.load(tmp_path / 'a.pdf')
+    cache.load(tmp_path / 'b.pdf')
+    assert cache.stats()['misses'] == 4
+
+
+def test_upload_cache_hashes_while_reading(tmp_path):
+    path = tmp_path / 'big.pdf'
+    path.write_bytes(bytes(range(256)) * 10)
+
+    digest, content = _read_and_hash(path, chunk_size=100)
+    assert content == path.read_bytes()
+    assert digest == hashlib.sha256(content).hexdigest()
+
+
+def test_upload_cache_bypasses_large_files(tmp_path):
+    cache = UploadCache(max_file_bytes=3)
+    path = tmp_path / 'big.pdf'
+    path.write_bytes(b'1234')
+
+    assert cache.load(path) == (None, None)
+    source = cache.source(str(path))
+    assert source.extension == '.pdf'
+    with source:
+        assert source.body.read() == b'1234'
+    assert cache.stats()['bypassed'] == 2
+
+
+def test_upload_cache_derive(tmp_path):
+    cache = UploadCache()
+    path = tmp_path / 'photo.jpg'
+    path.write_bytes(b'raw')
+    digest, content = cache.load(path)
+
+    calls = []
+
+    def transform(data):
+        calls.append(data)
+        return data.upper()
+
+    assert cache.derive(digest, ('upper',), transform) == b'RAW'
+    assert cache.derive(digest, ('upper',), transform) == b'RAW'
+    assert calls == [b'raw']
+
+    stats = cache.stats()
+    assert (stats['derived_hits'], stats['derived_misses']) == (1, 1)
+
+
+def test_printer_uploads_from_cache(tmp_path, mocker, auth_ctx):
+    path = tmp_path / 'label.pdf'
+    path.write_bytes(b'%PDF-label')
+    cache = UploadCache()
+    printer = Printer(auth_ctx, upload_cache=cache)
+    upload_uri = 'https://example.com/upload?Key=abc'
+
+    printer.upload_file(upload_uri, str(path), 'document')
+    mocker.patch('builtins.open', side_effect=AssertionError('file was read'))
+    printer.upload_file(upload_uri, str(path), 'document')
+
+    assert [request.data for request in auth_ctx.requests] == [b'%PDF-label', b'%PDF-label']
+    assert cache.stats()['hits'] == 1
@@ -0,0 +1,111 @@
+import asyncio
+import io
+import json
+
+from epson_connect.tracker import JobTracker
+from epson_connect.webhook import WebhookReceiver
+
+
+class IdlePrinter:
+
+    def job_info(self, job_id):
+        return {'status': 'pending'}
+
+
+def wsgi_request(receiver, body, method='POST', path='/', query=''):
+    body = body if isinstance(body, bytes) else json.dumps(body).encode()
+    statuses = []
+    receiver.wsgi({
+        'REQUEST_METHOD': method,
+        'PATH_INFO': path,
+        'QUERY_STRING': query,
+        'CONTENT_LENGTH': str(len(body)),
+        'wsgi.input': io.BytesIO(body),
+    }, lambda status, headers: statuses.append(status))
+    return statuses[0]
+
+
+def test_wsgi_notification_resolves_tracker():
+    with JobTracker(IdlePrinter(), min_interval=60) as tracker:
+        receiver = WebhookReceiver([tracker])
+        future = tracker.track('job-1')
+
+        assert wsgi_request(receiver, {'job_id': 'job-1', 'status': 'completed'}) == '200 OK'
+        assert future.result(timeout=5) == {'job_id': 'job-1', 'status': 'completed'}
+
+
+def test_wsgi_rejects_bad_requests():
+    notifications = []
+    receiver = WebhookReceiver(token='secret', path='/epson')
+    receiver.add_listener(lambda job_id, info: notifications.append(job_id))
+    body = {'job_id': 'job-1', 'status': 'completed'}
+
+    ok = {'path': '/epson', 'query': 'token=secret'}
+
+    assert wsgi_request(receiver, body, path='/other', query='token=secret').startswith('404')
+    assert wsgi_request(receiver, body, method='GET', **ok).startswith('405')
+    assert wsgi_request(receiver, body, path='/epson', query='token=wrong').startswith('403')
+    assert wsgi_request(receiver, body, path='/epson').startswith('403')
+    assert wsgi_request(receiver, b'not json', **ok).startswith('400')
+    assert wsgi_request(receiver, {'status': 'x'}, **ok).startswith('400')
+    assert wsgi_request(receiver, b'x' * (receiver.max_body + 1), **ok).startswith('413')
+    assert notifications == []
+
+    assert wsgi_request(receiver, [body, body], **ok) == '200 OK'
+    assert notifications == ['job-1', 'job-1']
+
+
+def test_asgi_notification():
+    notifications = []
+    receiver = WebhookReceiver()
+    receiver.add_listener(lambda job_id, info: notifications.append((job_id, info['status'])))
+
+    body = json.dumps({'id': 'job-2', 'status': 'canceled'}).encode()
+    messages = [
+        {'type': 'http.request', 'body': body[:5], 'more_body': True},
+        {'type': 'http.request', 'body': body[5:]},
+    ]
+    sent = []
+
+    async def receive():
+        return messages.pop(0)
+
+    async def send(message):
+        sent.append(message)
+
+    scope = {'type': 'http', 'method': 'POST', 'path': '/', 'query_string': b''}
+    asyncio.run(receiver.asgi(scope, receive, send))
+
+    assert sent[0]['status'] == 200
+    assert notifications == [('job-2', 'canceled')]
+
+
+def test_standalone_server_keeps_connections_alive():
+    notifications = []
+    receiver = WebhookReceiver()
+    receiver.add_listener(lambda job_id, info: notifications.append(job_id))
+
+    async def main():
+        server = await receiver.serve('127.0.0.1', 0)
+        port = server.sockets[0].getsockname()[1]
+        reader, writer = await asyncio.open_connection('127.0.0.1', port)
+
+        responses = []
+        for i in range(100):
+            body = json.dumps({'job_id': f'job-{i}', 'status': 'completed'}).encode()
+            head = f'POST / HTTP/1.1\r\nHost: localhost\r\nContent-Length: {len(body)}\r\n\r\n'
+            writer.write(head.encode() + body)
+            await writer.drain()
+            responses.append(await reader.readline())
+            while await reader.readline() != b'\r\n':
+                pass
+
+        writer.close()
+        server.close()
+        await server.wait_closed()
+        return responses
+
+    responses = asyncio.run(main())
+
+    assert responses == [b'HTTP/1.1 200 OK\r\n'] * 100
+    assert notifications == [f'job-{i}' for i in range(100)]